@@ -0,0 +1,10 @@
+# (chemin : /backend/backend/asgi.py)
+# Point d'entrée ASGI : uvicorn backend.asgi:application --port 8001
+# (lectures async du calendrier / magazzino, cf. backend/urls_async.py)
+import os
+from django.core.asgi import get_asgi_application
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('DJANGO_URLCONF', 'backend.urls_async')
+# sous ASGI chaque requête a son thread : pas de connexions persistantes
+os.environ.setdefault('DJANGO_CONN_MAX_AGE', '0')
+application = get_asgi_application()
@@ -3,10 +3,30 @@
 import os
 from pathlib import Path
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
-SECRET_KEY = "dev-secret-key"
-DEBUG = True
-ALLOWED_HOSTS = ["*"]
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in ("1", "true", "yes", "on")
+
+
+# DJANGO_DEBUG=0 -> mode production (gunicorn, cf. gunicorn.conf.py)
+DEBUG = _env_bool("DJANGO_DEBUG", True)
+SECRET_KEY = os.getenv("DJANGO_SECRET", "dev-secret-key")
+ALLOWED_HOSTS = [h.strip() for h in os.getenv("DJANGO_ALLOWED_HOSTS", "*").split(",") if h.strip()]
+
+# en production, pas de repli sur les valeurs de dev : refus de démarrer
+if not DEBUG:
+    if SECRET_KEY == "dev-secret-key":
+        raise ImproperlyConfigured("DJANGO_SECRET obligatoire avec DJANGO_DEBUG=0.")
+    if not ALLOWED_HOSTS or "*" in ALLOWED_HOSTS:
+        raise ImproperlyConfigured("DJANGO_ALLOWED_HOSTS (liste de domaines, sans '*') obligatoire avec DJANGO_DEBUG=0.")
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -24,9 +44,19 @@ INSTALLED_APPS = [
 
 ]
 
+# Compression des réponses (JSON du sinottico / calendrier annuel) :
+# brotli/zstd si django-compression-middleware est installé, sinon gzip Django.
+try:
+    import compression_middleware  # noqa: F401
+except ImportError:
+    _COMPRESSION_MIDDLEWARE = "django.middleware.gzip.GZipMiddleware"
+else:
+    _COMPRESSION_MIDDLEWARE = "compression_middleware.middleware.CompressionMiddleware"
+
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    _COMPRESSION_MIDDLEWARE,
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -81,14 +111,55 @@ TEMPLATES = [
     },
 ]
 
-ROOT_URLCONF = "backend.urls"
+# backend/asgi.py pointe DJANGO_URLCONF vers backend.urls_async (lectures async)
+ROOT_URLCONF = os.getenv("DJANGO_URLCONF", "backend.urls")
 WSGI_APPLICATION = "backend.wsgi.application"
+ASGI_APPLICATION = "backend.asgi.application"
+
+# Base de données : SQLite par défaut (petite installation) ;
+# DJANGO_DB_ENGINE=postgresql + POSTGRES_* pour la grosse installation
+# (périodes en daterange indexées GiST, cf. eventi/periodi.py).
+DB_ENGINE = os.getenv("DJANGO_DB_ENGINE", "sqlite3").strip().lower()
+# connexions persistantes (1 par thread gunicorn) ; 0 sous ASGI (backend/asgi.py)
+CONN_MAX_AGE = int(os.getenv("DJANGO_CONN_MAX_AGE", "60"))
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+if DB_ENGINE in ("postgresql", "postgres"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "arteluce"),
+            "USER": os.getenv("POSTGRES_USER", "arteluce"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
+    if django.VERSION >= (5, 1):
+        # BEGIN IMMEDIATE : un writer prend le verrou d'écriture dès le début de
+        # l'atomic() et attend busy_timeout, au lieu d'échouer en "database is locked"
+        DATABASES["default"]["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+
+# Pragmas SQLite appliqués à chaque nouvelle connexion (eventi/signals.py).
+# Surcharge possible par alias : DATABASES[alias]["PRAGMAS"] = {...}
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # les lecteurs ne sont plus bloqués par un writer (sauf DEBUG sur db.sqlite3 du dépôt)
+    "synchronous": "NORMAL",      # suffisant en WAL (fsync au checkpoint)
+    "busy_timeout": int(os.getenv("DJANGO_SQLITE_BUSY_TIMEOUT", "5000")),  # ms
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -32000,         # en KiB (~32 Mo par connexion)
+    "temp_store": "MEMORY",
 }
 
 LANGUAGE_CODE = "it-it"
@@ -97,13 +168,26 @@ USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "static/"
+# `collectstatic` -> servi par nginx (location /static/) ou WhiteNoise
+STATIC_ROOT = BASE_DIR / "static"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# JSON via orjson si installé (même sortie que DRF, cf. eventi/renderers.py) ;
+# sinon, ou avec DJANGO_FAST_JSON=0, renderer/parser DRF standard.
+_JSON_RENDERER, _JSON_PARSER = "rest_framework.renderers.JSONRenderer", "rest_framework.parsers.JSONParser"
+if _env_bool("DJANGO_FAST_JSON", True):
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        _JSON_RENDERER, _JSON_PARSER = "eventi.renderers.ORJSONRenderer", "eventi.renderers.ORJSONParser"
+
 REST_FRAMEWORK = {
-    "DEFAULT_RENDERER_CLASSES": ["rest_framework.renderers.JSONRenderer"],
-    "DEFAULT_PARSER_CLASSES": ["rest_framework.parsers.JSONParser"],
+    "DEFAULT_RENDERER_CLASSES": [_JSON_RENDERER],
+    "DEFAULT_PARSER_CLASSES": [_JSON_PARSER],
     # ↓ tu peux durcir plus tard si tu veux tout protéger
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
@@ -112,9 +196,68 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
 }
+# ---------------------------------------------------------------------------
+# Production (DJANGO_DEBUG=0)
+# ---------------------------------------------------------------------------
+if not DEBUG:
+    # derrière nginx : on fait confiance à X-Forwarded-Proto
+    SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+    USE_X_FORWARDED_HOST = True
+    SESSION_COOKIE_SECURE = _env_bool("DJANGO_SECURE_COOKIES", False)
+    CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+    CSRF_TRUSTED_ORIGINS = [
+        o.strip() for o in os.getenv("DJANGO_CSRF_TRUSTED_ORIGINS", "").split(",") if o.strip()
+    ]
+
+    # WhiteNoise (optionnel) : sert /static/ sans nginx (image backend seule)
+    try:
+        import whitenoise  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        MIDDLEWARE.insert(
+            MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+            "whitenoise.middleware.WhiteNoiseMiddleware",
+        )
+        STORAGES = {
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+        }
+
+    LOGGING = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {"console": {"class": "logging.StreamHandler"}},
+        "root": {"handlers": ["console"], "level": os.getenv("DJANGO_LOG_LEVEL", "INFO")},
+    }
+
 # Montant de TVA par défaut
 IVA_PERCENT = 22
 
+# Nombre de locations (slots) réservables par jour, cf. eventi/slots.py
+EVENTI_NUM_LOCATIONS = int(os.getenv("EVENTI_NUM_LOCATIONS", "8"))
+
+# Notifications SSE (/api/stream, cf. eventi/notifiche.py) : broker en mémoire
+# par défaut (runserver) ; Redis (pub/sub) obligatoire dès que gunicorn et
+# uvicorn tournent à part (supervisord.conf) : sinon /api/stream -> 503 si DEBUG=0
+EVENTI_PUSH_REDIS_URL = os.getenv("EVENTI_PUSH_REDIS_URL", "")
+
+# /api/calendario/changes : durée de conservation des eventi supprimés
+# (au-delà, un client avec un token plus ancien recharge tout)
+EVENTI_TOMBSTONE_GIORNI = int(os.getenv("EVENTI_TOMBSTONE_GIORNI", "90"))
+
+# Overbooking au save d'un evento (cf. eventi/conflitti.py) :
+# "avviso" = conflits renvoyés dans la réponse, "blocca" = confermato refusé
+EVENTI_OVERBOOKING = os.getenv("EVENTI_OVERBOOKING", "avviso")
+
+# Option (hold) d'une bozza sur le stock, en jours (cf. eventi/opzioni.py) ;
+# levée à échéance par `manage.py scadi_opzioni`
+EVENTI_OPZIONE_GIORNI = int(os.getenv("EVENTI_OPZIONE_GIORNI", "7"))
+
+# Cache des disponibilités (cf. eventi/disponibilita.py), en secondes ; clé
+# = version du domaine "stock", jamais périmée ; 0 = pas de cache
+EVENTI_CACHE_DISPONIBILITA = int(os.getenv("EVENTI_CACHE_DISPONIBILITA", "300"))
+
 # Données société + contact (utilisées par le .docx)
 COMPANY = {
     "ragione": "ARTE LUCE di Kominek Joanna Alicja",
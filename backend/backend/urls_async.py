@@ -0,0 +1,17 @@
+# (chemin : /backend/backend/urls_async.py)
+# URLconf du process ASGI (backend/asgi.py -> uvicorn :8001).
+# Les lectures calendrier / magazzino passent par les vues async ;
+# tout le reste retombe sur les routes habituelles (backend/urls.py).
+from django.urls import path, include
+
+from eventi import views_async
+
+urlpatterns = [
+    path("api/calendario/location-calendar", views_async.location_calendar),
+    path("api/eventi/mese", views_async.eventi_mese),
+    path("api/magazzino/status", views_async.magazzino_status),
+    path("api/magazzino/bookings", views_async.magazzino_bookings),
+    path("api/stream", views_async.stream),
+
+    path("", include("backend.urls")),
+]
@@ -2,19 +2,60 @@
 from django.contrib import admin
 from .models import (
     Cliente, Luogo, Materiale, Evento, RigaEvento, CalendarioSlot,
-    EventoRevision,
+    EventoRevision, DistanzaLuogo, MagazzinoItem, Magazzino, Trasferimento,
 )
 
 # backend/eventi/admin.py
+from django import forms
 from django.contrib import admin
 from .models import Materiale
+from . import giacenze
+
+class MaterialeAdminForm(forms.ModelForm):
+    class Meta:
+        model = Materiale
+        fields = "__all__"
+
+    def clean_scorta(self):
+        # une baisse ne touche que le magazzino principale (cf. giacenze.scorta_modificata)
+        scorta = self.cleaned_data["scorta"]
+        minimo = giacenze.scorta_minima(self.instance.pk)
+        if scorta < minimo:
+            raise forms.ValidationError(
+                f"Minimo {minimo}: il resto della giacenza è in altri magazzini (trasferirlo prima)."
+            )
+        return scorta
 
 @admin.register(Materiale)
 class MaterialeAdmin(admin.ModelAdmin):
+    form = MaterialeAdminForm
     list_display = ("id","nome","categoria","sottocategoria","prezzo_base","scorta","is_tecnico","is_messo","is_archived")
     list_filter = ("categoria","sottocategoria","is_tecnico","is_messo","is_archived")
     search_fields = ("nome",)
 
+class MagazzinoItemAdmin(admin.ModelAdmin):
+    # giacenza = stock physique ; Materiale.scorta suit (cf. eventi/giacenze.py)
+    list_display = ("id", "materiale", "magazzino", "qta", "updated_at")
+    list_filter = ("magazzino",)
+    search_fields = ("materiale__nome",)
+    list_select_related = ("materiale", "magazzino")
+
+class MagazzinoAdmin(admin.ModelAdmin):
+    list_display = ("id", "nome", "luogo", "principale")
+
+class TrasferimentoAdmin(admin.ModelAdmin):
+    # journal : un trasferimento passe par giacenze.trasferisci (API), pas par l'admin
+    list_display = ("id", "created_at", "materiale", "da", "a", "qta", "evento")
+    list_filter = ("da", "a")
+    search_fields = ("materiale__nome",)
+    list_select_related = ("materiale", "da", "a", "evento")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 def safe_register(model, admin_class=None):
     if model in admin.site._registry:
         return
@@ -30,3 +71,7 @@ safe_register(Evento)
 safe_register(RigaEvento)
 safe_register(CalendarioSlot)
 safe_register(EventoRevision)
+safe_register(DistanzaLuogo)
+safe_register(MagazzinoItem, MagazzinoItemAdmin)
+safe_register(Magazzino, MagazzinoAdmin)
+safe_register(Trasferimento, TrasferimentoAdmin)
@@ -0,0 +1,264 @@
+# (chemin : /backend/eventi/assegnazione.py)
+"""
+Affectation mezzi / tecnici aux eventi d'une période, à coût minimal.
+
+Principe
+--------
+1. Les eventi non annullati de la période sont traités par "tranche" :
+   ceux qui commencent le même jour, dans l'ordre chronologique. Un mezzo
+   ou un tecnico est libre pour une tranche si les eventi déjà servis
+   qui l'occupent se terminent avant ce jour : deux eventi qui ne se
+   chevauchent pas peuvent partager une ressource, même s'ils chevauchent
+   tous deux un troisième.
+2. Les eventi d'une tranche se chevauchent tous (même premier jour) : pour
+   chacune on construit une matrice de coûts sur les ressources libres et
+   on résout un problème d'affectation (algorithme hongrois / Kuhn-Munkres,
+   O(n³)) :
+     - mezzi   : costo_uscita + costo_km * km_ar
+     - tecnici : costo_km * km_ar + tariffa_oraria * ore * giorni
+   (km_ar = deposito -> luogo -> deposito, lu dans la matrice distanze)
+3. Quand les ressources libres manquent, l'affectation garde les eventi les
+   moins chers à servir ; les autres sont renvoyés dans `non_assegnati`
+   avec ce qui leur manque.
+
+Si scipy est installé, scipy.optimize.linear_sum_assignment est utilisé
+(même résultat, plus rapide) ; sinon l'implémentation pure Python ci-dessous.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from .distanze import MatriceDistanze
+from .models import Evento, Mezzo, Tecnico
+from .periodi import sovrapposizione_q
+
+try:  # dépendance optionnelle
+    from scipy.optimize import linear_sum_assignment as _scipy_lsa
+except Exception:  # pragma: no cover - scipy absent
+    _scipy_lsa = None
+
+ZERO = Decimal("0")
+INF = float("inf")
+MAX_TECNICI_PER_EVENTO = 10
+MAX_ORE = Decimal("24")
+
+
+# ---------------------------------------------------------------------------
+# Algorithme hongrois (matrice rectangulaire)
+# ---------------------------------------------------------------------------
+
+def _hungarian(cost: list[list[float]]) -> list[tuple[int, int]]:
+    """
+    Kuhn-Munkres avec potentiels, n lignes <= m colonnes.
+    Retourne les paires (ligne, colonne) d'une affectation de coût minimal
+    où chaque ligne reçoit une colonne distincte.
+    """
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)      # p[j] = ligne affectée à la colonne j (1-indexé)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [INF] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = INF
+            j1 = 0
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def risolvi_assegnazione(cost: list[list[float]]) -> list[tuple[int, int]]:
+    """
+    Affectation de coût minimal sur une matrice rectangulaire quelconque :
+    min(lignes, colonnes) paires (ligne, colonne), triées par ligne.
+    """
+    if not cost or not cost[0]:
+        return []
+    if _scipy_lsa is not None:
+        rows, cols = _scipy_lsa(cost)
+        return sorted(zip(rows.tolist(), cols.tolist()))
+    n, m = len(cost), len(cost[0])
+    if n <= m:
+        return sorted(_hungarian(cost))
+    transposed = [[cost[i][j] for i in range(n)] for j in range(m)]
+    return sorted((i, j) for j, i in _hungarian(transposed))
+
+
+# ---------------------------------------------------------------------------
+# Données métier
+# ---------------------------------------------------------------------------
+
+@dataclass
+class EventoLogistico:
+    id: int
+    titolo: str
+    location_index: int
+    da: date
+    a: date
+    km_ar: Decimal
+
+    @property
+    def giorni(self) -> int:
+        return (self.a - self.da).days + 1
+
+
+def _eventi_periodo(d0: date, d1: date) -> list[EventoLogistico]:
+    qs = (
+        Evento.objects
+        .filter(sovrapposizione_q(d0, d1))
+        .exclude(stato="annullato")
+        .values("id", "titolo", "location_index", "data_evento",
+                "data_evento_da", "data_evento_a", "distanza_km", "luogo_id")
+        .order_by("data_evento", "location_index", "id")
+    )
+    rows = list(qs)
+    matrice = MatriceDistanze.carica({r["luogo_id"] for r in rows})
+    out = []
+    for r in rows:
+        da = r["data_evento_da"] or r["data_evento"]
+        a = r["data_evento_a"] or da
+        if r["distanza_km"] is not None:
+            km_ar = Decimal(str(r["distanza_km"])) * 2
+        else:
+            km_ar = matrice.km_andata_ritorno(r["luogo_id"])
+        out.append(EventoLogistico(
+            id=r["id"], titolo=r["titolo"] or "", location_index=r["location_index"],
+            da=da, a=max(a, da), km_ar=km_ar,
+        ))
+    return out
+
+
+def _tranche(eventi: list[EventoLogistico]) -> list[list[EventoLogistico]]:
+    """Eventi regroupés par premier jour, dans l'ordre chronologique."""
+    per_giorno: dict[date, list[EventoLogistico]] = defaultdict(list)
+    for ev in sorted(eventi, key=lambda e: (e.da, e.location_index, e.id)):
+        per_giorno[ev.da].append(ev)
+    return [per_giorno[g] for g in sorted(per_giorno)]
+
+
+def _costo_mezzo(m: dict, ev: EventoLogistico) -> Decimal:
+    return Decimal(str(m["costo_uscita"] or 0)) + Decimal(str(m["costo_km"] or 0)) * ev.km_ar
+
+
+def _costo_tecnico(t: dict, ev: EventoLogistico, ore: Decimal) -> Decimal:
+    return (
+        Decimal(str(t["costo_km"] or 0)) * ev.km_ar
+        + Decimal(str(t["tariffa_oraria"] or 0)) * ore * ev.giorni
+    )
+
+
+def pianifica(d0: date, d1: date, ore: Decimal = Decimal("8"), tecnici_per_evento: int = 1,
+              eventi: Optional[list[EventoLogistico]] = None,
+              mezzi: Optional[list[dict]] = None,
+              tecnici: Optional[list[dict]] = None) -> dict:
+    """
+    Calcule l'affectation de coût minimal pour [d0, d1].
+
+    `eventi`, `mezzi`, `tecnici` peuvent être fournis directement (benchmark) ;
+    sinon ils sont lus en DB (3 requêtes + matrice distanze).
+    ValueError si `ore` ou `tecnici_per_evento` sont hors limites.
+    """
+    ore = Decimal(str(ore))
+    if not ZERO <= ore <= MAX_ORE:
+        raise ValueError(f"ore deve essere tra 0 e {MAX_ORE}.")
+    if not 0 <= int(tecnici_per_evento) <= MAX_TECNICI_PER_EVENTO:
+        raise ValueError(f"tecnici_per_evento deve essere tra 0 e {MAX_TECNICI_PER_EVENTO}.")
+    tecnici_per_evento = int(tecnici_per_evento)
+    if eventi is None:
+        eventi = _eventi_periodo(d0, d1)
+    if mezzi is None:
+        mezzi = list(Mezzo.objects.filter(attivo=True).order_by("targa")
+                     .values("id", "targa", "costo_km", "costo_uscita"))
+    if tecnici is None:
+        tecnici = list(Tecnico.objects.order_by("nome")
+                       .values("id", "nome", "costo_km", "tariffa_oraria"))
+
+    # ressource -> dernier jour où elle est prise (eventi déjà servis)
+    mezzo_fino: dict[int, date] = {}
+    tecnico_fino: dict[int, date] = {}
+
+    risultati = []
+    costo_totale = ZERO
+    for evs in _tranche(eventi):
+        giorno = evs[0].da
+        per_ev = {ev.id: {"evento": ev.id, "titolo": ev.titolo, "location_index": ev.location_index,
+                          "da": ev.da, "a": ev.a, "km_ar": ev.km_ar,
+                          "mezzo": None, "tecnici": [], "costo": ZERO} for ev in evs}
+
+        # --- mezzi : 1 mezzo par evento, parmi les mezzi libres ce jour-là ---
+        liberi = [m for m in mezzi if mezzo_fino.get(m["id"], date.min) < giorno]
+        if liberi:
+            cost = [[float(_costo_mezzo(m, ev)) for m in liberi] for ev in evs]
+            for i, j in risolvi_assegnazione(cost):
+                ev, m = evs[i], liberi[j]
+                c = _costo_mezzo(m, ev)
+                per_ev[ev.id]["mezzo"] = {"id": m["id"], "targa": m["targa"], "costo": c}
+                per_ev[ev.id]["costo"] += c
+                mezzo_fino[m["id"]] = ev.a
+
+        # --- tecnici : N postes par evento (lignes dupliquées) ---
+        liberi = [t for t in tecnici if tecnico_fino.get(t["id"], date.min) < giorno]
+        if liberi and tecnici_per_evento:
+            posti = [ev for ev in evs for _ in range(tecnici_per_evento)]
+            cost = [[float(_costo_tecnico(t, ev, ore)) for t in liberi] for ev in posti]
+            for i, j in risolvi_assegnazione(cost):
+                ev, t = posti[i], liberi[j]
+                c = _costo_tecnico(t, ev, ore)
+                per_ev[ev.id]["tecnici"].append({"id": t["id"], "nome": t["nome"], "costo": c})
+                per_ev[ev.id]["costo"] += c
+                tecnico_fino[t["id"]] = ev.a
+
+        for ev in evs:
+            row = per_ev[ev.id]
+            row["mancanti"] = {
+                "mezzo": int(row["mezzo"] is None),
+                "tecnici": tecnici_per_evento - len(row["tecnici"]),
+            }
+            row["completo"] = not any(row["mancanti"].values())
+            costo_totale += row["costo"]
+            risultati.append(row)
+
+    risultati.sort(key=lambda r: (r["da"], r["location_index"], r["evento"]))
+    return {
+        "assegnazioni": risultati,
+        "non_assegnati": [
+            {"evento": r["evento"], "titolo": r["titolo"], "da": r["da"], "a": r["a"], **r["mancanti"]}
+            for r in risultati if not r["completo"]
+        ],
+        "costo_totale": costo_totale,
+    }
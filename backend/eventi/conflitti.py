@@ -0,0 +1,139 @@
+# (chemin : /backend/eventi/conflitti.py)
+"""
+Détection d'overbooking : jours où les righe des eventi qui occupent le
+stock (confermati, fatturati, bozze sous option : cf. opzioni.py)
+demandent plus qu'il n'y a en stock (Materiale.scorta).
+
+    rileva(d0, d1)                 # scan complet : tous les materiali sur [d0, d1]
+    rileva(d0, d1, materiali=[3])  # restreint à quelques materiali
+    per_evento(ev)                 # incrémental : materiali + dates de CET evento,
+                                   # conflits où il est impliqué (2 requêtes)
+
+Un conflit = une plage de jours à occupation constante au-dessus du stock :
+
+    {"materiale": 3, "nome": "Faro LED", "scorta": 10,
+     "da": "2025-06-12", "a": "2025-06-13",
+     "impegnato": 14, "eccedenza": 4, "eventi": [41, 57]}
+
+Les articles "service" (tecnico / mezzo, righe is_tecnico / is_trasporto)
+n'ont pas de stock et sont ignorés.
+
+Au save (serializers.py, PUT righe), settings.EVENTI_OVERBOOKING :
+  - "avviso" (défaut) : les conflits sont renvoyés dans la réponse ("conflitti") ;
+  - "blocca" : un evento confermato / fatturato en overbooking est refusé (400).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+
+from . import disponibilita, opzioni
+from .models import Evento
+from .periodi import periodo
+
+STATI_BLOCCATI = ("confermato", "fatturato")
+
+
+class Overbooking(Exception):
+    """Save refusé en mode "blocca" ; `conflitti` = rapports de per_evento()."""
+
+    def __init__(self, conflitti: list[dict]):
+        super().__init__("Overbooking")
+        self.conflitti = conflitti
+
+
+def righe_qs(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+             include_holds: bool = True):
+    """Requête de disponibilita.righe_qs(), hors articles "service"."""
+    return (
+        disponibilita.righe_qs(d0, d1, materiali, include_holds)
+        .filter(is_tecnico=False, is_trasporto=False,
+                materiale__is_tecnico=False, materiale__is_messo=False)
+        .values(*disponibilita.CAMPI, "evento_id", "materiale__nome", "materiale__scorta")
+    )
+
+
+def _eccedenze(scorta: int, intervalli: list[tuple[date, date, int, int]],
+               d0: date, d1: date) -> list[dict]:
+    """
+    Balayage : +qta au début de chaque evento, -qta le lendemain de sa fin.
+    Retourne les plages [da, a] où l'occupation dépasse `scorta`.
+    """
+    delta: dict[date, list[tuple[int, int]]] = defaultdict(list)
+    for start, end, q, ev in intervalli:
+        start, end = max(start, d0), min(end, d1)
+        if end < start or q <= 0:
+            continue
+        delta[start].append((q, ev))
+        delta[end + timedelta(days=1)].append((-q, ev))
+
+    out = []
+    attivi: dict[int, int] = defaultdict(int)  # evento -> qta en cours
+    impegnato = 0
+    giorni = sorted(delta)
+    for i, giorno in enumerate(giorni[:-1]):
+        for q, ev in delta[giorno]:
+            impegnato += q
+            attivi[ev] += q
+            if not attivi[ev]:
+                del attivi[ev]
+        if impegnato > scorta:
+            out.append({
+                "da": giorno.isoformat(),
+                "a": (giorni[i + 1] - timedelta(days=1)).isoformat(),
+                "impegnato": impegnato,
+                "eccedenza": impegnato - scorta,
+                "eventi": sorted(attivi),
+            })
+    return out
+
+
+def _rapporti(rows: Iterable[dict], d0: date, d1: date) -> list[dict]:
+    per_mat: dict[int, dict] = {}
+    for r in rows:
+        m = per_mat.setdefault(r["materiale_id"], {
+            "nome": r["materiale__nome"], "scorta": int(r["materiale__scorta"] or 0), "intervalli": [],
+        })
+        start, end = disponibilita.periodo_riga(r)
+        m["intervalli"].append((start, end, int(r["qta"] or 0), r["evento_id"]))
+
+    out = []
+    for mid in sorted(per_mat):
+        m = per_mat[mid]
+        for c in _eccedenze(m["scorta"], m["intervalli"], d0, d1):
+            out.append({"materiale": mid, "nome": m["nome"], "scorta": m["scorta"], **c})
+    return out
+
+
+def rileva(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+           include_holds: bool = True) -> list[dict]:
+    """Tous les conflits sur [d0, d1] (une requête)."""
+    return _rapporti(righe_qs(d0, d1, materiali, include_holds), d0, d1)
+
+
+def per_evento(ev: Evento) -> list[dict]:
+    """Conflits impliquant `ev` : seulement ses materiali, seulement sa période."""
+    if not opzioni.conteggiato(ev):
+        return []  # annullato, ou bozza sans option : n'occupe pas le stock
+    materiali = set(
+        ev.righe.filter(is_tecnico=False, is_trasporto=False).values_list("materiale_id", flat=True)
+    )
+    if not materiali:
+        return []
+    d0, d1 = periodo(ev.data_evento, ev.data_evento_da, ev.data_evento_a)
+    return [c for c in rileva(d0, d1, materiali) if ev.pk in c["eventi"]]
+
+
+def modalita() -> str:
+    return getattr(settings, "EVENTI_OVERBOOKING", "avviso")
+
+
+def verifica_evento(ev: Evento) -> list[dict]:
+    """Contrôle au save ; lève Overbooking en mode "blocca" (à appeler dans la transaction)."""
+    conflitti = per_evento(ev)
+    if conflitti and modalita() == "blocca" and ev.stato in STATI_BLOCCATI:
+        raise Overbooking(conflitti)
+    return conflitti
@@ -0,0 +1,188 @@
+# (chemin : /backend/eventi/disponibilita.py)
+"""
+Disponibilités du stock : quantités engagées par materiale et par jour.
+
+Une seule règle, un seul chemin de requête, pour tous les endpoints
+(magazzino/status, /bookings, /calendar, catalogo/search, suggest,
+conflitti) :
+
+  - période d'un evento : periodi.periodo() (data_evento_da / data_evento_a,
+    sinon data_evento) ; copertura_giorni n'intervient PAS ;
+  - eventi comptés : opzioni.conteggiati_q() (confermati, fatturati, bozze
+    sous option ; include_holds=False -> réservations fermes seules) ;
+  - requête : righe qui chevauchent [d0, d1] (index span / (materiale, evento)),
+    agrégées en Python par tableau de différences (O(righe + jours)).
+
+    impegni(d0, d1)                  # {materiale_id: {date: qta}}, jours à 0 omis
+    impegni(d0, d1, materiali=[3])   # restreint à quelques materiali
+    picco(impegni(d0, d1)[3])        # pic d'occupation sur la fenêtre
+    impegni_per_magazzino(d0, d1, principale=1)
+                                     # {magazzino_id: {materiale_id: {date: qta}}},
+                                     # même requête, ventilée par Evento.magazzino
+
+impegni() est mis en cache (cache Django par défaut) sous la version du
+domaine "stock" (versioni_dati) : toute écriture sur eventi / righe /
+materiali change la clé, rien n'est servi périmé.
+settings.EVENTI_CACHE_DISPONIBILITA = durée en secondes (0 = pas de cache).
+
+`manage.py golden_disponibilita` vérifie le service contre un calcul naïf
+jour par jour et compare les payloads des endpoints à un instantané.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import date, timedelta
+from typing import Callable, Hashable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import opzioni, versioni_dati
+from .models import RigaEvento
+from .periodi import periodo, sovrapposizione_q
+
+# colonnes lues par per_giorno()
+CAMPI = ("materiale_id", "qta", "evento__data_evento", "evento__data_evento_da", "evento__data_evento_a")
+CAMPI_MAGAZZINO = CAMPI + ("evento__magazzino_id",)
+
+Impegni = dict[int, dict[date, int]]
+
+
+def righe_qs(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+             include_holds: bool = True):
+    """Righe des eventi comptés qui chevauchent [d0, d1] (queryset, sans .values())."""
+    qs = (
+        RigaEvento.objects
+        .filter(sovrapposizione_q(d0, d1, prefix="evento__"))
+        .filter(opzioni.conteggiati_q("evento__", include_holds))
+    )
+    if materiali is not None:
+        qs = qs.filter(materiale_id__in=list(materiali))
+    return qs
+
+
+def periodo_riga(r: dict) -> tuple[date, date]:
+    return periodo(r["evento__data_evento"], r["evento__data_evento_da"], r["evento__data_evento_a"])
+
+
+def _materiale(r: dict) -> int:
+    return r["materiale_id"]
+
+
+def per_giorno(righe: Iterable[dict], d0: date, d1: date, chiave: Callable[[dict], Hashable] = _materiale) -> dict:
+    """
+    Lignes CAMPI -> {materiale_id: {date: qta}} sur [d0, d1] (jours à 0 omis).
+    `chiave` : regroupement des lignes (défaut : materiale_id).
+    """
+    n = (d1 - d0).days + 1
+    diff: dict[Hashable, list[int]] = {}
+    for r in righe:
+        q = int(r["qta"] or 0)
+        if not q:
+            continue
+        start, end = periodo_riga(r)
+        start, end = max(start, d0), min(end, d1)
+        if end < start:
+            continue
+        k = chiave(r)
+        arr = diff.get(k)
+        if arr is None:
+            arr = diff[k] = [0] * (n + 1)
+        arr[(start - d0).days] += q
+        arr[(end - d0).days + 1] -= q
+
+    out = {}
+    for k, arr in diff.items():
+        giorni, cur = {}, 0
+        for i in range(n):
+            cur += arr[i]
+            if cur:
+                giorni[d0 + timedelta(days=i)] = cur
+        out[k] = giorni
+    return out
+
+
+def _per_magazzino(righe: Iterable[dict], d0: date, d1: date, principale: Optional[int]) -> dict:
+    """Lignes CAMPI_MAGAZZINO -> {magazzino: {materiale: {date: qta}}} ; sans magazzino = principale."""
+    def chiave(r):
+        return r["evento__magazzino_id"] or principale, r["materiale_id"]
+
+    out: dict[Optional[int], Impegni] = {}
+    for (mag, mid), giorni in per_giorno(righe, d0, d1, chiave).items():
+        out.setdefault(mag, {})[mid] = giorni
+    return out
+
+
+def picco(giorni: Optional[dict[date, int]]) -> int:
+    return max(giorni.values(), default=0) if giorni else 0
+
+
+def durata_cache() -> int:
+    return max(0, int(getattr(settings, "EVENTI_CACHE_DISPONIBILITA", 300)))
+
+
+def _chiave(marca: str, vista: str, d0: date, d1: date, materiali: Optional[list[int]],
+            include_holds: bool) -> str:
+    mats = "*" if materiali is None else ",".join(map(str, sorted(set(materiali))))
+    if len(mats) > 64:
+        mats = hashlib.sha1(mats.encode()).hexdigest()
+    return f"disponibilita:{marca}:{vista}:{d0.isoformat()}:{d1.isoformat()}:{int(include_holds)}:{mats}"
+
+
+def _in_cache(vista: str, calcola: Callable[[list], dict], campi: tuple, d0: date, d1: date,
+              materiali: Optional[Iterable[int]], include_holds: bool) -> dict:
+    if materiali is not None:
+        materiali = list(materiali)
+    durata = durata_cache()
+    chiave = None
+    if durata:
+        chiave = _chiave(versioni_dati.marca(versioni_dati.STOCK), vista, d0, d1, materiali, include_holds)
+        got = cache.get(chiave)
+        if got is not None:
+            return got
+    out = calcola(list(righe_qs(d0, d1, materiali, include_holds).values(*campi)))
+    if chiave:
+        cache.set(chiave, out, durata)
+    return out
+
+
+async def _in_cache_async(vista: str, calcola: Callable[[list], dict], campi: tuple, d0: date, d1: date,
+                          materiali: Optional[Iterable[int]], include_holds: bool) -> dict:
+    if materiali is not None:
+        materiali = list(materiali)
+    durata = durata_cache()
+    chiave = None
+    if durata:
+        chiave = _chiave(await versioni_dati.amarca(versioni_dati.STOCK), vista, d0, d1, materiali, include_holds)
+        got = await cache.aget(chiave)
+        if got is not None:
+            return got
+    out = calcola([r async for r in righe_qs(d0, d1, materiali, include_holds).values(*campi)])
+    if chiave:
+        await cache.aset(chiave, out, durata)
+    return out
+
+
+def impegni(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+            include_holds: bool = True) -> Impegni:
+    """Quantités engagées par materiale et par jour sur [d0, d1] (une requête, en cache)."""
+    return _in_cache("tot", lambda righe: per_giorno(righe, d0, d1), CAMPI,
+                     d0, d1, materiali, include_holds)
+
+
+async def aimpegni(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+                   include_holds: bool = True) -> Impegni:
+    """impegni() pour les vues async (même clé de cache)."""
+    return await _in_cache_async("tot", lambda righe: per_giorno(righe, d0, d1), CAMPI,
+                                 d0, d1, materiali, include_holds)
+
+
+def impegni_per_magazzino(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+                          include_holds: bool = True, principale: Optional[int] = None) -> dict:
+    """
+    impegni() ventilé par magazzino de l'evento : {magazzino_id: {materiale_id: {date: qta}}}.
+    Les eventi sans magazzino comptent pour `principale`. Une requête, quel
+    que soit le nombre de magazzini ; la somme des magazzini = impegni().
+    """
+    return _in_cache(f"mag{principale}", lambda righe: _per_magazzino(righe, d0, d1, principale),
+                     CAMPI_MAGAZZINO, d0, d1, materiali, include_holds)
@@ -0,0 +1,132 @@
+# (chemin : /backend/eventi/distanze.py)
+"""
+Matrice des distances (deposito -> luogo, luogo -> luogo).
+
+Les distances viennent de la table DistanzaLuogo (saisie manuelle ou dataset
+de routing importé hors-ligne) : rien n'est recalculé à la volée.
+
+    m = MatriceDistanze.carica([luogo_a, luogo_b, luogo_c])   # 2 requêtes
+    m.km(None, luogo_a)          # deposito -> A       (dict, O(1))
+    m.km(luogo_a, luogo_b)       # A -> B (ou B -> A si seul le retour existe)
+    m.percorso([a, b, c])        # giro deposito -> A -> B -> C -> deposito
+
+Si une distance deposito -> luogo manque dans la matrice, on retombe sur les
+champs historiques Luogo.distanza_km / Luogo.distanza_km_ar.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db.models import OuterRef, Q, Subquery
+
+from .models import DistanzaLuogo, Luogo
+
+ZERO = Decimal("0")
+DEPOSITO = None  # origine "deposito" dans la matrice
+
+
+def km_deposito_subquery(luogo_ref: str = "luogo_id"):
+    """
+    Sous-requête SQL : km deposito -> luogo depuis la matrice.
+    À utiliser dans un Coalesce(...) pour annoter un queryset d'eventi.
+    """
+    return Subquery(
+        DistanzaLuogo.objects
+        .filter(origine__isnull=True, destinazione_id=OuterRef(luogo_ref))
+        .values("km")[:1]
+    )
+
+
+class MatriceDistanze:
+    """Distances chargées en mémoire ; chaque lookup est un accès dict."""
+
+    def __init__(self, righe: Iterable[tuple], fallback: Optional[dict] = None):
+        # (origine_id | None, destinazione_id) -> km
+        self._km: dict[tuple[Optional[int], int], Decimal] = {}
+        for o, d, km in righe:
+            self._km[(o, d)] = Decimal(str(km))
+        # luogo_id -> (distanza_km, distanza_km_ar) historiques
+        self._fallback = fallback or {}
+
+    @classmethod
+    def carica(cls, luoghi: Optional[Iterable[int]] = None) -> "MatriceDistanze":
+        """
+        Charge la matrice (entière, ou restreinte aux luoghi donnés) en
+        2 requêtes : lignes DistanzaLuogo + champs de repli des Luoghi.
+        """
+        qs = DistanzaLuogo.objects.all()
+        lqs = Luogo.objects.all()
+        if luoghi is not None:
+            ids = {int(i) for i in luoghi if i is not None}
+            qs = qs.filter(
+                Q(origine__isnull=True) | Q(origine_id__in=ids),
+                destinazione_id__in=ids,
+            )
+            lqs = lqs.filter(pk__in=ids)
+        righe = qs.values_list("origine_id", "destinazione_id", "km")
+        fallback = {
+            pk: (Decimal(str(d or 0)), Decimal(str(ar or 0)))
+            for pk, d, ar in lqs.values_list("pk", "distanza_km", "distanza_km_ar")
+        }
+        return cls(righe, fallback)
+
+    # ---- lookups ----
+
+    def km(self, origine: Optional[int], destinazione: Optional[int]) -> Optional[Decimal]:
+        """Aller simple origine -> destinazione (None = deposito). None si inconnu."""
+        if origine == destinazione:
+            return ZERO
+        if destinazione is None:
+            origine, destinazione = destinazione, origine
+        val = self._km.get((origine, destinazione))
+        if val is None and origine is not None:
+            val = self._km.get((destinazione, origine))
+        if val is None and origine is None:
+            d, _ = self._fallback.get(destinazione, (ZERO, ZERO))
+            if d:
+                val = d
+        return val
+
+    def km_deposito(self, luogo: int) -> Decimal:
+        return self.km(DEPOSITO, luogo) or ZERO
+
+    def km_andata_ritorno(self, luogo: int) -> Decimal:
+        """Deposito -> luogo -> deposito."""
+        andata = self._km.get((DEPOSITO, luogo))
+        if andata is None:
+            _, ar = self._fallback.get(luogo, (ZERO, ZERO))
+            if ar:
+                return ar
+        return self.km_deposito(luogo) * 2
+
+    def percorso(self, luoghi: list[int], ritorno: bool = True) -> dict:
+        """
+        Giro d'una giornata multi-luogo : deposito -> L1 -> L2 ... [-> deposito].
+        Retourne les tratte et les tratte sans distance connue.
+        """
+        tappe = [DEPOSITO] + list(luoghi) + ([DEPOSITO] if ritorno else [])
+        tratte = []
+        mancanti = []
+        totale = ZERO
+        for a, b in zip(tappe, tappe[1:]):
+            km = self.km(a, b)
+            if km is None:
+                mancanti.append({"da": a, "a": b})
+            else:
+                totale += km
+            tratte.append({"da": a, "a": b, "km": km})
+        return {"tratte": tratte, "km_totale": totale, "mancanti": mancanti}
+
+
+def km_deposito(luogo_id: Optional[int]) -> Decimal:
+    """Lookup ponctuel deposito -> luogo (2 requêtes)."""
+    if not luogo_id:
+        return ZERO
+    return MatriceDistanze.carica([luogo_id]).km_deposito(luogo_id)
+
+
+def km_andata_ritorno(luogo_id: Optional[int]) -> Decimal:
+    if not luogo_id:
+        return ZERO
+    return MatriceDistanze.carica([luogo_id]).km_andata_ritorno(luogo_id)
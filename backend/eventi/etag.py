@@ -0,0 +1,71 @@
+# (chemin : /backend/eventi/etag.py)
+"""
+ETag / 304 pour les vues "année" (sinottico, calendrier des locations).
+
+L'ETag est dérivé des versions des domaines lus par la vue (une seule
+requête sur VersioneDati, cf. versioni_dati.py) et de l'URL complète
+(l'année demandée). Si le client renvoie le même ETag (If-None-Match), on
+répond 304 sans recalculer l'année.
+
+    @con_etag(etag_magazzino_calendar)
+    def magazzino_calendar(request): ...
+
+Fonctionne sur les vues sync (DRF incluses, via method_decorator) et async.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from . import versioni_dati
+from .versioni_dati import CALENDARIO, CATALOGO, STOCK
+
+
+def _etag(request, *domini) -> str:
+    marca = versioni_dati.marca(*domini)
+    return hashlib.md5(f"{request.get_full_path()}|{marca}".encode()).hexdigest()
+
+
+def etag_location_calendar(request, *args, **kwargs) -> str:
+    """/api/calendario/location-calendar : eventi + noms cliente / luogo."""
+    return _etag(request, CALENDARIO)
+
+
+def etag_magazzino_calendar(request, *args, **kwargs) -> str:
+    """/api/magazzino/calendar : eventi (dates, stato), righe (qta), materiali."""
+    return _etag(request, STOCK, CATALOGO)
+
+
+def _finalizza(request, response, etag):
+    if request.method in ("GET", "HEAD") and response.status_code in (200, 304):
+        response.headers.setdefault("ETag", etag)
+        # le navigateur garde la réponse mais revalide à chaque fois (-> 304)
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def con_etag(etag_func):
+    """Comme django.views.decorators.http.condition, + vues async et Cache-Control."""
+
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def inner(request, *args, **kwargs):
+                etag = quote_etag(await sync_to_async(etag_func)(request, *args, **kwargs))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await func(request, *args, **kwargs)
+                return _finalizza(request, response, etag)
+        else:
+            @wraps(func)
+            def inner(request, *args, **kwargs):
+                etag = quote_etag(etag_func(request, *args, **kwargs))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = func(request, *args, **kwargs)
+                return _finalizza(request, response, etag)
+        return inner
+
+    return decorator
@@ -0,0 +1,155 @@
+# (chemin : /backend/eventi/giacenze.py)
+"""
+Stock physique : MagazzinoItem (giacenza) est la source, Materiale.scorta
+le total dénormalisé que lisent toutes les disponibilités (disponibilita.py,
+conflitti.py, catalogue...) : une colonne, jamais d'agrégat par materiale.
+
+Une giacenza par (materiale, magazzino) ; scorta = total tous magazzini.
+Les deux restent égaux, dans la transaction de l'écriture (signals.py) :
+
+  - giacenza écrite (admin, code)  -> scorta += écart  (UPDATE ... F())
+  - scorta écrite (API materiali)  -> giacenza du magazzino principale += écart
+                                      (création : giacenza = scorta) ; une baisse
+                                      qui la rendrait négative est refusée
+  - trasferisci()                  -> giacenze de deux magazzini, scorta inchangée,
+                                      journal Trasferimento
+
+scorta et qta sont, elles, enregistrées en valeur absolue par save() :
+l'écart se calcule sur la valeur en base lue sous SELECT ... FOR UPDATE
+(pre_save), et Materiale.save / MagazzinoItem.save sont atomiques. Deux
+écritures concurrentes du même objet passent donc l'une après l'autre, la
+seconde relisant la valeur de la première (la dernière gagne, les deux
+côtés restent égaux). Les écarts reportés sur l'autre côté passent par des
+UPDATE ... SET x = x + delta, qui s'additionnent entre objets différents.
+
+`manage.py ricalcola_scorte --verifica` contrôle l'égalité (une requête),
+sans --verifica elle répare les écarts.
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import versioni_dati
+from .models import Magazzino, MagazzinoItem, Materiale, Trasferimento
+
+
+class GiacenzaInsufficiente(ValueError):
+    """Trasferimento ou baisse de scorta refusés : pas assez de stock (-> 400 avec `detail`)."""
+
+
+def magazzino_principale(using: Optional[str] = None) -> Magazzino:
+    """Le magazzino principale (créé s'il manque : une giacenza a toujours un magazzino)."""
+    return Magazzino.objects.using(using).get_or_create(principale=True, defaults={"nome": "Deposito"})[0]
+
+
+def giacenza_modificata(materiale_id: int, delta: int, using: Optional[str] = None) -> None:
+    """Une giacenza a bougé de `delta` : même écart sur Materiale.scorta."""
+    if not delta:
+        return
+    Materiale.objects.using(using).filter(pk=materiale_id).update(scorta=F("scorta") + delta)
+    versioni_dati.bump_modello(Materiale, using=using)  # update() : pas de post_save
+
+
+def scorta_minima(materiale_id: Optional[int], using: Optional[str] = None) -> int:
+    """
+    Plus petite scorta acceptée : les giacenze hors magazzino principale (une
+    baisse ne touche que le principale ; le reste se rapatrie par trasferimento).
+    """
+    if materiale_id is None:
+        return 0
+    return (MagazzinoItem.objects.using(using)
+            .filter(materiale_id=materiale_id, magazzino__principale=False)
+            .aggregate(n=Coalesce(Sum("qta"), 0))["n"])
+
+
+def scorta_modificata(materiale: Materiale, prima: Optional[int], using: Optional[str] = None) -> None:
+    """
+    Materiale.scorta écrite directement (`prima` = valeur en base, None à la
+    création) : l'écart va sur sa giacenza, créée au besoin. Une baisse qui
+    rendrait la giacenza du principale négative lève GiacenzaInsufficiente
+    (la transaction de l'écriture est annulée).
+    """
+    delta = int(materiale.scorta or 0) - int(prima or 0)
+    if prima is not None and not delta:
+        return
+    principale = magazzino_principale(using)
+    qs = MagazzinoItem.objects.using(using).filter(materiale_id=materiale.pk, magazzino=principale)
+    # querysets : pas de signal MagazzinoItem, la scorta est déjà à jour
+    if delta < 0:
+        # condition dans l'UPDATE : deux baisses concurrentes ne passent pas sous zéro
+        if not qs.filter(qta__gte=-delta).update(qta=F("qta") + delta, updated_at=timezone.now()):
+            giacenza = qs.values_list("qta", flat=True).first() or 0
+            raise GiacenzaInsufficiente(
+                f"Giacenza insufficiente nel magazzino {principale.nome}: {giacenza} presenti, "
+                f"{-delta} da togliere (il resto va prima trasferito)."
+            )
+        return
+    if not qs.update(qta=F("qta") + delta, updated_at=timezone.now()):
+        qs.bulk_create([MagazzinoItem(materiale_id=materiale.pk, magazzino=principale, qta=delta)])
+
+
+def trasferisci(materiale_id: int, da_id: int, a_id: int, qta: int,
+                evento_id: Optional[int] = None, note: str = "") -> Trasferimento:
+    """
+    Déplace `qta` d'un magazzino à l'autre (giacenze verrouillées, une
+    transaction) et l'inscrit au journal. La scorta totale ne bouge pas.
+    """
+    if qta <= 0:
+        raise ValueError("La quantità deve essere positiva.")
+    if da_id == a_id:
+        raise ValueError("Magazzino di partenza e di arrivo coincidono.")
+    with transaction.atomic():
+        righe = {
+            g.magazzino_id: g
+            for g in MagazzinoItem.objects.select_for_update()
+            .filter(materiale_id=materiale_id, magazzino_id__in=[da_id, a_id]).order_by("pk")
+        }
+        partenza = righe.get(da_id)
+        if partenza is None or partenza.qta < qta:
+            raise GiacenzaInsufficiente(
+                f"Giacenza insufficiente: {partenza.qta if partenza else 0} disponibili, {qta} richiesti."
+            )
+        ora = timezone.now()
+        # querysets : pas de signal, la scorta (total) est inchangée
+        MagazzinoItem.objects.filter(pk=partenza.pk).update(qta=F("qta") - qta, updated_at=ora)
+        if a_id in righe:
+            MagazzinoItem.objects.filter(pk=righe[a_id].pk).update(qta=F("qta") + qta, updated_at=ora)
+        else:
+            MagazzinoItem.objects.bulk_create([MagazzinoItem(materiale_id=materiale_id, magazzino_id=a_id, qta=qta)])
+        t = Trasferimento.objects.create(materiale_id=materiale_id, da_id=da_id, a_id=a_id, qta=qta,
+                                         evento_id=evento_id, note=note)
+        versioni_dati.bump(versioni_dati.STOCK)  # disponibilités par magazzino
+    return t
+
+
+def _totale_giacenze():
+    return Coalesce(Subquery(
+        MagazzinoItem.objects.filter(materiale_id=OuterRef("pk")).order_by()
+        .values("materiale_id").annotate(t=Sum("qta")).values("t")
+    ), 0)
+
+
+def differenze():
+    """Materiali dont la scorta ne correspond pas à leurs giacenze (une requête)."""
+    return (
+        Materiale.objects.annotate(giacenze=_totale_giacenze())
+        .exclude(scorta=F("giacenze"))
+        .values("id", "nome", "scorta", "giacenze")
+        .order_by("id")
+    )
+
+
+def ricalcola(materiali: Optional[Iterable[int]] = None) -> int:
+    """scorta = total des giacenze (réparation ; un UPDATE). Retourne le nb de materiali touchés."""
+    qs = Materiale.objects.all()
+    if materiali is not None:
+        qs = qs.filter(pk__in=list(materiali))
+    n = qs.update(scorta=_totale_giacenze())
+    if n:
+        versioni_dati.bump_modello(Materiale)
+    return n
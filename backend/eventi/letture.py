@@ -0,0 +1,336 @@
+# (chemin : /backend/eventi/letture.py)
+"""
+Endpoints de lecture "tableau de bord" : requêtes + mise en forme.
+
+Chaque endpoint est découpé en deux :
+  - un queryset `.values(...)` (aucun accès DB tant qu'il n'est pas itéré) ;
+  - un builder pur qui transforme les lignes en payload JSON.
+
+Les vues sync DRF (views.py, views_calendario.py) font `list(qs)`, les vues
+async (views_async.py) `[r async for r in qs]` : même SQL, même réponse.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import models
+from django.db.models import F, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Evento, Materiale, RigaEvento
+from . import disponibilita, slots
+from .periodi import sovrapposizione_q
+
+
+class ParametroNonValido(ValueError):
+    """Paramètre de requête invalide -> 400 avec `detail`/`error`."""
+
+
+def _days(d0: date, d1: date) -> list[date]:
+    return [d0 + timedelta(days=i) for i in range((d1 - d0).days + 1)]
+
+
+def _iso(d) -> Optional[str]:
+    return d.isoformat() if d else None
+
+
+# ---------------------------------------------------------------------------
+# /api/calendario/location-calendar?year=YYYY  |  ?from=YYYY-MM-DD&to=YYYY-MM-DD
+# ---------------------------------------------------------------------------
+
+MAX_GIORNI_FINESTRA = 731  # 2 ans : borne le coût d'une fenêtre arbitraire
+
+
+def parse_year(raw) -> int:
+    try:
+        return int(raw or date.today().year)
+    except ValueError:
+        return date.today().year
+
+
+def parse_finestra(params) -> tuple[date, date, Optional[int]]:
+    """
+    (début, fin, année) : ?year=YYYY (défaut : année courante) ou une
+    fenêtre quelconque ?from=&to= (année = None).
+    """
+    d_from, d_to = params.get("from"), params.get("to")
+    if d_from or d_to:
+        try:
+            d0 = date.fromisoformat(d_from or d_to)
+            d1 = date.fromisoformat(d_to or d_from)
+        except ValueError:
+            raise ParametroNonValido("Bad date format. Use YYYY-MM-DD.")
+        if d1 < d0:
+            raise ParametroNonValido("'to' must be >= 'from'.")
+        if (d1 - d0).days >= MAX_GIORNI_FINESTRA:
+            raise ParametroNonValido(f"Window too large (max {MAX_GIORNI_FINESTRA} days).")
+        return d0, d1, None
+    year = parse_year(params.get("year"))
+    if not 1 <= year <= 9999:
+        raise ParametroNonValido("Bad 'year' parameter.")
+    return date(year, 1, 1), date(year, 12, 31), year
+
+
+def location_calendar_qs(d0: date, d1: date):
+    # eventi qui chevauchent la fenêtre, y compris ceux commencés avant
+    # (multi-jours à cheval sur deux années)
+    return (
+        Evento.objects.filter(sovrapposizione_q(d0, d1))
+        .order_by()
+        .values("id", "data_evento", "data_evento_da", "data_evento_a", "location_index",
+                "stato", "titolo", "cliente__nome", "luogo__nome")
+    )
+
+
+def location_calendar_runs(d0: date, d1: date, rows: Iterable[dict]) -> list[dict]:
+    """Une entrée par evento : période [start, end] coupée à la fenêtre."""
+    runs = []
+    for r in rows:
+        start = r["data_evento_da"] or r["data_evento"]
+        end = r["data_evento_a"] or start
+        start, end = max(start, d0), min(end, d1)
+        if end < start:
+            continue
+        runs.append({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "slot": r["location_index"],
+            "evento": r["id"],
+            "stato": r["stato"],
+            "titolo": r["titolo"] or "",
+            "cliente_nome": r["cliente__nome"] or "",
+            "luogo_nome": r["luogo__nome"] or "",
+        })
+    runs.sort(key=lambda x: (x["start"], x["slot"], x["evento"]))
+    return runs
+
+
+def location_calendar_payload(d0: date, d1: date, year: Optional[int], rows: Iterable[dict],
+                              formato: str = "giorni") -> dict:
+    """
+    formato="giorni" (défaut, forme historique) : days + une cellule
+        {date, slot, count, ...} par jour occupé.
+    formato="runs" : pas de liste de jours, une entrée par evento
+        {start, end, slot, evento, ...} : ni liste de 365 jours, ni cellule
+        répétée pour chaque jour d'un evento multi-jours.
+    """
+    out: dict = {"year": year} if year is not None else {}
+    if formato == "runs" or year is None:
+        out.update({"from": d0.isoformat(), "to": d1.isoformat()})
+    runs = location_calendar_runs(d0, d1, rows)
+    if formato == "runs":
+        out["slots"] = list(range(1, slots.num_locations() + 1))
+        out["runs"] = runs
+        return out
+
+    bookings = []
+    for run in runs:
+        cell = {k: run[k] for k in ("stato", "titolo", "cliente_nome", "luogo_nome")}
+        for d in _days(date.fromisoformat(run["start"]), date.fromisoformat(run["end"])):
+            bookings.append({"date": d.isoformat(), "slot": run["slot"], "count": 1, **cell})
+    bookings.sort(key=lambda b: (b["date"], b["slot"]))
+    out["days"] = [d.isoformat() for d in _days(d0, d1)]
+    out["slots"] = list(range(1, slots.num_locations() + 1))
+    out["bookings"] = bookings
+    return out
+
+
+# ---------------------------------------------------------------------------
+# /api/eventi/mese?year=YYYY&month=M
+# ---------------------------------------------------------------------------
+
+def month_bounds(y: int, m: int) -> tuple[date, date]:
+    month_start = date(y, m, 1)
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return month_start, next_month - timedelta(days=1)
+
+
+def eventi_mese_qs(month_start: date, month_end: date):
+    return (
+        Evento.objects
+        # eventi simples (data_evento) ou multi-jours qui chevauchent le mois.
+        # Pas d'ORDER BY en SQL : SQLite préférerait alors parcourir tout l'index
+        # (data_evento, location_index) plutôt que le MULTI-INDEX OR ; le tri
+        # (un mois d'eventi) est fait dans eventi_mese_payload().
+        .filter(sovrapposizione_q(month_start, month_end))
+        .order_by()
+        .values("id", "titolo", "data_evento", "data_evento_da", "data_evento_a",
+                "location_index", "stato", "cliente__nome", "offerta_stato", "saldo_state")
+    )
+
+
+def eventi_mese_payload(rows: Iterable[dict]) -> list[dict]:
+    data = []
+    for r in sorted(rows, key=lambda r: (r["data_evento"], r["location_index"], r["id"])):
+        # pour le calendrier on garde un champ "data_evento" = début
+        start = r["data_evento_da"] or r["data_evento"]
+        data.append({
+            "id": r["id"],
+            "titolo": r["titolo"],
+            "data_evento": _iso(start),
+            "data_evento_da": _iso(r["data_evento_da"]),
+            "data_evento_a": _iso(r["data_evento_a"]),
+            "location_index": r["location_index"],
+            "stato": r["stato"],
+            "cliente_nome": r["cliente__nome"],
+            "offerta_stato": r["offerta_stato"],
+            "saldo_state": r["saldo_state"],
+        })
+    return data
+
+
+# ---------------------------------------------------------------------------
+# /api/magazzino/status?from=&to=&materials=1,2,3
+# ---------------------------------------------------------------------------
+
+def parse_status_params(params) -> tuple[date, date, Optional[list[int]]]:
+    dfrom_str = params.get("from") or params.get("date") or params.get("day")
+    dto_str = params.get("to") or dfrom_str
+    if not dfrom_str:
+        raise ParametroNonValido("Missing 'from' or 'date' parameter.")
+    try:
+        dfrom = date.fromisoformat(dfrom_str)
+        dto = date.fromisoformat(dto_str)
+    except ValueError:
+        raise ParametroNonValido("Bad date format. Use YYYY-MM-DD.")
+    ids_param = params.get("materials") or params.get("material")
+    mids = None
+    if ids_param:
+        try:
+            mids = [int(x) for x in str(ids_param).split(",") if x.strip()]
+        except ValueError:
+            raise ParametroNonValido("Bad 'materials' parameter.")
+    return dfrom, max(dto, dfrom), mids
+
+
+def materiali_status_qs(mids: Optional[list[int]]):
+    qs = Materiale.objects.all()
+    if mids is not None:
+        qs = qs.filter(id__in=mids)
+    return qs.values("id", "nome", "scorta")
+
+
+def magazzino_status_payload(dfrom: date, dto: date, mats: list[dict], impegni: dict) -> dict:
+    """
+    `impegni` = disponibilita.impegni(dfrom, dto, mids) : toute la durée de
+    l'événement (data_evento_da / data_evento_a ou data_evento).
+    """
+    days = _days(dfrom, dto)
+    out = {"days": [d.isoformat() for d in days], "materials": []}
+    for m in mats:
+        stock = int(m["scorta"] or 0)
+        row = {"id": m["id"], "nome": m["nome"], "stock": stock, "by_day": []}
+        for d in days:
+            used = impegni.get(m["id"], {}).get(d, 0)
+            free = max(0, stock - used)
+            if stock == 0:
+                status_s = "ko"
+            elif free == 0:
+                status_s = "warn"
+            else:
+                status_s = "ok"
+            row["by_day"].append({"date": d.isoformat(), "used": used, "free": free, "status": status_s})
+        out["materials"].append(row)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# /api/magazzino/bookings?material=<id>&from=&to=&on=
+# ---------------------------------------------------------------------------
+
+def righe_bookings_qs(material_id: int, d_from: date, d_to: date, include_holds: bool = True):
+    return (
+        disponibilita.righe_qs(d_from, d_to, [material_id], include_holds)
+        .order_by("evento_id", "id")  # ordre de l'index (materiale, evento)
+        .values(*disponibilita.CAMPI, "evento_id", "evento__titolo", "evento__stato",
+                "evento__cliente__nome", "evento__location_index")
+    )
+
+
+def magazzino_bookings_payload(materiale_id: int, scorta, righe: Iterable[dict],
+                               d_from: date, d_to: date, d_on: Optional[date]) -> dict:
+    righe = list(righe)
+    rows = []
+    for r in righe:
+        ev_start, ev_end = disponibilita.periodo_riga(r)
+        rows.append({
+            "evento_id": r["evento_id"],
+            "titolo": r["evento__titolo"],
+            "stato": r["evento__stato"],
+            "cliente": r["evento__cliente__nome"],
+            "data_evento_da": ev_start.isoformat(),
+            "data_evento_a": ev_end.isoformat(),
+            "qta": int(r["qta"] or 0),
+            "location_index": r["evento__location_index"],
+        })
+    # même agrégation que les autres endpoints, sur les lignes déjà lues
+    per_day = disponibilita.per_giorno(righe, d_from, d_to).get(materiale_id, {})
+
+    scorta = int(scorta or 0)
+    prenotato_max = disponibilita.picco(per_day)
+
+    return {
+        "materiale": materiale_id,
+        "scorta": scorta,
+        # pour compatibilité avec l'UI : "Prenotato (ON)"
+        "prenotato": per_day.get(d_on, 0) if d_on is not None else prenotato_max,
+        "prenotato_max": prenotato_max,
+        "disponibile": max(0, scorta - prenotato_max),
+        "per_day": {d.isoformat(): per_day.get(d, 0) for d in _days(d_from, d_to)},
+        "rows": rows,
+    }
+
+
+# ---------------------------------------------------------------------------
+# /api/eventi/ : totaux de stock et des righe calculés en SQL
+# ---------------------------------------------------------------------------
+
+def _somma_righe(expr: str):
+    """SUM(expr) des righe de l'evento courant (sous-requête corrélée)."""
+    return Subquery(
+        RigaEvento.objects.filter(evento_id=OuterRef("pk")).order_by()
+        .annotate(t=Func(F(expr), function="SUM")).values("t"),
+    )
+
+
+def annota_stock(qs):
+    """
+    Ajoute stock_tot_scorta / stock_tot_dispon (+ stock_qta_tot) en
+    sous-requêtes corrélées : une seule requête SQL quelle que soit la
+    taille de la liste (liste mensile, détail, EventStockBadge).
+
+      - stock_tot_scorta : somme des scorte des matériels (distincts) utilisés
+      - stock_tot_dispon : max(0, stock_tot_scorta - qta totale de l'evento)
+    """
+    scorta_materiali = Subquery(
+        Materiale.objects
+        .filter(pk__in=RigaEvento.objects.filter(evento_id=OuterRef(OuterRef("pk"))).values("materiale_id"))
+        .order_by()
+        .annotate(t=Func(F("scorta"), function="SUM")).values("t"),
+        output_field=models.IntegerField(),
+    )
+    return (
+        qs.annotate(
+            stock_tot_scorta=Coalesce(scorta_materiali, 0),
+            stock_qta_tot=Coalesce(_somma_righe("qta"), 0, output_field=models.IntegerField()),
+        )
+        .annotate(stock_tot_dispon=Greatest(F("stock_tot_scorta") - F("stock_qta_tot"), 0))
+    )
+
+
+def annota_riepilogo(qs):
+    """annota_stock() + n_righe et totale_importo (?view=summary, sans righe)."""
+    n_righe = Subquery(
+        RigaEvento.objects.filter(evento_id=OuterRef("pk")).order_by()
+        .annotate(n=Func(F("id"), function="COUNT")).values("n"),
+        output_field=models.IntegerField(),
+    )
+    return annota_stock(qs).annotate(
+        n_righe=Coalesce(n_righe, 0),
+        totale_importo=Coalesce(
+            _somma_righe("importo"), Value(Decimal("0")),
+            output_field=models.DecimalField(max_digits=14, decimal_places=2),
+        ),
+    )
@@ -0,0 +1,156 @@
+# (chemin : /backend/eventi/logistica.py)
+"""
+Calcul des coûts logistiques (mezzi + tecnici) pour un ou plusieurs eventi.
+
+Tout est renvoyé en Decimal : le formatage "1.234,56 €" se fait uniquement
+dans la vue (views_logistica.py).
+
+Les coûts sont calculés par la DB, une colonne annotée par distance
+distincte ; nombre de requêtes constant quel que soit le nombre d'eventi :
+  - 1 requête eventi (km annotés côté DB)
+  - 1 requête mezzi attivi + 1 requête tecnici, par tranche de
+    KM_PER_QUERY distances distinctes (une seule en pratique)
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Iterable
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Coalesce
+
+from .distanze import km_deposito_subquery
+from .models import Evento, Mezzo, Tecnico
+
+ZERO = Decimal("0")
+KM_FIELD = DecimalField(max_digits=8, decimal_places=2)
+EUR_FIELD = DecimalField(max_digits=12, decimal_places=2)
+CENT = Decimal("0.01")
+# colonnes annotées par requête (limite PostgreSQL : 1664 colonnes)
+KM_PER_QUERY = 200
+
+
+def _dec(v, default=ZERO) -> Decimal:
+    try:
+        return Decimal(str(v)) if v is not None else default
+    except Exception:
+        return default
+
+
+def _km(v) -> Decimal:
+    """Distance normalisée à 2 décimales (comme DistanzaLuogo.km) : même rendu pour tous les chemins."""
+    return _dec(v).quantize(CENT)
+
+
+def _riepilogo(km: Decimal, mezzi: list[dict], tecnici: list[dict]) -> dict:
+    tot_m = sum((r["costo_totale"] for r in mezzi), ZERO)
+    tot_t = sum((r["costo_totale"] for r in tecnici), ZERO)
+    return {
+        "distanza_km": km,
+        "mezzi": mezzi,
+        "tecnici": tecnici,
+        "totale_mezzi": tot_m,
+        "totale_tecnici": tot_t,
+        "totale_logistica": tot_m + tot_t,
+    }
+
+
+def eventi_con_km(ids: Iterable[int]):
+    """
+    Eventi annotés avec `km` = evento.distanza_km -> matrice distanze
+    -> luogo.distanza_km -> 0 (même priorité que Evento.distanza_rilevante_km,
+    mais calculée en SQL).
+    """
+    return (
+        Evento.objects
+        .filter(pk__in=list(ids))
+        .select_related("luogo")
+        .annotate(km=Coalesce(
+            "distanza_km", km_deposito_subquery(), "luogo__distanza_km", Value(ZERO),
+            output_field=KM_FIELD,
+        ))
+        .order_by("data_evento", "id")
+    )
+
+
+def _costo(expr, kms: list[Decimal]) -> dict:
+    """{"c<i>": expr(km_i)} : une colonne de coût par distance."""
+    return {
+        f"c{i}": ExpressionWrapper(expr(Value(km, output_field=KM_FIELD)), output_field=EUR_FIELD)
+        for i, km in enumerate(kms)
+    }
+
+
+def mezzi_con_costi(kms: list[Decimal]):
+    """Mezzi attivi annotés, pour chaque kms[i], avec c<i> = costo_uscita + costo_km * kms[i]."""
+    return (
+        Mezzo.objects
+        .filter(attivo=True)
+        .annotate(**_costo(lambda km: F("costo_uscita") + F("costo_km") * km, kms))
+        .order_by("targa")
+    )
+
+
+def tecnici_con_costi(kms: list[Decimal], ore: Decimal = ZERO):
+    """Tecnici annotés, pour chaque kms[i], avec c<i> = costo_km * kms[i] + tariffa_oraria * ore."""
+    ore_v = Value(ore, output_field=KM_FIELD)
+    return (
+        Tecnico.objects
+        .annotate(**_costo(lambda km: F("costo_km") * km + F("tariffa_oraria") * ore_v, kms))
+        .order_by("nome")
+    )
+
+
+def _righe_per_km(kms: Iterable[Decimal], ore: Decimal) -> dict[Decimal, tuple[list, list]]:
+    """{km: (righe mezzi, righe tecnici)} : coûts chiffrés par la DB, 2 requêtes par tranche."""
+    kms = sorted(set(kms))
+    out: dict[Decimal, tuple[list, list]] = {km: ([], []) for km in kms}
+    for start in range(0, len(kms), KM_PER_QUERY):
+        tranche = kms[start:start + KM_PER_QUERY]
+        for m in mezzi_con_costi(tranche):
+            for i, km in enumerate(tranche):
+                out[km][0].append({
+                    "id": m.id,
+                    "nome": str(m),
+                    "targa": m.targa,
+                    "costo_km": _dec(m.costo_km),
+                    "costo_uscita": _dec(m.costo_uscita),
+                    "n_km": km,
+                    "costo_totale": _dec(getattr(m, f"c{i}")),
+                })
+        for t in tecnici_con_costi(tranche, ore):
+            for i, km in enumerate(tranche):
+                out[km][1].append({
+                    "id": t.id,
+                    "nome": t.nome,
+                    "costo_km": _dec(t.costo_km),
+                    "tariffa_oraria": _dec(t.tariffa_oraria),
+                    "n_km": km,
+                    "ore": ore,
+                    "costo_totale": _dec(getattr(t, f"c{i}")),
+                })
+    return out
+
+
+def costi_logistica(km: Decimal, ore: Decimal = ZERO) -> dict:
+    """
+    Coûts pour UNE distance : chaque mezzo/tecnico est chiffré par la DB.
+    """
+    km = _km(km)
+    return _riepilogo(km, *_righe_per_km([km], _dec(ore))[km])
+
+
+def costi_logistica_eventi(ids: Iterable[int], km_override=None, ore: Decimal = ZERO) -> list[dict]:
+    """
+    Coûts pour PLUSIEURS eventi en 3 requêtes : km de chaque evento annotés
+    par la DB, puis mezzi et tecnici chiffrés par la DB pour chaque distance
+    distincte (les eventi à même distance partagent leurs lignes).
+    """
+    ore = _dec(ore)
+    override = _km(km_override) if _dec(km_override, None) is not None else None
+    eventi = [(ev, override if override is not None else _km(ev.km)) for ev in eventi_con_km(ids)]
+    righe = _righe_per_km((km for _ev, km in eventi), ore)
+    return [
+        {"evento": ev.id, "data_evento": ev.data_evento, **_riepilogo(km, *righe[km])}
+        for ev, km in eventi
+    ]
@@ -0,0 +1,158 @@
+# (chemin : /backend/eventi/magazzini.py)
+"""
+Plusieurs magazzini (depositi) : disponibilités par magazzino et choix du
+magazzino d'où part le matériel d'un evento.
+
+    principale_id()                      # magazzino des eventi sans magazzino
+    per_magazzino(d0, d1, materiali)     # {materiale: {magazzino: {giacenza, impegnato, disponibile}}}
+    classifica(luogo_id)                 # magazzini du plus proche au plus lointain
+    scegli(ev)                           # le plus proche du luogo qui couvre les righe
+    assegna(ev)                          # scegli() + écrit Evento.magazzino
+
+Coût constant quel que soit le nombre de magazzini : une requête sur les
+giacenze (index unique (materiale, magazzino)), une sur les righe
+(disponibilita.impegni_per_magazzino : un seul passage, en cache), une sur
+les magazzini, deux pour la matrice distanze.
+
+Les totaux tous magazzini confondus restent ceux de disponibilita.impegni()
+et de Materiale.scorta ; un magazzino à court sur un evento se règle par un
+Trasferimento (giacenze.trasferisci).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db.models import Sum
+
+from . import disponibilita, opzioni, versioni_dati
+from .distanze import MatriceDistanze
+from .models import Evento, Magazzino, MagazzinoItem
+from .periodi import periodo
+
+
+def principale_id() -> Optional[int]:
+    return Magazzino.objects.filter(principale=True).values_list("pk", flat=True).first()
+
+
+def giacenze(materiali: Optional[Iterable[int]] = None) -> dict[int, dict[int, int]]:
+    """{materiale: {magazzino: qta}} (une requête)."""
+    qs = MagazzinoItem.objects.all()
+    if materiali is not None:
+        qs = qs.filter(materiale_id__in=list(materiali))
+    out: dict[int, dict[int, int]] = defaultdict(dict)
+    for mid, mag, q in qs.values_list("materiale_id", "magazzino_id", "qta"):
+        out[mid][mag] = int(q or 0)
+    return out
+
+
+def per_magazzino(d0: date, d1: date, materiali: Optional[Iterable[int]] = None,
+                  include_holds: bool = True, principale: Optional[int] = None) -> dict[int, dict[int, dict]]:
+    """
+    {materiale: {magazzino: {"giacenza", "impegnato", "disponibile"}}} sur [d0, d1].
+    impegnato = pic d'occupation par les eventi partant de ce magazzino ;
+    un magazzino qui a des eventi mais pas de giacenza apparaît avec 0.
+    """
+    if materiali is not None:
+        materiali = list(materiali)
+    if principale is None:
+        principale = principale_id()
+    stock = giacenze(materiali)
+    imp = disponibilita.impegni_per_magazzino(d0, d1, materiali, include_holds, principale)
+
+    out: dict[int, dict[int, dict]] = defaultdict(dict)
+    coppie = {(mid, mag) for mid, per_mag in stock.items() for mag in per_mag}
+    coppie |= {(mid, mag) for mag, per_mat in imp.items() for mid in per_mat if mag is not None}
+    for mid, mag in coppie:
+        g = stock.get(mid, {}).get(mag, 0)
+        picco = disponibilita.picco(imp.get(mag, {}).get(mid))
+        out[mid][mag] = {"giacenza": g, "impegnato": picco, "disponibile": max(0, g - picco)}
+    return out
+
+
+def classifica(luogo_id: Optional[int]) -> list[dict]:
+    """
+    Magazzini triés par distance (aller simple) au luogo, d'après la matrice
+    distanze : magazzino sans luogo = origine "deposito". Distance inconnue
+    -> en fin de liste ; à égalité, le principale d'abord.
+    """
+    mags = list(Magazzino.objects.values("id", "nome", "principale", "luogo_id").order_by("id"))
+    if luogo_id is None:
+        for m in mags:
+            m["km"] = None
+    else:
+        matrice = MatriceDistanze.carica({luogo_id, *(m["luogo_id"] for m in mags if m["luogo_id"])})
+        for m in mags:
+            m["km"] = matrice.km(m["luogo_id"], luogo_id)
+    return sorted(mags, key=lambda m: (m["km"] is None, m["km"] or Decimal(0), not m["principale"], m["id"]))
+
+
+def fabbisogno(ev: Evento) -> dict[int, int]:
+    """Quantités demandées par l'evento, par materiale (hors articles "service")."""
+    rows = (
+        ev.righe.filter(is_tecnico=False, is_trasporto=False,
+                        materiale__is_tecnico=False, materiale__is_messo=False)
+        .values("materiale_id").annotate(q=Sum("qta")).order_by()
+    )
+    return {r["materiale_id"]: int(r["q"] or 0) for r in rows if r["q"]}
+
+
+def scegli(ev: Evento) -> Optional[dict]:
+    """
+    Magazzino pour `ev` : le plus proche de son luogo qui couvre toutes ses
+    righe sur sa période ; si aucun ne couvre tout, le plus proche (les
+    manques sont à combler par trasferimento).
+
+        {"magazzino": 2, "km": 14.5, "copre": true, "mancanti": {},
+         "candidati": [{"magazzino", "nome", "km", "mancanti"}, ...]}
+
+    None s'il n'y a aucun magazzino.
+    """
+    candidati = classifica(ev.luogo_id)
+    if not candidati:
+        return None
+    principale = next((m["id"] for m in candidati if m["principale"]), None)
+    bisogno = fabbisogno(ev)
+    disp: dict[int, dict[int, dict]] = {}
+    attuale = ev.magazzino_id or principale
+    if bisogno:
+        d0, d1 = periodo(ev.data_evento, ev.data_evento_da, ev.data_evento_a)
+        disp = per_magazzino(d0, d1, bisogno, principale=principale)
+
+    rapporti = []
+    for m in candidati:
+        mancanti = {}
+        for mid, q in bisogno.items():
+            libero = disp.get(mid, {}).get(m["id"], {}).get("disponibile", 0)
+            if m["id"] == attuale and opzioni.conteggiato(ev):
+                # ses propres righe sont déjà comptées dans ce magazzino, sur toute sa période
+                d = disp.get(mid, {}).get(m["id"])
+                libero = max(0, d["giacenza"] - d["impegnato"] + q) if d else libero
+            if libero < q:
+                mancanti[mid] = q - libero
+        rapporti.append({"magazzino": m["id"], "nome": m["nome"],
+                         "km": float(m["km"]) if m["km"] is not None else None, "mancanti": mancanti})
+
+    scelto = next((r for r in rapporti if not r["mancanti"]), rapporti[0])
+    return {"magazzino": scelto["magazzino"], "km": scelto["km"], "copre": not scelto["mancanti"],
+            "mancanti": scelto["mancanti"], "candidati": rapporti}
+
+
+def assegna(ev: Evento, se_scoperto: bool = False) -> Optional[dict]:
+    """
+    scegli() puis écrit Evento.magazzino (UPDATE ciblé, dans la transaction de
+    l'appelant). `se_scoperto` : garde le magazzino actuel s'il couvre encore
+    toutes les righe (choix manuel respecté).
+    """
+    scelta = scegli(ev)
+    if scelta and se_scoperto and any(
+        c["magazzino"] == ev.magazzino_id and not c["mancanti"] for c in scelta["candidati"]
+    ):
+        return scelta
+    if scelta and scelta["magazzino"] != ev.magazzino_id:
+        Evento.objects.filter(pk=ev.pk).update(magazzino_id=scelta["magazzino"])
+        ev.magazzino_id = scelta["magazzino"]
+        versioni_dati.bump(versioni_dati.STOCK)  # update() : pas de post_save
+    return scelta
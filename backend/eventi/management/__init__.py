@@ -0,0 +1 @@
+# (chemin : /backend/eventi/management/__init__.py)
@@ -0,0 +1 @@
+# (chemin : /backend/eventi/management/commands/__init__.py)
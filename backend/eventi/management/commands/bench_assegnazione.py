@@ -0,0 +1,95 @@
+# (chemin : /backend/eventi/management/commands/bench_assegnazione.py)
+"""
+Benchmark de l'optimiseur mezzi/tecnici (eventi/assegnazione.py).
+
+    python manage.py bench_assegnazione                     # 60 eventi synthétiques
+    python manage.py bench_assegnazione --eventi 120 --giorni 3
+    python manage.py bench_assegnazione --from 2025-11-01 --to 2025-11-30   # données réelles
+
+En mode synthétique rien n'est écrit en DB : eventi / mezzi / tecnici sont
+générés en mémoire (8 slots location par jour, comme un pic de saison).
+"""
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from eventi import assegnazione
+from eventi.assegnazione import EventoLogistico, pianifica
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps de calcul de l'affectation mezzi/tecnici."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--eventi", type=int, default=60)
+        parser.add_argument("--giorni", type=int, default=1,
+                            help="Nb de jours sur lesquels répartir les eventi synthétiques.")
+        parser.add_argument("--mezzi", type=int, default=0, help="défaut: 80%% des eventi/jour")
+        parser.add_argument("--tecnici", type=int, default=0, help="défaut: 2 x eventi/jour")
+        parser.add_argument("--tecnici-per-evento", type=int, default=2)
+        parser.add_argument("--ripetizioni", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--from", dest="d_from")
+        parser.add_argument("--to", dest="d_to")
+
+    def handle(self, *args, **o):
+        rnd = random.Random(o["seed"])
+        solver = "scipy" if assegnazione._scipy_lsa is not None else "python (hongrois)"
+
+        if o["d_from"]:
+            d0 = parse_date(o["d_from"])
+            d1 = parse_date(o["d_to"] or o["d_from"])
+            if not d0 or not d1:
+                raise CommandError("--from/--to invalidi")
+            kwargs = {}
+            label = f"DB {d0}..{d1}"
+        else:
+            n = max(1, o["eventi"])
+            giorni = max(1, o["giorni"])
+            per_day = -(-n // giorni)
+            d0 = date.today()
+            d1 = d0 + timedelta(days=giorni - 1)
+            eventi = [
+                EventoLogistico(
+                    id=i + 1, titolo=f"Evento {i + 1}", location_index=(i % 8) + 1,
+                    da=d0 + timedelta(days=i // per_day), a=d0 + timedelta(days=i // per_day),
+                    km_ar=Decimal(rnd.randint(10, 400)),
+                )
+                for i in range(n)
+            ]
+            n_mezzi = o["mezzi"] or max(1, int(per_day * 0.8))
+            n_tec = o["tecnici"] or per_day * 2
+            mezzi = [
+                {"id": j + 1, "targa": f"MZ{j + 1:03d}",
+                 "costo_km": Decimal(rnd.randint(30, 120)) / 100,
+                 "costo_uscita": Decimal(rnd.randint(0, 80))}
+                for j in range(n_mezzi)
+            ]
+            tecnici = [
+                {"id": j + 1, "nome": f"Tecnico {j + 1}",
+                 "costo_km": Decimal(rnd.randint(0, 40)) / 100,
+                 "tariffa_oraria": Decimal(rnd.randint(18, 45))}
+                for j in range(n_tec)
+            ]
+            kwargs = {"eventi": eventi, "mezzi": mezzi, "tecnici": tecnici}
+            label = f"{n} eventi / {giorni} giorni, {n_mezzi} mezzi, {n_tec} tecnici"
+
+        tempi = []
+        res = None
+        for _ in range(max(1, o["ripetizioni"])):
+            t0 = time.perf_counter()
+            res = pianifica(d0, d1, tecnici_per_evento=o["tecnici_per_evento"], **kwargs)
+            tempi.append(time.perf_counter() - t0)
+
+        self.stdout.write(f"Scenario : {label}")
+        self.stdout.write(f"Solver   : {solver}")
+        self.stdout.write(f"Eventi   : {len(res['assegnazioni'])} (non assegnati: {len(res['non_assegnati'])})")
+        self.stdout.write(f"Costo    : {res['costo_totale']:.2f} €")
+        self.stdout.write(self.style.SUCCESS(
+            f"Tempo    : min {min(tempi) * 1000:.1f} ms / max {max(tempi) * 1000:.1f} ms "
+            f"({len(tempi)} run)"
+        ))
@@ -0,0 +1,86 @@
+# (chemin : /backend/eventi/management/commands/bench_json.py)
+"""
+Benchmark du rendu / parsing JSON : DRF (json stdlib) vs orjson
+(eventi/renderers.py) sur les réponses les plus lourdes.
+
+    python manage.py bench_json                       # sinottico, liste, mese, revisions
+    python manage.py bench_json --ripetizioni 200
+    python manage.py bench_json --path "/api/eventi/?page_size=200"
+
+Chaque endpoint est appelé une fois (client de test, rien n'est écrit) ;
+on mesure ensuite seulement render()/parse() sur `response.data` et on
+vérifie que les deux renderers produisent exactement les mêmes octets.
+"""
+import io
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from eventi import renderers
+from eventi.models import Evento
+
+
+def _chrono(fn, n: int) -> float:
+    """ms moyens par appel."""
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / n
+
+
+class Command(BaseCommand):
+    help = "Compare JSONRenderer/JSONParser DRF et orjson sur les endpoints lourds."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", action="append", dest="paths",
+                            help="Endpoint à mesurer (répétable). Défaut: endpoints lourds.")
+        parser.add_argument("--ripetizioni", type=int, default=50)
+
+    def _paths_defaut(self):
+        oggi = date.today()
+        paths = [
+            f"/api/magazzino/calendar?year={oggi.year}",
+            "/api/eventi/?page_size=200",
+            f"/api/eventi/mese?year={oggi.year}&month={oggi.month}",
+        ]
+        ev = (Evento.objects.annotate(n=Count("revisions")).filter(n__gt=0)
+              .order_by("-n").values_list("id", flat=True).first())
+        if ev:
+            paths.append(f"/api/eventi/{ev}/revisions/")
+        return paths
+
+    def handle(self, *args, **o):
+        if renderers.orjson is None:
+            raise CommandError("orjson non installé (pip install orjson) : rien à comparer.")
+        n = max(1, o["ripetizioni"])
+        client = APIClient()
+        drf_r, fast_r = JSONRenderer(), renderers.ORJSONRenderer()
+        drf_p, fast_p = JSONParser(), renderers.ORJSONParser()
+
+        self.stdout.write(f"{n} ripetizioni, orjson {renderers.orjson.__version__}")
+        self.stdout.write(f"{'endpoint':<48} {'Ko':>7}  {'render drf/orjson ms':>22}  {'parse drf/orjson ms':>21}")
+        for path in o["paths"] or self._paths_defaut():
+            resp = client.get(path, HTTP_HOST="localhost")
+            data = getattr(resp, "data", None)
+            if resp.status_code != 200 or data is None:
+                self.stdout.write(self.style.WARNING(f"{path:<48} ignoré (HTTP {resp.status_code})"))
+                continue
+
+            a, b = drf_r.render(data), fast_r.render(data)
+            if a != b:
+                raise CommandError(f"{path}: sortie orjson différente de DRF")
+
+            r_drf = _chrono(lambda: drf_r.render(data), n)
+            r_fast = _chrono(lambda: fast_r.render(data), n)
+            p_drf = _chrono(lambda: drf_p.parse(io.BytesIO(a)), n)
+            p_fast = _chrono(lambda: fast_p.parse(io.BytesIO(a)), n)
+            self.stdout.write(
+                f"{path[:48]:<48} {len(a) / 1024:>7.1f}  "
+                f"{r_drf:>9.2f} / {r_fast:<6.2f} x{r_drf / r_fast:<4.1f}  "
+                f"{p_drf:>8.2f} / {p_fast:<6.2f} x{p_drf / p_fast:<4.1f}"
+            )
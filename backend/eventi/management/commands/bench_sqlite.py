@@ -0,0 +1,160 @@
+# (chemin : /backend/eventi/management/commands/bench_sqlite.py)
+"""
+Latence des lectures pendant des écritures, SQLite "par défaut" vs profil WAL.
+
+    python manage.py bench_sqlite                    # 6 lecteurs, 1 writer, 10 s par profil
+    python manage.py bench_sqlite --lecteurs 12 --durata 20 --righe 500
+
+La base n'est jamais modifiée : chaque profil travaille sur une copie
+(API backup de sqlite3) montée comme alias temporaire "bench". Les pragmas
+passent par le même signal connection_created que la prod
+(DATABASES[alias]["PRAGMAS"], cf. eventi/signals.py).
+
+- lecteurs : requêtes de magazzino/status et location-calendar (eventi/letture.py)
+- writer   : remplace les righe d'un evento (delete + bulk_create) dans un
+             atomic(), en boucle — comme la sauvegarde d'un preventivo
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from eventi import disponibilita, letture
+from eventi.models import Evento, Materiale, RigaEvento
+
+ALIAS = "bench"
+PROFILI = {
+    # ce qu'on avait avant : journal rollback, busy_timeout implicite de Python (5 s)
+    "default": {"journal_mode": "DELETE", "synchronous": "FULL"},
+    "wal": None,  # -> settings.SQLITE_PRAGMAS
+}
+
+
+def _pct(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrence SQLite : latence lecteurs pendant les écritures."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lecteurs", type=int, default=6)
+        parser.add_argument("--durata", type=float, default=10.0, help="secondes par profil")
+        parser.add_argument("--righe", type=int, default=300, help="righe par transaction du writer")
+        parser.add_argument("--profili", default="default,wal")
+
+    def handle(self, *args, **o):
+        src = connections["default"]
+        if src.vendor != "sqlite":
+            raise CommandError("bench_sqlite ne concerne que le backend SQLite")
+
+        evento_id = Evento.objects.values_list("id", flat=True).first()
+        materiali = list(Materiale.objects.values_list("id", flat=True)[:20])
+        if not evento_id or not materiali:
+            raise CommandError("Il faut au moins un evento et un materiale en base")
+
+        for nome in [p.strip() for p in o["profili"].split(",") if p.strip()]:
+            if nome not in PROFILI:
+                raise CommandError(f"Profil inconnu: {nome}")
+            pragmas = PROFILI[nome] if PROFILI[nome] is not None else settings.SQLITE_PRAGMAS
+            res = self._run(src, pragmas, evento_id, materiali, o)
+            self._report(nome, pragmas, res, o["durata"])
+
+    # ------------------------------------------------------------------
+
+    def _run(self, src, pragmas, evento_id, materiali, o):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3", prefix="bench_")
+        os.close(fd)
+        src.ensure_connection()
+        dst = sqlite3.connect(path)
+        src.connection.backup(dst)
+        dst.close()
+
+        connections.settings[ALIAS] = {
+            **src.settings_dict, "NAME": path, "CONN_MAX_AGE": 0, "PRAGMAS": pragmas,
+        }
+        stop = threading.Event()
+        lock = threading.Lock()
+        lat, errori, commit = [], [0], [0]
+        year = Evento.objects.values_list("data_evento", flat=True).order_by("-data_evento").first().year
+        d0, d1 = date(year, 1, 1), date(year, 12, 31)
+
+        def lettore(k):
+            try:
+                while not stop.is_set():
+                    t0 = time.perf_counter()
+                    try:
+                        if k % 2:
+                            list(disponibilita.righe_qs(d0, d1).values(*disponibilita.CAMPI).using(ALIAS))
+                        else:
+                            list(letture.location_calendar_qs(d0, d1).using(ALIAS))
+                        ok = True
+                    except Exception:
+                        ok = False
+                    dt = time.perf_counter() - t0
+                    with lock:
+                        if ok:
+                            lat.append(dt)
+                        else:
+                            errori[0] += 1
+            finally:
+                connections[ALIAS].close()
+
+        def writer():
+            try:
+                n = 0
+                while not stop.is_set():
+                    try:
+                        # comme une sauvegarde d'evento : on remplace toutes ses righe
+                        with transaction.atomic(using=ALIAS):
+                            RigaEvento.objects.using(ALIAS).filter(evento_id=evento_id).delete()
+                            RigaEvento.objects.using(ALIAS).bulk_create([
+                                RigaEvento(evento_id=evento_id, materiale_id=materiali[i % len(materiali)])
+                                for i in range(o["righe"])
+                            ])
+                        n += 1
+                    except Exception:
+                        with lock:
+                            errori[0] += 1
+                commit[0] = n
+            finally:
+                connections[ALIAS].close()
+
+        threads = [threading.Thread(target=lettore, args=(k,)) for k in range(max(1, o["lecteurs"]))]
+        threads.append(threading.Thread(target=writer))
+        try:
+            for t in threads:
+                t.start()
+            time.sleep(o["durata"])
+            stop.set()
+            for t in threads:
+                t.join()
+        finally:
+            del connections.settings[ALIAS]
+            for suffix in ("", "-wal", "-shm", "-journal"):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+        return {"lat": lat, "errori": errori[0], "commit": commit[0]}
+
+    def _report(self, nome, pragmas, res, durata):
+        lat = res["lat"]
+        self.stdout.write(f"\nProfil {nome}: {pragmas}")
+        self.stdout.write(
+            f"  lectures : {len(lat)} ({len(lat) / durata:.0f}/s)  "
+            f"p50 {_pct(lat, 50) * 1000:.1f} ms  p95 {_pct(lat, 95) * 1000:.1f} ms  "
+            f"p99 {_pct(lat, 99) * 1000:.1f} ms  max {max(lat, default=0) * 1000:.1f} ms"
+        )
+        self.stdout.write(f"  writer   : {res['commit']} commit ({res['commit'] / durata:.1f}/s)")
+        style = self.style.SUCCESS if not res["errori"] else self.style.WARNING
+        self.stdout.write(style(f"  erreurs  : {res['errori']} (database is locked, ...)"))
@@ -0,0 +1,83 @@
+# (chemin : /backend/eventi/management/commands/controlla_overbooking.py)
+"""
+Scan d'overbooking (eventi/conflitti.py) sur une période.
+
+    python manage.py controlla_overbooking                          # année courante
+    python manage.py controlla_overbooking --from 2025-06-01 --to 2025-09-30
+    python manage.py controlla_overbooking --verifica               # + compare au calcul jour par jour
+
+Code retour 1 s'il y a au moins un conflit (utilisable en cron / CI).
+--verifica recalcule l'occupation jour par jour, materiale par materiale
+(méthode naïve de magazzino/status) et vérifie que le balayage trouve
+exactement les mêmes jours en dépassement.
+"""
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from eventi import conflitti
+
+
+def _giorni_naif(d0: date, d1: date) -> set[tuple[int, date]]:
+    """(materiale, jour) en dépassement, par comptage jour par jour."""
+    usato: dict[tuple[int, date], int] = defaultdict(int)
+    scorta: dict[int, int] = {}
+    for r in conflitti.righe_qs(d0, d1):
+        scorta[r["materiale_id"]] = int(r["materiale__scorta"] or 0)
+        start = r["evento__data_evento_da"] or r["evento__data_evento"]
+        end = r["evento__data_evento_a"] or start
+        cur = max(start, d0)
+        while cur <= min(end, d1):
+            usato[(r["materiale_id"], cur)] += int(r["qta"] or 0)
+            cur += timedelta(days=1)
+    return {k for k, q in usato.items() if q > scorta[k[0]]}
+
+
+class Command(BaseCommand):
+    help = "Liste les plages où les eventi dépassent la scorta d'un materiale."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="d_from")
+        parser.add_argument("--to", dest="d_to")
+        parser.add_argument("--verifica", action="store_true",
+                            help="Compare au calcul naïf jour par jour.")
+
+    def handle(self, *args, **o):
+        oggi = date.today()
+        d0 = parse_date(o["d_from"]) if o["d_from"] else date(oggi.year, 1, 1)
+        d1 = parse_date(o["d_to"]) if o["d_to"] else date(oggi.year, 12, 31)
+        if not d0 or not d1 or d1 < d0:
+            raise CommandError("Période invalide (--from / --to en YYYY-MM-DD).")
+
+        t0 = time.perf_counter()
+        report = conflitti.rileva(d0, d1)
+        ms = (time.perf_counter() - t0) * 1000
+
+        for c in report:
+            self.stdout.write(
+                f"{c['da']} -> {c['a']}  [{c['materiale']}] {c['nome'][:40]:<40} "
+                f"{c['impegnato']:>4} / {c['scorta']:<4} (+{c['eccedenza']})  eventi {c['eventi']}"
+            )
+        self.stdout.write(f"{len(report)} conflitti su {d0} -> {d1} ({ms:.1f} ms)")
+
+        if o["verifica"]:
+            attesi = _giorni_naif(d0, d1)
+            trovati = set()
+            for c in report:
+                cur, fine = date.fromisoformat(c["da"]), date.fromisoformat(c["a"])
+                while cur <= fine:
+                    trovati.add((c["materiale"], cur))
+                    cur += timedelta(days=1)
+            if attesi != trovati:
+                raise CommandError(
+                    f"Écart avec le calcul naïf : {len(attesi - trovati)} manquants, "
+                    f"{len(trovati - attesi)} en trop."
+                )
+            self.stdout.write(self.style.SUCCESS(f"verifica OK ({len(attesi)} jours-materiale)"))
+
+        if report:
+            sys.exit(1)
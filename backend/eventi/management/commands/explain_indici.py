@@ -0,0 +1,93 @@
+# (chemin : /backend/eventi/management/commands/explain_indici.py)
+"""
+Vérifie par EXPLAIN que les requêtes "chaudes" des vues passent par un index.
+
+    python manage.py explain_indici            # OK/KO par requête, erreur si un KO
+    python manage.py explain_indici --plan     # affiche aussi les plans
+
+- SQLite     : KO si le plan contient un `SCAN <table>` (table ou index
+               parcouru en entier) sur une table filtrée.
+- PostgreSQL : KO si `Seq Scan on <table>`. Sur une petite base le planner
+               préfère toujours le seq scan : on pose `enable_seqscan = off`
+               (dans une transaction annulée) pour vérifier qu'un index
+               *peut* servir la requête.
+
+À lancer après une migration ou une modif de filtre dans letture.py /
+periodi.py / views_stats.py.
+"""
+import re
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from eventi import conflitti, disponibilita, letture
+from eventi.models import CalendarioSlot, Evento, MagazzinoItem, RigaEvento
+from eventi.periodi import sovrapposizione_q
+from eventi.views_stats import STATI_ATTIVI
+
+_SQLITE_SCAN = re.compile(r"\bSCAN (\w+)")
+_PG_SEQ = re.compile(r"Seq Scan on (\w+)")
+
+
+def _requetes(d0: date, d1: date, materiale_id: int):
+    """(libellé, queryset) des filtres servis par les vues."""
+    return [
+        ("eventi/mese", letture.eventi_mese_qs(d0, d1)),
+        ("calendario/location-calendar", letture.location_calendar_qs(d0, d1)),
+        ("calendario/availability + next-slot (slots.occupazione)",
+         Evento.objects.filter(sovrapposizione_q(d0, d0)).exclude(stato="annullato").values("location_index")),
+        ("EventoSerializer.validate (double booking)",
+         CalendarioSlot.objects.filter(data=d0, location_index=1).values("id")),
+        ("magazzino/status + calendar (disponibilita.impegni)",
+         disponibilita.righe_qs(d0, d1).values(*disponibilita.CAMPI)),
+        ("magazzino/status?materials=, catalogo/search",
+         disponibilita.righe_qs(d0, d1, [materiale_id]).values(*disponibilita.CAMPI)),
+        ("magazzino/disponibilita (disponibilita.impegni_per_magazzino)",
+         disponibilita.righe_qs(d0, d1, [materiale_id]).values(*disponibilita.CAMPI_MAGAZZINO)),
+        ("magazzino/disponibilita + eventi/<id>/magazzino (magazzini.giacenze)",
+         MagazzinoItem.objects.filter(materiale_id__in=[materiale_id]).values("magazzino_id", "qta")),
+        ("magazzino/bookings", letture.righe_bookings_qs(materiale_id, d0, d1)),
+        ("stats (eventi attivi)",
+         Evento.objects.filter(data_evento__range=(d0, d1), stato__in=STATI_ATTIVI).values("id")),
+        ("overbooking au save (conflitti.per_evento)", conflitti.righe_qs(d0, d0, [materiale_id])),
+        ("logistica/assegnazione",
+         Evento.objects.filter(sovrapposizione_q(d0, d1)).exclude(stato="annullato").values("id")),
+    ]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN des requêtes chaudes : vérifie qu'elles utilisent un index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plan", action="store_true", help="Affiche les plans complets.")
+
+    def handle(self, *args, **o):
+        vendor = connection.vendor
+        if vendor not in ("sqlite", "postgresql"):
+            raise CommandError(f"Backend non géré: {vendor}")
+
+        d0, d1 = date(date.today().year, 1, 1), date(date.today().year, 1, 31)
+        materiale_id = RigaEvento.objects.values_list("materiale_id", flat=True).first() or 1
+
+        ko = []
+        with transaction.atomic():
+            if vendor == "postgresql":
+                with connection.cursor() as cur:
+                    cur.execute("SET LOCAL enable_seqscan = off")
+            for label, qs in _requetes(d0, d1, materiale_id):
+                plan = qs.explain()
+                pattern = _SQLITE_SCAN if vendor == "sqlite" else _PG_SEQ
+                scans = sorted(set(pattern.findall(plan)))
+                if scans:
+                    ko.append(label)
+                    self.stdout.write(self.style.ERROR(f"KO  {label}  (scan: {', '.join(scans)})"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"OK  {label}"))
+                if o["plan"] or scans:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"      {line}")
+            transaction.set_rollback(True)
+
+        if ko:
+            raise CommandError(f"{len(ko)} requête(s) sans index: {', '.join(ko)}")
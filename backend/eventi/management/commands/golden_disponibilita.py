@@ -0,0 +1,200 @@
+# (chemin : /backend/eventi/management/commands/golden_disponibilita.py)
+"""
+Suite "golden" des disponibilités de stock (eventi/disponibilita.py).
+
+    python manage.py golden_disponibilita                           # contrôles
+    python manage.py golden_disponibilita --salva /tmp/disp.json    # + instantané des endpoints
+    python manage.py golden_disponibilita --confronta /tmp/disp.json
+    python manage.py golden_disponibilita --year 2025 --materiali 20
+
+Contrôles (rien n'est écrit en base) :
+  - impegni() == calcul naïf jour par jour (une requête SQL par jour :
+    righe des eventi comptés qui couvrent ce jour, SUM(qta) par materiale),
+    avec et sans les options des bozze ;
+  - impegni() servi par le cache == recalcul sans cache ;
+  - impegni_per_magazzino() additionné sur les magazzini == impegni() ;
+  - vues async (backend/urls_async.py) == vues DRF (status, bookings).
+
+--salva enregistre les réponses des endpoints de disponibilité
+(magazzino/status, /bookings, /calendar, /conflitti, /disponibilita,
+catalogo/search, suggest) ; --confronta rejoue les MÊMES URLs et liste les écarts : à lancer
+avant / après une modification du calcul.
+
+Code retour != 0 au premier contrôle en échec ou s'il y a des écarts.
+"""
+import json
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from django.test import AsyncClient, Client, override_settings
+
+from eventi import disponibilita, magazzini, opzioni
+from eventi.models import Evento, Materiale, RigaEvento
+from eventi.periodi import sovrapposizione_q
+
+
+
+def _naif(d0: date, d1: date, include_holds: bool) -> dict[tuple[int, date], int]:
+    """(materiale, jour) -> qta, une requête par jour."""
+    out = {}
+    g = d0
+    while g <= d1:
+        rows = (
+            RigaEvento.objects
+            .filter(sovrapposizione_q(g, g, prefix="evento__"))
+            .filter(opzioni.conteggiati_q("evento__", include_holds))
+            .values("materiale_id").annotate(q=Sum("qta")).order_by()
+        )
+        for r in rows:
+            if r["q"]:
+                out[(r["materiale_id"], g)] = r["q"]
+        g += timedelta(days=1)
+    return out
+
+
+def _appiattisci(impegni: dict) -> dict[tuple[int, date], int]:
+    return {(mid, g): q for mid, giorni in impegni.items() for g, q in giorni.items()}
+
+
+def _corpo(path: str, r):
+    if r.status_code >= 500:
+        return [r.status_code, None]
+    try:
+        data = json.loads(r.content)
+    except ValueError:
+        return [r.status_code, r.content.decode("utf-8", "replace")]
+    return [r.status_code, _normalizza(path, data)]
+
+
+def _normalizza(path: str, data):
+    """Ordre sans signification dans certaines listes : trié avant comparaison."""
+    if path.startswith("/api/magazzino/calendar") and isinstance(data, dict):
+        data["bookings"] = sorted(data.get("bookings", []), key=lambda b: (b["materiale"], b["date"]))
+    return data
+
+
+class Command(BaseCommand):
+    help = "Vérifie le service de disponibilités (naïf, cache, async) et compare les endpoints à un instantané."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Année testée (défaut : celle du dernier evento).")
+        parser.add_argument("--materiali", type=int, default=15,
+                            help="Nombre de materiali (les plus réservés) pour /bookings et /suggest.")
+        parser.add_argument("--salva", metavar="FILE")
+        parser.add_argument("--confronta", metavar="FILE")
+
+    def handle(self, *args, **o):
+        year = o["year"] or (
+            Evento.objects.exclude(data_evento=None).order_by("-data_evento")
+            .values_list("data_evento", flat=True).first() or date.today()
+        ).year
+        d0, d1 = date(year, 1, 1), date(year, 12, 31)
+
+        self._controlli(d0, d1)
+
+        if o["confronta"]:
+            with open(o["confronta"], encoding="utf-8") as f:
+                attesi = json.load(f)
+            ottenuti = self._scatta(list(attesi))
+            diversi = [p for p in attesi if attesi[p] != ottenuti[p]]
+            for p in diversi:
+                self.stdout.write(self.style.WARNING(f"  écart : {p}"))
+            if diversi:
+                raise CommandError(f"{len(diversi)} / {len(attesi)} endpoints différents de {o['confronta']}")
+            self.stdout.write(self.style.SUCCESS(f"confronta OK ({len(attesi)} endpoints)"))
+
+        if o["salva"]:
+            snap = self._scatta(self._percorsi(year, o["materiali"]))
+            with open(o["salva"], "w", encoding="utf-8") as f:
+                json.dump(snap, f, sort_keys=True, indent=0)
+            self.stdout.write(f"{len(snap)} endpoints -> {o['salva']}")
+
+    # -- contrôles -----------------------------------------------------------
+
+    def _controlli(self, d0: date, d1: date):
+        with override_settings(EVENTI_CACHE_DISPONIBILITA=0):
+            for holds in (True, False):
+                servizio = _appiattisci(disponibilita.impegni(d0, d1, include_holds=holds))
+                naif = _naif(d0, d1, holds)
+                if servizio != naif:
+                    diff = sorted(set(servizio.items()) ^ set(naif.items()))[:5]
+                    raise CommandError(f"impegni() != calcul naïf (include_holds={holds}) : {diff}")
+                self.stdout.write(self.style.SUCCESS(
+                    f"naïf OK {d0} -> {d1}, include_holds={holds} ({len(naif)} jours-materiale)"))
+            senza_cache = disponibilita.impegni(d0, d1)
+            somma: dict[tuple[int, date], int] = {}
+            for per_mat in disponibilita.impegni_per_magazzino(
+                    d0, d1, principale=magazzini.principale_id()).values():
+                for k, q in _appiattisci(per_mat).items():
+                    somma[k] = somma.get(k, 0) + q
+            if somma != _appiattisci(senza_cache):
+                raise CommandError("somme de impegni_per_magazzino() != impegni()")
+        self.stdout.write(self.style.SUCCESS("magazzini OK"))
+
+        with override_settings(EVENTI_CACHE_DISPONIBILITA=60):
+            disponibilita.impegni(d0, d1)  # remplit le cache
+            if disponibilita.impegni(d0, d1) != senza_cache:
+                raise CommandError("impegni() servi par le cache != recalcul")
+        self.stdout.write(self.style.SUCCESS("cache OK"))
+
+        mid = RigaEvento.objects.values_list("materiale_id", flat=True).order_by("materiale_id").first()
+        percorsi = [f"/api/magazzino/status?from={d0}&to={d1}",
+                    f"/api/magazzino/status?from={d0}&to={d1}&include_holds=0"]
+        if mid:
+            percorsi.append(f"/api/magazzino/bookings?material={mid}&from={d0}&to={d1}")
+        sync = self._scatta(percorsi)
+        asincrone = self._scatta_async(percorsi)
+        for p in percorsi:
+            if sync[p] != asincrone[p]:
+                raise CommandError(f"vue async != vue DRF : {p}")
+        self.stdout.write(self.style.SUCCESS(f"async OK ({len(percorsi)} endpoints)"))
+
+    # -- instantanés ---------------------------------------------------------
+
+    def _percorsi(self, year: int, n_materiali: int) -> list[str]:
+        d0, d1 = date(year, 1, 1), date(year, 12, 31)
+        mezzo = date(year, 6, 15)
+        materiali = list(
+            Materiale.objects.annotate(n=Count("rigaevento")).filter(n__gt=0)
+            .order_by("-n", "id").values_list("id", flat=True)[:n_materiali]
+        )
+        percorsi = [
+            f"/api/magazzino/calendar?year={year}",
+            f"/api/magazzino/calendar?year={year}&include_holds=0",
+            f"/api/magazzino/status?from={d0}&to={d1}",
+            f"/api/magazzino/status?from={d0}&to={d1}&include_holds=0",
+            f"/api/magazzino/status?from={mezzo}&to={mezzo + timedelta(days=30)}"
+            f"&materials={','.join(map(str, materiali[:3]))}",
+            f"/api/magazzino/conflitti?year={year}",
+            f"/api/magazzino/disponibilita?from={mezzo}&to={mezzo + timedelta(days=30)}",
+        ]
+        for mese in range(1, 13):
+            da = date(year, mese, 1)
+            a = (da + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            percorsi.append(f"/api/catalogo/search?data={da}&data_a={a}")
+        for mid in materiali:
+            percorsi.append(f"/api/magazzino/bookings?material={mid}&from={d0}&to={d1}&on={mezzo}")
+            percorsi.append(f"/api/suggest?materiale={mid}&date={mezzo}")
+        return percorsi
+
+    def _scatta(self, percorsi: list[str]) -> dict:
+        client = Client()
+        out = {}
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for p in percorsi:
+                out[p] = _corpo(p, client.get(p))
+        return out
+
+    def _scatta_async(self, percorsi: list[str]) -> dict:
+        client = AsyncClient()
+
+        async def tutte():
+            out = {}
+            for p in percorsi:
+                out[p] = _corpo(p, await client.get(p))
+            return out
+
+        with override_settings(ROOT_URLCONF="backend.urls_async", ALLOWED_HOSTS=["testserver"]):
+            return async_to_sync(tutte)()
@@ -0,0 +1,96 @@
+# (chemin : /backend/eventi/management/commands/import_distanze.py)
+"""
+Importe la matrice distanze depuis un export CSV d'un outil de routing
+hors-ligne (OSRM, GraphHopper, tableur...).
+
+    python manage.py import_distanze distanze.csv [--fonte manuale] [--simmetrica]
+
+Colonnes attendues (en-tête obligatoire) :
+    origine,destinazione,km[,durata_min]
+- origine vide ou "deposito" -> départ du deposito
+- origine / destinazione : id numérique ou external_id (LUG-2025-0001)
+Les lignes existantes sont mises à jour, les autres créées (bulk).
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from eventi.models import DistanzaLuogo, Luogo
+
+
+class Command(BaseCommand):
+    help = "Importe/maj la matrice distanze (deposito->luogo, luogo->luogo) depuis un CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--fonte", default="dataset", choices=["dataset", "manuale"])
+        parser.add_argument("--simmetrica", action="store_true",
+                            help="Écrit aussi la tratta inverse (luogo->luogo uniquement).")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        by_id = {}
+        by_ext = {}
+        for pk, ext in Luogo.objects.values_list("pk", "external_id"):
+            by_id[str(pk)] = pk
+            if ext:
+                by_ext[ext.upper()] = pk
+
+        def resolve(val, allow_deposito=False):
+            v = (val or "").strip()
+            if allow_deposito and v.lower() in ("", "deposito", "magazzino"):
+                return None
+            pk = by_id.get(v) or by_ext.get(v.upper())
+            if pk is None:
+                raise CommandError(f"Luogo sconosciuto: {val!r}")
+            return pk
+
+        rows: dict[tuple, tuple] = {}
+        try:
+            with open(opts["path"], newline="", encoding="utf-8-sig") as fh:
+                for n, rec in enumerate(csv.DictReader(fh), start=2):
+                    try:
+                        km = Decimal(str(rec["km"]).replace(",", "."))
+                    except (KeyError, InvalidOperation):
+                        raise CommandError(f"Riga {n}: km non valido")
+                    durata = (rec.get("durata_min") or "").strip()
+                    durata = int(float(durata)) if durata else None
+                    o = resolve(rec.get("origine"), allow_deposito=True)
+                    d = resolve(rec.get("destinazione"))
+                    rows[(o, d)] = (km, durata)
+                    if opts["simmetrica"] and o is not None:
+                        rows.setdefault((d, o), (km, durata))
+        except FileNotFoundError:
+            raise CommandError(f"File non trovato: {opts['path']}")
+
+        existing = {
+            (x.origine_id, x.destinazione_id): x
+            for x in DistanzaLuogo.objects.all()
+        }
+        to_create, to_update = [], []
+        now = timezone.now()
+        for (o, d), (km, durata) in rows.items():
+            obj = existing.get((o, d))
+            if obj is None:
+                to_create.append(DistanzaLuogo(
+                    origine_id=o, destinazione_id=d, km=km, durata_min=durata, fonte=opts["fonte"],
+                ))
+            else:
+                obj.km, obj.durata_min, obj.fonte = km, durata, opts["fonte"]
+                obj.updated_at = now  # bulk_update n'applique pas auto_now
+                to_update.append(obj)
+
+        if opts["dry_run"]:
+            self.stdout.write(f"[dry-run] {len(to_create)} da creare, {len(to_update)} da aggiornare")
+            return
+
+        with transaction.atomic():
+            DistanzaLuogo.objects.bulk_create(to_create, batch_size=500)
+            DistanzaLuogo.objects.bulk_update(to_update, ["km", "durata_min", "fonte", "updated_at"], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Distanze: {len(to_create)} create, {len(to_update)} aggiornate"
+        ))
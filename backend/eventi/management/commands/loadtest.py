@@ -0,0 +1,99 @@
+# (chemin : /backend/eventi/management/commands/loadtest.py)
+"""
+Petit test de charge HTTP (stdlib uniquement) contre un serveur lancé.
+
+    # serveur de prod
+    DJANGO_DEBUG=0 gunicorn -c gunicorn.conf.py backend.wsgi:application
+    python manage.py loadtest --base http://127.0.0.1:8000 -c 16 -d 20
+
+    # ajouter un endpoint lent pour vérifier qu'il ne bloque pas les autres
+    python manage.py loadtest --path /api/eventi/12/docx/ --path /api/calendario/location-calendar
+
+Affiche débit (req/s) et latences p50/p95/p99 par chemin. À comparer avec
+`manage.py runserver --nothreading` pour voir l'effet des workers/threads.
+"""
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+
+def _pct(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+class Command(BaseCommand):
+    help = "Test de charge concurrent sur les endpoints de lecture de l'API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base", default="http://127.0.0.1:8000")
+        parser.add_argument("--path", action="append", dest="paths",
+                            help="Chemin à appeler (répétable). Défaut: calendrier, mese, magazzino.")
+        parser.add_argument("-c", "--concurrency", type=int, default=16)
+        parser.add_argument("-d", "--duration", type=float, default=15.0, help="secondes")
+        parser.add_argument("--timeout", type=float, default=60.0)
+
+    def handle(self, *args, **o):
+        today = date.today()
+        paths = o["paths"] or [
+            f"/api/calendario/location-calendar?year={today.year}",
+            f"/api/eventi/mese?year={today.year}&month={today.month}",
+            f"/api/magazzino/calendar?year={today.year}",
+            f"/api/magazzino/status?from={today.isoformat()}&to={today.isoformat()}",
+        ]
+        base = o["base"].rstrip("/")
+        stop_at = time.perf_counter() + o["duration"]
+
+        lock = threading.Lock()
+        lat: dict[str, list[float]] = defaultdict(list)
+        errors: dict[str, int] = defaultdict(int)
+
+        def worker(offset: int):
+            i = offset
+            while time.perf_counter() < stop_at:
+                path = paths[i % len(paths)]
+                i += 1
+                t0 = time.perf_counter()
+                ok = True
+                try:
+                    with urllib.request.urlopen(base + path, timeout=o["timeout"]) as resp:
+                        resp.read()
+                        ok = resp.status < 400
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                dt = time.perf_counter() - t0
+                with lock:
+                    if ok:
+                        lat[path].append(dt)
+                    else:
+                        errors[path] += 1
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(k,), daemon=True)
+                   for k in range(max(1, o["concurrency"]))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(len(v) for v in lat.values())
+        self.stdout.write(f"{base}  concurrency={o['concurrency']}  durée={elapsed:.1f}s")
+        self.stdout.write(f"{'chemin':60} {'n':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for path in paths:
+            v = lat.get(path, [])
+            self.stdout.write(
+                f"{path[:60]:60} {len(v):6d} {errors.get(path, 0):5d} "
+                f"{_pct(v, 50) * 1000:7.0f}ms {_pct(v, 95) * 1000:7.0f}ms {_pct(v, 99) * 1000:7.0f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Total: {total} req OK, {sum(errors.values())} erreurs, {total / elapsed:.1f} req/s"
+        ))
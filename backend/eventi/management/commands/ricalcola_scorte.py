@@ -0,0 +1,37 @@
+# (chemin : /backend/eventi/management/commands/ricalcola_scorte.py)
+"""
+Contrôle / réparation de Materiale.scorta = total des giacenze (eventi/giacenze.py).
+
+    python manage.py ricalcola_scorte --verifica   # liste les écarts, code retour 1 s'il y en a
+    python manage.py ricalcola_scorte              # répare (scorta = somme des MagazzinoItem)
+
+Normalement inutile : les deux sont mis à jour dans la même transaction.
+À lancer après un import SQL direct ou une écriture par queryset.update().
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from eventi import giacenze
+
+
+class Command(BaseCommand):
+    help = "Vérifie / répare Materiale.scorta par rapport aux giacenze (MagazzinoItem)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verifica", action="store_true", help="Contrôle seul, sans écrire.")
+
+    def handle(self, *args, **o):
+        diff = list(giacenze.differenze())
+        for d in diff:
+            self.stdout.write(f"[{d['id']}] {d['nome'][:40]:<40} scorta {d['scorta']:>5}  giacenze {d['giacenze']:>5}")
+
+        if o["verifica"]:
+            if diff:
+                raise CommandError(f"{len(diff)} materiali avec scorta != giacenze")
+            self.stdout.write(self.style.SUCCESS("scorte OK"))
+            return
+
+        if diff:
+            with transaction.atomic():
+                giacenze.ricalcola([d["id"] for d in diff])
+        self.stdout.write(self.style.SUCCESS(f"{len(diff)} materiali ricalcolati"))
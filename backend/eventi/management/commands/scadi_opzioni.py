@@ -0,0 +1,45 @@
+# (chemin : /backend/eventi/management/commands/scadi_opzioni.py)
+"""
+Balayeur des options de stock échues (eventi/opzioni.py).
+
+    python manage.py scadi_opzioni                # une passe (cron)
+    python manage.py scadi_opzioni --ogni 300     # boucle, une passe toutes les 5 min (supervisord)
+    python manage.py scadi_opzioni --dry-run
+
+Chaque option levée passe par Evento.save() : versions de données (ETag),
+notification SSE et /api/calendario/changes suivent comme pour une
+modification faite dans l'interface.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from eventi import opzioni
+
+
+class Command(BaseCommand):
+    help = "Lève les options (holds) des bozze arrivées à échéance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ogni", type=int, default=0,
+                            help="Secondes entre deux passes (0 = une seule passe).")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def _passe(self, dry_run: bool) -> None:
+        if dry_run:
+            ids = list(opzioni.scadute().values_list("pk", flat=True))
+            self.stdout.write(f"{len(ids)} opzioni scadute (dry-run) : {ids}")
+            return
+        ids = opzioni.scadi()
+        if ids:
+            self.stdout.write(f"{len(ids)} opzioni rilasciate : {ids}")
+
+    def handle(self, *args, **o):
+        if o["ogni"] <= 0:
+            self._passe(o["dry_run"])
+            return
+        while True:
+            close_old_connections()
+            self._passe(o["dry_run"])
+            time.sleep(o["ogni"])
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0018_evento_data_evento_a_evento_data_evento_da'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DistanzaLuogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('km', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('durata_min', models.PositiveIntegerField(blank=True, null=True)),
+                ('fonte', models.CharField(choices=[('manuale', 'manuale'), ('dataset', 'dataset')], default='manuale', max_length=10)),
+            ],
+            options={
+                'verbose_name': 'Distanza',
+                'verbose_name_plural': 'Distanze',
+            },
+        ),
+        migrations.AddField(
+            model_name='distanzaluogo',
+            name='destinazione',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='distanze_in_arrivo', to='eventi.luogo'),
+        ),
+        migrations.AddField(
+            model_name='distanzaluogo',
+            name='origine',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='distanze_in_partenza', to='eventi.luogo'),
+        ),
+        migrations.AddConstraint(
+            model_name='distanzaluogo',
+            constraint=models.UniqueConstraint(fields=('origine', 'destinazione'), name='uniq_distanza_origine_destinazione'),
+        ),
+        migrations.AddConstraint(
+            model_name='distanzaluogo',
+            constraint=models.UniqueConstraint(condition=models.Q(('origine__isnull', True)), fields=('destinazione',), name='uniq_distanza_deposito_destinazione'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0019_distanzaluogo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SequenzaExternalId',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefisso', models.CharField(max_length=8)),
+                ('anno', models.PositiveSmallIntegerField()),
+                ('valore', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Sequenza external_id',
+                'verbose_name_plural': 'Sequenze external_id',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sequenzaexternalid',
+            constraint=models.UniqueConstraint(fields=('prefisso', 'anno'), name='uniq_sequenza_prefisso_anno'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Périodes eventi en daterange (PostgreSQL uniquement, no-op ailleurs).
+#
+# - index GiST sur l'expression daterange de l'evento (cf. eventi/periodi.py)
+#   -> filtres `span && daterange(d0, d1)` servis par l'index ;
+# - contrainte d'exclusion : deux eventi non annullati ne peuvent pas occuper
+#   la même location sur des périodes qui se chevauchent. location_index est
+#   passé en int4range pour rester dans les opclass GiST natives (pas besoin
+#   de l'extension btree_gist).
+from django.db import migrations
+
+SPAN = (
+    "daterange(COALESCE(data_evento_da, data_evento), "
+    "COALESCE(data_evento_a, data_evento_da, data_evento), '[]')"
+)
+INDICE_SPAN = "eventi_evento_span_gist"
+VINCOLO_LOCATION = "eventi_evento_location_no_overlap"
+
+# daterange() refuse fin < début : à corriger avant l'index et la contrainte
+INVERTITI_SQL = """
+SELECT id FROM eventi_evento
+WHERE COALESCE(data_evento_a, data_evento_da, data_evento) < COALESCE(data_evento_da, data_evento)
+ORDER BY id
+"""
+
+CONFLITTI_SQL = f"""
+SELECT a.id, b.id, a.location_index
+FROM eventi_evento a
+JOIN eventi_evento b
+  ON a.id < b.id
+ AND a.location_index = b.location_index
+ AND {SPAN.replace("data_evento", "a.data_evento")} && {SPAN.replace("data_evento", "b.data_evento")}
+WHERE a.stato <> 'annullato' AND b.stato <> 'annullato'
+ORDER BY a.id, b.id
+"""
+
+
+def forwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cur:
+        cur.execute(INVERTITI_SQL)
+        invertiti = [r[0] for r in cur.fetchall()]
+    if invertiti:
+        dettaglio = ", ".join(f"#{pk}" for pk in invertiti[:20])
+        raise RuntimeError(
+            f"{len(invertiti)} eventi hanno data_evento_a prima dell'inizio: {dettaglio}. "
+            f"Correggere le date, poi rilanciare migrate."
+        )
+    with schema_editor.connection.cursor() as cur:
+        cur.execute(CONFLITTI_SQL)
+        conflitti = cur.fetchall()
+    if conflitti:
+        dettaglio = ", ".join(f"#{a}/#{b} (L{loc})" for a, b, loc in conflitti[:20])
+        raise RuntimeError(
+            f"{len(conflitti)} coppie di eventi occupano la stessa location su date "
+            f"sovrapposte: {dettaglio}. Spostarle o annullarle, poi rilanciare migrate."
+        )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDICE_SPAN} ON eventi_evento USING gist ({SPAN})"
+    )
+    schema_editor.execute(
+        f"ALTER TABLE eventi_evento ADD CONSTRAINT {VINCOLO_LOCATION} "
+        f"EXCLUDE USING gist ("
+        f"int4range(location_index, location_index, '[]') WITH &&, {SPAN} WITH &&"
+        f") WHERE (stato <> 'annullato')"
+    )
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"ALTER TABLE eventi_evento DROP CONSTRAINT IF EXISTS {VINCOLO_LOCATION}")
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDICE_SPAN}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eventi", "0020_sequenzaexternalid"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0021_evento_span_postgres'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='cliente',
+            options={'verbose_name': 'Cliente', 'verbose_name_plural': 'Clienti'},
+        ),
+        migrations.AlterModelOptions(
+            name='evento',
+            options={'verbose_name': 'Evento', 'verbose_name_plural': 'Eventi'},
+        ),
+        migrations.AlterModelOptions(
+            name='luogo',
+            options={'verbose_name': 'Luogo', 'verbose_name_plural': 'Luoghi'},
+        ),
+        migrations.AlterModelOptions(
+            name='materiale',
+            options={'verbose_name': 'Materiale', 'verbose_name_plural': 'Materiali'},
+        ),
+        migrations.AlterModelOptions(
+            name='mezzo',
+            options={'verbose_name': 'Mezzo', 'verbose_name_plural': 'Mezzi'},
+        ),
+        migrations.AlterModelOptions(
+            name='rigaevento',
+            options={'verbose_name': 'RigaEvento', 'verbose_name_plural': 'RigaEventi'},
+        ),
+        migrations.AlterModelOptions(
+            name='tecnico',
+            options={'verbose_name': 'Tecnico', 'verbose_name_plural': 'Tecnici'},
+        ),
+        migrations.AddIndex(
+            model_name='calendarioslot',
+            index=models.Index(fields=['data', 'location_index'], name='slot_data_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['data_evento_da', 'data_evento_a'], name='evento_da_a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['stato', 'data_evento'], name='evento_stato_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rigaevento',
+            index=models.Index(fields=['materiale', 'evento'], name='riga_materiale_evento_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+DOMINI = ("calendario", "stock", "catalogo", "prezzi")
+
+
+def crea_domini(apps, schema_editor):
+    VersioneDati = apps.get_model("eventi", "VersioneDati")
+    for dominio in DOMINI:
+        VersioneDati.objects.get_or_create(dominio=dominio)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0022_indici_composti'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersioneDati',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dominio', models.CharField(max_length=20, unique=True)),
+                ('versione', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Versione dati',
+                'verbose_name_plural': 'Versioni dati',
+            },
+        ),
+        migrations.RunPython(crea_domini, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0023_versionedati'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoEliminato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evento_id', models.PositiveIntegerField()),
+                ('data_da', models.DateField(blank=True, null=True)),
+                ('data_a', models.DateField(blank=True, null=True)),
+                ('eliminato_il', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Evento eliminato',
+                'verbose_name_plural': 'Eventi eliminati',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='evento',
+            index=models.Index(fields=['updated_at'], name='evento_updated_idx'),
+        ),
+    ]
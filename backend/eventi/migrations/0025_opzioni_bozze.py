@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:53
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def opzioni_bozze_esistenti(apps, schema_editor):
+    # les bozze comptaient déjà dans le stock : même option qu'une bozza neuve,
+    # pour ne rien changer aux disponibilités avant la première échéance
+    Evento = apps.get_model("eventi", "Evento")
+    giorni = max(1, int(getattr(settings, "EVENTI_OPZIONE_GIORNI", 7)))
+    Evento.objects.filter(stato="bozza").update(opzione_scadenza=timezone.now() + timedelta(days=giorni))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0024_calendario_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evento',
+            name='opzione_scadenza',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(opzioni_bozze_esistenti, migrations.RunPython.noop),
+    ]
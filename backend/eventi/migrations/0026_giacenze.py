@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def giacenze_iniziali(apps, schema_editor):
+    # chaque materiale a sa giacenza : la scorta actuelle devient le stock physique ;
+    # là où des giacenze existaient déjà, c'est leur total qui fait foi
+    Materiale = apps.get_model("eventi", "Materiale")
+    MagazzinoItem = apps.get_model("eventi", "MagazzinoItem")
+    MagazzinoItem.objects.bulk_create([
+        MagazzinoItem(materiale_id=pk, qta=scorta or 0)
+        for pk, scorta in Materiale.objects.filter(stock__isnull=True).values_list("pk", "scorta")
+    ])
+    totale = (MagazzinoItem.objects.filter(materiale_id=OuterRef("pk")).order_by()
+              .values("materiale_id").annotate(t=Sum("qta")).values("t"))
+    Materiale.objects.update(scorta=Coalesce(Subquery(totale), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0025_opzioni_bozze'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='magazzinoitem',
+            old_name='qta_disponibile',
+            new_name='qta',
+        ),
+        migrations.RemoveField(
+            model_name='magazzinoitem',
+            name='qta_prenotata',
+        ),
+        migrations.AddConstraint(
+            model_name='magazzinoitem',
+            constraint=models.UniqueConstraint(fields=('materiale',), name='magazzinoitem_materiale_unico'),
+        ),
+        migrations.RunPython(giacenze_iniziali, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def magazzino_principale(apps, schema_editor):
+    # le deposito unique d'avant devient le magazzino principale (luogo NULL =
+    # origine "deposito" de la matrice distanze) et garde toutes les giacenze
+    Magazzino = apps.get_model("eventi", "Magazzino")
+    MagazzinoItem = apps.get_model("eventi", "MagazzinoItem")
+    deposito = Magazzino.objects.create(nome="Deposito", principale=True)
+    MagazzinoItem.objects.update(magazzino=deposito)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('eventi', '0026_giacenze'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Magazzino',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('nome', models.CharField(max_length=120, unique=True)),
+                ('principale', models.BooleanField(default=False)),
+                ('luogo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='magazzini', to='eventi.luogo')),
+            ],
+            options={
+                'verbose_name_plural': 'Magazzini',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('principale', True)), fields=('principale',), name='magazzino_un_principale')],
+            },
+        ),
+        migrations.AddField(
+            model_name='magazzinoitem',
+            name='magazzino',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='giacenze', to='eventi.magazzino'),
+        ),
+        migrations.RunPython(magazzino_principale, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='magazzinoitem',
+            name='magazzino',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='giacenze', to='eventi.magazzino'),
+        ),
+        migrations.RemoveConstraint(
+            model_name='magazzinoitem',
+            name='magazzinoitem_materiale_unico',
+        ),
+        migrations.AddConstraint(
+            model_name='magazzinoitem',
+            constraint=models.UniqueConstraint(fields=('materiale', 'magazzino'), name='magazzinoitem_materiale_magazzino'),
+        ),
+        migrations.AddField(
+            model_name='evento',
+            name='magazzino',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='eventi', to='eventi.magazzino'),
+        ),
+        migrations.CreateModel(
+            name='Trasferimento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('qta', models.PositiveIntegerField()),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('a', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='trasferimenti_in_entrata', to='eventi.magazzino')),
+                ('da', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='trasferimenti_in_uscita', to='eventi.magazzino')),
+                ('evento', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trasferimenti', to='eventi.evento')),
+                ('materiale', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='trasferimenti', to='eventi.materiale')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
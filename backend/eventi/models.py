@@ -61,9 +61,46 @@ class Luogo(Timestamped):
         verbose_name_plural = "Luoghi"  # plural correc
 
 
+class DistanzaLuogo(Timestamped):
+    """
+    Matrice des distances routières (aller simple, en km).
+    origine = NULL  -> départ du deposito (magazzino principal)
+    Remplie à la main (Anagrafe/admin) ou importée d'un dataset de routing
+    hors-ligne (`manage.py import_distanze`). Lue via eventi/distanze.py.
+    """
+    FONTE = [
+        ("manuale", "manuale"),
+        ("dataset", "dataset"),
+    ]
+    origine = models.ForeignKey(
+        Luogo, on_delete=models.CASCADE, null=True, blank=True,
+        related_name="distanze_in_partenza",
+    )
+    destinazione = models.ForeignKey(Luogo, on_delete=models.CASCADE, related_name="distanze_in_arrivo")
+    km = models.DecimalField(max_digits=8, decimal_places=2)
+    durata_min = models.PositiveIntegerField(null=True, blank=True)
+    fonte = models.CharField(max_length=10, choices=FONTE, default="manuale")
+
+    def __str__(self):
+        return f"{self.origine or 'Deposito'} → {self.destinazione}: {self.km} km"
+
+    class Meta:
+        verbose_name = "Distanza"
+        verbose_name_plural = "Distanze"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["origine", "destinazione"], name="uniq_distanza_origine_destinazione",
+            ),
+            models.UniqueConstraint(
+                fields=["destinazione"], condition=models.Q(origine__isnull=True),
+                name="uniq_distanza_deposito_destinazione",
+            ),
+        ]
+
+
 # backend/eventi/models.py
 
-from django.db import models
+from django.db import models, router, transaction
 
 class Materiale(models.Model):
     # --- infos de base ---
@@ -84,7 +121,8 @@ class Materiale(models.Model):
         help_text="Unité de tarification: pz=pièce, h=heure (tecnico), km=km (mezzo)",
     )
 
-    # Stock pour les matériels (ignoré pour tecnico/mezzo)
+    # Stock pour les matériels (ignoré pour tecnico/mezzo) : total des
+    # giacenze (MagazzinoItem), maintenu par eventi/giacenze.py
     scorta = models.IntegerField(default=0)
 
     # --- types / flags ---
@@ -98,6 +136,13 @@ class Materiale(models.Model):
     )
     is_archived = models.BooleanField(default=False, db_index=True)
 
+    def save(self, *args, **kwargs):
+        # pre_save verrouille la ligne, post_save reporte l'écart sur la giacenza :
+        # une seule transaction (cf. signals.scorta_prima, giacenze.py)
+        using = kwargs.get("using") or router.db_for_write(Materiale, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.nome
 
@@ -129,11 +174,65 @@ class RegolaSuggerimento(models.Model):
 
 
 
+class Magazzino(Timestamped):
+    """
+    Deposito où le matériel est stocké.
+    luogo = position dans la matrice distanze ; NULL = le deposito historique
+    (origine NULL de DistanzaLuogo). Le magazzino principale sert les eventi
+    sans magazzino et reçoit les écarts de scorta saisis sur le Materiale.
+    """
+    nome = models.CharField(max_length=120, unique=True)
+    luogo = models.ForeignKey(Luogo, on_delete=models.SET_NULL, null=True, blank=True, related_name="magazzini")
+    principale = models.BooleanField(default=False)
+
+    def __str__(self):
+        return self.nome
+
+    class Meta:
+        verbose_name_plural = "Magazzini"
+        constraints = [
+            models.UniqueConstraint(fields=["principale"], condition=models.Q(principale=True),
+                                    name="magazzino_un_principale"),
+        ]
+
+
 class MagazzinoItem(Timestamped):
-    """Optionnel : vue détaillée par matériel si tu veux suivre réservé/disponible."""
+    """
+    Giacenza : quantité physique d'un materiale dans un magazzino, source du
+    stock. Materiale.scorta en est le total (tous magazzini) dénormalisé, tenu
+    à jour dans la même transaction (cf. eventi/giacenze.py) : les
+    disponibilités globales ne lisent que Materiale.scorta. Le réservé se
+    calcule depuis les righe (disponibilita.py).
+    """
     materiale = models.ForeignKey(Materiale, on_delete=models.CASCADE, related_name="stock")
-    qta_disponibile = models.IntegerField(default=0)
-    qta_prenotata = models.IntegerField(default=0)
+    magazzino = models.ForeignKey(Magazzino, on_delete=models.PROTECT, related_name="giacenze")
+    qta = models.IntegerField(default=0)
+
+    def save(self, *args, **kwargs):
+        # même raison que Materiale.save (cf. signals.giacenza_prima)
+        using = kwargs.get("using") or router.db_for_write(MagazzinoItem, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        constraints = [
+            # sert aussi d'index (materiale, magazzino) aux lectures par magazzino
+            models.UniqueConstraint(fields=["materiale", "magazzino"], name="magazzinoitem_materiale_magazzino"),
+        ]
+
+
+class Trasferimento(Timestamped):
+    """Mouvement de stock d'un magazzino à l'autre (journal, appliqué par giacenze.trasferisci)."""
+    materiale = models.ForeignKey(Materiale, on_delete=models.PROTECT, related_name="trasferimenti")
+    da = models.ForeignKey(Magazzino, on_delete=models.PROTECT, related_name="trasferimenti_in_uscita")
+    a = models.ForeignKey(Magazzino, on_delete=models.PROTECT, related_name="trasferimenti_in_entrata")
+    qta = models.PositiveIntegerField()
+    evento = models.ForeignKey("Evento", on_delete=models.SET_NULL, null=True, blank=True,
+                               related_name="trasferimenti")
+    note = models.CharField(max_length=200, blank=True)
+
+    def __str__(self):
+        return f"{self.materiale} x{self.qta}: {self.da} → {self.a}"
 
 
 # --------- Eventi ---------
@@ -187,15 +286,27 @@ class Evento(Timestamped):
     )
     categoria_notes = models.JSONField(blank=True, null=True, default=dict)
 
-    class Meta:
+    # option (hold) d'une bozza sur le stock : compte dans les disponibilités
+    # jusqu'à cette échéance, puis levée par `manage.py scadi_opzioni` (cf. eventi/opzioni.py)
+    opzione_scadenza = models.DateTimeField(null=True, blank=True)
 
-        indexes = [
-            models.Index(fields=["data_evento", "location_index"]),
-        ]
+    # magazzino d'où part le matériel : le plus proche du luogo qui couvre les
+    # righe, choisi à l'enregistrement (cf. eventi/magazzini.py) ; NULL = principale
+    magazzino = models.ForeignKey(Magazzino, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name="eventi")
 
     class Meta:
         verbose_name = "Evento"  # singular correct
         verbose_name_plural = "Eventi"  # plural correc
+        indexes = [
+            models.Index(fields=["data_evento", "location_index"]),
+            # chevauchement de périodes (cf. eventi/periodi.py, fallback SQLite)
+            models.Index(fields=["data_evento_da", "data_evento_a"], name="evento_da_a_idx"),
+            # listes / stats filtrées par stato sur une plage de dates
+            models.Index(fields=["stato", "data_evento"], name="evento_stato_data_idx"),
+            # /api/calendario/changes : eventi modifiés depuis un token (cf. eventi/sincro.py)
+            models.Index(fields=["updated_at"], name="evento_updated_idx"),
+        ]
 
     versione = models.IntegerField(default=0)
 
@@ -208,13 +319,19 @@ class Evento(Timestamped):
 
     @property
     def distanza_rilevante_km(self):
-        """Priorità: evento.distanza_km -> luogo.distanza_km -> 0"""
+        """
+        Priorità: evento.distanza_km -> matrice distanze (deposito) -> luogo.distanza_km -> 0
+
+        Calculée par la DB quand l'evento vient de logistica.eventi_con_km()
+        (annotation `km`, à utiliser pour toute liste d'eventi) ; sinon une
+        lecture de la matrice, gardée sur l'instance.
+        """
         if self.distanza_km is not None:
             return self.distanza_km
-        try:
-            return self.luogo.distanza_km
-        except Exception:
-            return Decimal("0")
+        if getattr(self, "km", None) is None:
+            from .distanze import km_deposito  # distanze.py importe ce module
+            self.km = km_deposito(self.luogo_id)
+        return self.km
 
 
 
@@ -232,6 +349,10 @@ class RigaEvento(Timestamped):
     class Meta:
         verbose_name = "RigaEvento"  # singular correct
         verbose_name_plural = "RigaEventi"  # plural correc
+        indexes = [
+            # disponibilité / bookings d'un materiale : materiale -> eventi
+            models.Index(fields=["materiale", "evento"], name="riga_materiale_evento_idx"),
+        ]
 
 
 
@@ -240,6 +361,12 @@ class CalendarioSlot(Timestamped):
     location_index = models.PositiveSmallIntegerField()
     evento = models.OneToOneField(Evento, on_delete=models.CASCADE, related_name="slot")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["data", "location_index"], name="slot_data_location_idx"),
+        ]
+
+
 class EventoRevision(models.Model):
     # Chemin: /backend/eventi/models.py
     evento = models.ForeignKey('Evento', related_name='revisions', on_delete=models.CASCADE)
@@ -313,3 +440,62 @@ class Sottocategoria(models.Model):
     nome = models.CharField(max_length=120)
     categoria = models.ForeignKey(Categoria, on_delete=models.SET_NULL, null=True, blank=True)
 
+
+
+class SequenzaExternalId(models.Model):
+    """
+    Compteur par (prefisso, anno) pour les external_id "PFX-ANNO-NNNN".
+    Incrémenté par UPDATE atomique (cf. eventi/utils.py) : pas de COUNT(*)
+    sur la table métier, pas de doublons sous concurrence.
+    """
+    prefisso = models.CharField(max_length=8)
+    anno = models.PositiveSmallIntegerField()
+    valore = models.PositiveIntegerField(default=0)  # dernier numéro attribué
+
+    def __str__(self):
+        return f"{self.prefisso}-{self.anno}: {self.valore}"
+
+    class Meta:
+        verbose_name = "Sequenza external_id"
+        verbose_name_plural = "Sequenze external_id"
+        constraints = [
+            models.UniqueConstraint(fields=["prefisso", "anno"], name="uniq_sequenza_prefisso_anno"),
+        ]
+
+
+class VersioneDati(models.Model):
+    """
+    Compteur de version par domaine de données (calendario, stock, catalogo,
+    prezzi), incrémenté à chaque écriture (cf. eventi/versioni_dati.py).
+    Clé d'ETag / de cache : savoir si un domaine a changé coûte une lecture
+    d'une ligne, au lieu d'un MAX(updated_at) sur les tables métier.
+    """
+    dominio = models.CharField(max_length=20, unique=True)
+    versione = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.dominio}: {self.versione}"
+
+    class Meta:
+        verbose_name = "Versione dati"
+        verbose_name_plural = "Versioni dati"
+
+
+class EventoEliminato(models.Model):
+    """
+    Tombstone d'un evento supprimé (cf. eventi/sincro.py) : un client qui
+    garde le calendrier en cache apprend la suppression via
+    /api/calendario/changes. Conservé EVENTI_TOMBSTONE_GIORNI jours.
+    """
+    evento_id = models.PositiveIntegerField()
+    data_da = models.DateField(null=True, blank=True)   # période de l'evento supprimé
+    data_a = models.DateField(null=True, blank=True)
+    eliminato_il = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"evento {self.evento_id} eliminato il {self.eliminato_il:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        verbose_name = "Evento eliminato"
+        verbose_name_plural = "Eventi eliminati"
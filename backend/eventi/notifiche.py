@@ -0,0 +1,202 @@
+# (chemin : /backend/eventi/notifiche.py)
+"""
+Notifications "push" des changements eventi / righe (flux SSE /api/stream).
+
+Au commit d'une écriture, un message compact est publié :
+
+    {"tipo": "evento"|"riga", "azione": "save"|"delete", "evento": 12,
+     "date": [["2025-12-30", "2026-01-02"], ...],   # périodes touchées (avant/après)
+     "materiali": [3, 7],                           # materiali dont le stock bouge
+     "domini": ["calendario", "stock"]}             # cf. versioni_dati
+
+Le client ne recharge que ce qui est concerné (année, mois, materiale...).
+
+Broker :
+  - local (défaut) : en mémoire, même process (runserver, tests) ;
+  - Redis pub/sub si settings.EVENTI_PUSH_REDIS_URL est défini : obligatoire
+    dès que les écritures (gunicorn) et le flux (uvicorn) tournent dans des
+    process différents (supervisord.conf lance un redis-server local). Sans
+    lui, en production (DEBUG=0), /api/stream répond 503 plutôt que de
+    rester muet (cf. condiviso()).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Evento, RigaEvento
+
+import redis
+import redis.asyncio as aredis
+
+logger = logging.getLogger(__name__)
+
+CANALE = "arteluce:notifiche"
+CODA_MAX = 200  # au-delà, le client a décroché : on lui envoie "resync"
+
+
+def span(data_evento, da, a) -> Optional[list[str]]:
+    """Période [début, fin] ISO d'un evento (None si sans date)."""
+    start = da or data_evento
+    if not start:
+        return None
+    return [start.isoformat(), (a or start).isoformat()]
+
+
+def messaggio(tipo: str, azione: str, evento_id: int, spans: Iterable, materiali: Iterable[int] = (),
+              domini: Iterable[str] = ()) -> dict:
+    date_ = sorted({tuple(s) for s in spans if s})
+    return {
+        "tipo": tipo,
+        "azione": azione,
+        "evento": evento_id,
+        "date": [list(s) for s in date_],
+        "materiali": sorted({int(m) for m in materiali if m}),
+        "domini": sorted(set(domini)),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Brokers
+# ---------------------------------------------------------------------------
+
+class BrokerLocale:
+    """Abonnés = files asyncio du process courant (publication thread-safe)."""
+
+    def __init__(self):
+        self._abbonati: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = set()
+        self._lock = threading.Lock()
+
+    def pubblica(self, msg: dict) -> None:
+        with self._lock:
+            abbonati = list(self._abbonati)
+        for loop, coda in abbonati:
+            loop.call_soon_threadsafe(self._metti, coda, msg)
+
+    @staticmethod
+    def _metti(coda: asyncio.Queue, msg: dict) -> None:
+        if coda.full():
+            while not coda.empty():
+                coda.get_nowait()
+            msg = {"tipo": "resync"}
+        coda.put_nowait(msg)
+
+    @asynccontextmanager
+    async def abbonamento(self):
+        """`async with broker.abbonamento() as prossimo: msg = await prossimo(15)`"""
+        voce = (asyncio.get_running_loop(), asyncio.Queue(maxsize=CODA_MAX))
+        with self._lock:
+            self._abbonati.add(voce)
+
+        async def prossimo(timeout: float) -> Optional[dict]:
+            try:
+                return await asyncio.wait_for(voce[1].get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        try:
+            yield prossimo
+        finally:
+            with self._lock:
+                self._abbonati.discard(voce)
+
+
+class BrokerRedis:
+    """Pub/sub Redis : toutes les écritures, tous les process."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = None
+
+    def pubblica(self, msg: dict) -> None:
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        try:
+            self._client.publish(CANALE, json.dumps(msg))
+        except redis.RedisError:
+            # la notification est un confort : l'écriture, elle, est commitée
+            logger.warning("notifiche: publication Redis impossible", exc_info=True)
+
+    @asynccontextmanager
+    async def abbonamento(self):
+        client = aredis.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(CANALE)
+
+        async def prossimo(timeout: float) -> Optional[dict]:
+            m = await pubsub.get_message(timeout=timeout)
+            return json.loads(m["data"]) if m else None
+
+        try:
+            yield prossimo
+        finally:
+            await pubsub.unsubscribe(CANALE)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+_broker = None
+
+
+def broker():
+    global _broker
+    if _broker is None:
+        url = getattr(settings, "EVENTI_PUSH_REDIS_URL", "")
+        _broker = BrokerRedis(url) if url else BrokerLocale()
+    return _broker
+
+
+def condiviso() -> bool:
+    """Le broker relie-t-il tous les process (écritures gunicorn -> flux uvicorn) ?"""
+    return isinstance(broker(), BrokerRedis)
+
+
+def pubblica_al_commit(msg: dict, using: Optional[str] = None) -> None:
+    """Publie après le commit (rien si la transaction est annulée)."""
+    transaction.on_commit(lambda: broker().pubblica(msg), using=using)
+
+
+# ---------------------------------------------------------------------------
+# Messages métier (signals.py + bulk_create de righe)
+# ---------------------------------------------------------------------------
+
+def span_evento(ev) -> Optional[list[str]]:
+    return span(ev.data_evento, ev.data_evento_da, ev.data_evento_a)
+
+
+def evento_cambiato(ev, azione: str, prima: Optional[tuple] = None,
+                    materiali: Iterable[int] = (), using: Optional[str] = None) -> None:
+    """`prima` = (data_evento, da, a) avant modification : l'ancienne période est touchée aussi."""
+    spans = [span_evento(ev)] + ([span(*prima)] if prima else [])
+    pubblica_al_commit(
+        messaggio("evento", azione, ev.pk, spans, materiali, ("calendario", "stock")), using=using,
+    )
+
+
+def riga_cambiata(riga, azione: str, using: Optional[str] = None) -> None:
+    evento_id, materiale_id = riga.evento_id, riga.materiale_id
+    noto = span_evento(riga.evento) if RigaEvento.evento.is_cached(riga) else None
+
+    def invia():
+        s = noto
+        if s is None:
+            # evento supprimé (cascade) : sa propre notification porte déjà les dates
+            row = Evento.objects.using(using).filter(pk=evento_id).values_list(
+                "data_evento", "data_evento_da", "data_evento_a").first()
+            s = span(*row) if row else None
+        broker().pubblica(messaggio("riga", azione, evento_id, [s], [materiale_id], ("stock", "prezzi")))
+
+    transaction.on_commit(invia, using=using)
+
+
+def righe_cambiate(evento, materiali: Iterable[int], azione: str = "save") -> None:
+    """Righe écrites sans signal (bulk_create) : une notification pour le lot."""
+    pubblica_al_commit(messaggio("riga", azione, evento.pk, [span_evento(evento)], materiali,
+                                 ("stock", "prezzi")))
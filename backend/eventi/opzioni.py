@@ -0,0 +1,102 @@
+# (chemin : /backend/eventi/opzioni.py)
+"""
+Options (holds) des bozze sur le stock, et règle unique "quels eventi
+comptent dans les disponibilités".
+
+- confermato / fatturato : réservation ferme, compte toujours ;
+- bozza : pose une option de EVENTI_OPZIONE_GIORNI jours (signals.py, à la
+  création ou au retour en bozza) ; elle compte tant que l'option est
+  active, puis `manage.py scadi_opzioni` la lève ;
+- annullato : ne compte jamais.
+
+L'option est un champ de l'evento (Evento.opzione_scadenza) : les requêtes
+de disponibilité gardent leur jointure righe -> evento, le filtre est un
+simple prédicat sur la ligne evento déjà lue, sans table en plus.
+
+Une option "active" = opzione_scadenza non nulle : l'échéance n'est pas
+comparée à l'heure dans les lectures (les réponses restent cachables, cf.
+etag.py) ; c'est la levée par le balayeur, un save() normal, qui change
+les versions de données et notifie les clients.
+
+    RigaEvento.objects.filter(opzioni.conteggiati_q("evento__"))
+    opzioni.conteggiati_q("evento__", include_holds=False)   # réservations fermes seules
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Evento
+
+STATI_CONTEGGIATI = ("confermato", "fatturato")
+STATO_OPZIONE = "bozza"
+
+_FALSI = {"0", "false", "no", "off"}
+
+
+def giorni_opzione() -> int:
+    return max(1, int(getattr(settings, "EVENTI_OPZIONE_GIORNI", 7)))
+
+
+def nuova_scadenza():
+    return timezone.now() + timedelta(days=giorni_opzione())
+
+
+def conteggiati_q(prefix: str = "", include_holds: bool = True) -> Q:
+    """Eventi qui occupent le stock (prefix "evento__" depuis RigaEvento)."""
+    q = Q(**{f"{prefix}stato__in": STATI_CONTEGGIATI})
+    if include_holds:
+        q |= Q(**{f"{prefix}stato": STATO_OPZIONE, f"{prefix}opzione_scadenza__isnull": False})
+    return q
+
+
+def conteggiato(ev: Evento, include_holds: bool = True) -> bool:
+    """conteggiati_q() pour une instance déjà chargée."""
+    if ev.stato in STATI_CONTEGGIATI:
+        return True
+    return include_holds and ev.stato == STATO_OPZIONE and ev.opzione_scadenza is not None
+
+
+def include_holds(params) -> bool:
+    """?include_holds=0|false|no -> réservations fermes seules (défaut : options comprises)."""
+    return str(params.get("include_holds", "1")).strip().lower() not in _FALSI
+
+
+def allinea(ev: Evento, stato_prima: str | None) -> None:
+    """
+    Avant save (signals.py) : option posée quand un evento devient bozza
+    (création comprise), retirée quand il la quitte. Une bozza dont
+    l'option est échue reste sans option (cf. rinnova()).
+    """
+    if ev.stato != STATO_OPZIONE:
+        ev.opzione_scadenza = None
+    elif stato_prima != STATO_OPZIONE and ev.opzione_scadenza is None:
+        ev.opzione_scadenza = nuova_scadenza()
+
+
+def rinnova(ev: Evento) -> None:
+    """Repart pour EVENTI_OPZIONE_GIORNI (bozza seulement)."""
+    ev.opzione_scadenza = nuova_scadenza()
+    ev.save(update_fields=["opzione_scadenza", "updated_at"])
+
+
+def rilascia(ev: Evento) -> None:
+    ev.opzione_scadenza = None
+    ev.save(update_fields=["opzione_scadenza", "updated_at"])
+
+
+def scadute(ora=None):
+    return Evento.objects.filter(opzione_scadenza__lt=ora or timezone.now())
+
+
+def scadi(ora=None) -> list[int]:
+    """Lève les options échues ; un save() par evento (versions, notifications, changes)."""
+    ids = []
+    for ev in scadute(ora).only("pk", "stato", "data_evento", "data_evento_da", "data_evento_a",
+                                "opzione_scadenza", "location_index"):
+        rilascia(ev)
+        ids.append(ev.pk)
+    return ids
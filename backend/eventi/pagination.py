@@ -0,0 +1,86 @@
+# (chemin : /backend/eventi/pagination.py)
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class EventoCursorPagination(CursorPagination):
+    """
+    Pagination "keyset" de /api/eventi/ : le curseur encode la position
+    (data_evento, id) -> coût constant par page, même après des années
+    d'historique (pas d'OFFSET qui grossit).
+
+      ?page_size=N      (défaut 50, plafonné à 200)
+      ?ordine=desc      plus récents d'abord (conservé dans next/previous)
+    Réponse : {"next": url|null, "previous": url|null, "results": [...]}
+
+    CursorPagination de DRF ne met que le premier champ d'ordre dans le
+    curseur et complète par un décalage dans les eventi du même jour (pages
+    qui sautent / répètent des lignes si les données bougent) : ici la
+    position est le couple unique "AAAA-MM-JJ|id", filtré par
+    data_evento > d OR (data_evento = d AND id > id), sans décalage.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("data_evento", "id")
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get("ordine") == "desc":
+            return ("-data_evento", "-id")
+        return self.ordering
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        # position unique : le décalage des curseurs DRF n'a plus de sens
+        return cursor._replace(offset=0) if cursor else None
+
+    def _get_position_from_instance(self, instance, ordering):
+        if isinstance(instance, dict):
+            return f"{instance['data_evento']}|{instance['id']}"
+        return f"{instance.data_evento}|{instance.pk}"
+
+    def _dopo(self, position: str, reverse: bool) -> Q:
+        """Eventi strictement après `position` dans le sens de lecture."""
+        try:
+            giorno, pk = position.split("|")
+            giorno, pk = date.fromisoformat(giorno), int(pk)
+        except (ValueError, AttributeError):
+            raise NotFound(self.invalid_cursor_message)
+        op = "lt" if reverse != self.ordering[0].startswith("-") else "gt"
+        return Q(**{f"data_evento__{op}": giorno}) | Q(data_evento=giorno, **{f"id__{op}": pk})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._dopo(position, reverse))
+
+        # un élément de plus : y a-t-il une page après celle-ci ?
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        seguente = (self._get_position_from_instance(results[-1], self.ordering)
+                    if len(results) > len(self.page) else None)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = position is not None, position
+            self.has_previous, self.previous_position = seguente is not None, seguente
+        else:
+            self.has_next, self.next_position = seguente is not None, seguente
+            self.has_previous, self.previous_position = position is not None, position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
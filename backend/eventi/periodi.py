@@ -0,0 +1,67 @@
+# (chemin : /backend/eventi/periodi.py)
+"""
+Période couverte par un evento et filtre de chevauchement.
+
+Un evento couvre [data_evento_da, data_evento_a] ; les anciens eventi
+"jour unique" n'ont que data_evento. La période canonique est donc :
+
+    daterange(COALESCE(data_evento_da, data_evento),
+              COALESCE(data_evento_a, data_evento_da, data_evento), '[]')
+
+- PostgreSQL : cette même expression est indexée en GiST (migration 0021)
+  et le filtre devient `span && daterange(d0, d1, '[]')`, servi par l'index.
+  Une contrainte d'exclusion (location_index =, span &&) hors annullato
+  empêche le double booking d'une location.
+- Autres backends (SQLite) : l'ancien OR de deux conditions.
+"""
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import connection, models
+from django.db.models import F, Func, Q, Value
+from django.db.models.functions import Coalesce
+
+# noms des objets créés par la migration 0021 (PostgreSQL uniquement)
+INDICE_SPAN = "eventi_evento_span_gist"
+VINCOLO_LOCATION = "eventi_evento_location_no_overlap"
+
+
+class _DateRange(Func):
+    function = "daterange"
+    output_field = models.Field()
+
+
+class _Overlap(Func):
+    arg_joiner = " && "
+    template = "(%(expressions)s)"
+    output_field = models.BooleanField()
+
+
+def span_evento(prefix: str = "") -> Func:
+    """Expression daterange de l'evento (prefix="evento__" depuis RigaEvento)."""
+    return _DateRange(
+        Coalesce(F(f"{prefix}data_evento_da"), F(f"{prefix}data_evento")),
+        Coalesce(F(f"{prefix}data_evento_a"), F(f"{prefix}data_evento_da"), F(f"{prefix}data_evento")),
+        Value("[]"),
+    )
+
+
+def usa_range() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def sovrapposizione_q(d0: date, d1: date, prefix: str = "") -> Q:
+    """Eventi dont la période chevauche [d0, d1] (bornes incluses)."""
+    if usa_range():
+        return Q(_Overlap(span_evento(prefix), _DateRange(Value(d0), Value(d1), Value("[]"))))
+    return (
+        Q(**{f"{prefix}data_evento_da__lte": d1, f"{prefix}data_evento_a__gte": d0})
+        | Q(**{f"{prefix}data_evento__range": (d0, d1)})
+    )
+
+
+def periodo(data_evento: date, da: date | None = None, a: date | None = None) -> tuple[date, date]:
+    """Période [début, fin] d'un evento côté Python : même règle que span_evento()."""
+    start = da or data_evento
+    return start, a or start
@@ -0,0 +1,62 @@
+# (chemin : /backend/eventi/renderers.py)
+"""
+Renderer / parser JSON basés sur orjson (optionnel).
+
+Même sortie que rest_framework.renderers.JSONRenderer (compact, UTF-8,
+\\u2028/\\u2029 échappés) : les types qu'orjson ne gère pas comme DRF
+(datetime/time, Decimal, timedelta, lazy strings, QuerySet...) passent par
+l'encodeur DRF. Sans orjson, ou avec `; indent=N`, on retombe sur DRF.
+
+Activés dans settings.REST_FRAMEWORK si orjson est installé
+(DJANGO_FAST_JSON=0 pour forcer les classes DRF).
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+_OPTIONS = 0
+if orjson is not None:
+    # clés int (ex. {materiale_id: ...}) comme json.dumps ; datetime via DRF
+    # (millisecondes / "Z" identiques à l'encodeur DRF)
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_drf_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            orjson is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_drf_default, option=_OPTIONS)
+        except orjson.JSONEncodeError:
+            # cas limites (entier > 64 bits, surrogate isolé...) : DRF tranche
+            return super().render(data, accepted_media_type, renderer_context)
+        # comme DRF : JSON strictement sous-ensemble de JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = get_encoding(parser_context or {})
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # NaN / Infinity refusés d'office (équivalent STRICT_JSON)
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
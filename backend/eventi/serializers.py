@@ -1,29 +1,38 @@
 # backend/eventi/serializers.py
+from contextlib import contextmanager
 from decimal import Decimal
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
 from .models import (
     Cliente,
     Luogo,
+    DistanzaLuogo,
     Materiale,
     Evento,
     RigaEvento,
-    CalendarioSlot,
     EventoRevision,
     Tecnico,
     Mezzo,
+    Magazzino,
+    Trasferimento,
 )
+from . import conflitti, giacenze, magazzini, notifiche, slots, versioni_dati
+from .periodi import VINCOLO_LOCATION, periodo, usa_range
 
 __all__ = [
     "ClienteSerializer",
     "LuogoSerializer",
+    "DistanzaLuogoSerializer",
     "MaterialeSerializer",
     "TecnicoSerializer",
     "MezzoSerializer",
     "RigaEventoSerializer",
     "EventoRevisionSerializer",
     "EventoSerializer",
+    "EventoSummarySerializer",
+    "MagazzinoSerializer",
+    "TrasferimentoSerializer",
 ]
 
 # ---------------------------------------------------------------------------
@@ -45,6 +54,65 @@ class LuogoSerializer(serializers.ModelSerializer):
         fields = ["id", "nome", "indirizzo", "distanza_km_ar"]
 
 
+class DistanzaLuogoSerializer(serializers.ModelSerializer):
+    """Matrice distanze : origine null = deposito."""
+    origine_nome = serializers.SerializerMethodField()
+    destinazione_nome = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DistanzaLuogo
+        fields = [
+            "id",
+            "origine",
+            "origine_nome",
+            "destinazione",
+            "destinazione_nome",
+            "km",
+            "durata_min",
+            "fonte",
+        ]
+
+    def get_origine_nome(self, obj):
+        return getattr(obj.origine, "nome", None) or "Deposito"
+
+    def get_destinazione_nome(self, obj):
+        return getattr(obj.destinazione, "nome", None)
+
+
+class MagazzinoSerializer(serializers.ModelSerializer):
+    """Deposito : luogo null = deposito historique de la matrice distanze."""
+    luogo_nome = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Magazzino
+        fields = ["id", "nome", "luogo", "luogo_nome", "principale"]
+        # pas de validateur "un seul principale" : MagazzinoViewSet déplace le flag
+        extra_kwargs = {"principale": {"validators": []}}
+
+    def get_luogo_nome(self, obj):
+        return getattr(obj.luogo, "nome", None)
+
+    def validate_principale(self, value):
+        # on désigne un autre principale (MagazzinoViewSet retire le flag à l'ancien)
+        if self.instance is not None and self.instance.principale and not value:
+            raise serializers.ValidationError("Designare un altro magazzino come principale.")
+        return value
+
+
+class TrasferimentoSerializer(serializers.ModelSerializer):
+    """Journal des trasferimenti ; création via giacenze.trasferisci (TrasferimentoViewSet)."""
+    materiale_nome = serializers.CharField(source="materiale.nome", read_only=True)
+    da_nome = serializers.CharField(source="da.nome", read_only=True)
+    a_nome = serializers.CharField(source="a.nome", read_only=True)
+    qta = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Trasferimento
+        fields = ["id", "materiale", "materiale_nome", "da", "da_nome", "a", "a_nome",
+                  "qta", "evento", "note", "created_at"]
+        read_only_fields = ["created_at"]
+
+
 # ---------------------------------------------------------------------------
 # Matériel / Tecnico / Mezzo
 # ---------------------------------------------------------------------------
@@ -67,6 +135,15 @@ class MaterialeSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "is_archived"]
 
+    def validate_scorta(self, value):
+        # une baisse ne touche que le magazzino principale (cf. giacenze.scorta_modificata)
+        minimo = giacenze.scorta_minima(self.instance.pk if self.instance else None)
+        if value < minimo:
+            raise serializers.ValidationError(
+                f"Minimo {minimo}: il resto della giacenza è in altri magazzini (trasferirlo prima)."
+            )
+        return value
+
 
 class TecnicoSerializer(serializers.ModelSerializer):
     """Tecnici, utilisés dans Anagrafe ou logistica."""
@@ -151,6 +228,23 @@ def _materiale_pk(val):
 # ---------------------------------------------------------------------------
 
 
+@contextmanager
+def _vincolo_location():
+    """
+    PostgreSQL : la contrainte d'exclusion (location_index, période) refuse
+    un double booking -> même erreur 400 que le contrôle Python de validate().
+    """
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as e:
+        if VINCOLO_LOCATION in str(e):
+            raise serializers.ValidationError(
+                {"location_index": "Questa location è già occupata per queste date."}
+            )
+        raise
+
+
 class EventoSerializer(serializers.ModelSerializer):
     stock_tot_scorta = serializers.SerializerMethodField()
     stock_tot_dispon = serializers.SerializerMethodField()
@@ -184,7 +278,11 @@ class EventoSerializer(serializers.ModelSerializer):
             "righe",
             "stock_tot_scorta",
             "stock_tot_dispon",
+            "opzione_scadenza",
+            "magazzino",
         )
+        # posée / levée par signals.py et POST|DELETE /api/eventi/<id>/opzione/
+        read_only_fields = ("opzione_scadenza",)
 
     # ---- champs calculés simples (tu peux les enrichir plus tard) ----
 
@@ -194,20 +292,55 @@ class EventoSerializer(serializers.ModelSerializer):
     def get_luogo_nome(self, obj):
         return getattr(getattr(obj, "luogo", None), "nome", None)
 
+    # stock_tot_* : annotations SQL posées par EventoViewSet.get_queryset()
+    # (letture.annota_stock) ; None pour une instance non annotée.
+
     def get_stock_tot_scorta(self, obj):
-        # placeholder pour éviter une erreur ; adapte si tu veux un vrai calcul
-        return None
+        return getattr(obj, "stock_tot_scorta", None)
 
     def get_stock_tot_dispon(self, obj):
-        # placeholder pour éviter une erreur ; adapte si tu veux un vrai calcul
-        return None
+        return getattr(obj, "stock_tot_dispon", None)
+
+    # ---- overbooking (cf. eventi/conflitti.py) ----
+
+    def _verifica_overbooking(self, ev):
+        """
+        Après écriture des righe, dans la transaction. En mode "blocca",
+        conflitti.Overbooking annule tout ; EventoViewSet en fait un 400.
+        """
+        self._conflitti = conflitti.verifica_evento(ev)
+
+    # ---- magazzino de départ (cf. eventi/magazzini.py) ----
+
+    @staticmethod
+    def _assegna_magazzino(ev, automatico: bool, se_scoperto: bool = False):
+        """
+        Après écriture des righe : le plus proche du luogo qui les couvre, sauf
+        choix explicite. `se_scoperto` (righe remplacées) : seulement si le
+        magazzino actuel ne les couvre plus.
+        """
+        if automatico:
+            magazzini.assegna(ev, se_scoperto=se_scoperto)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # réponse d'un POST / PUT / PATCH seulement
+        if getattr(self, "_conflitti", None) is not None:
+            data["conflitti"] = self._conflitti
+        return data
 
     # ---- validation globale ----
 
     def validate(self, attrs):
         """
         Validation légère :
-        - contrôle de double booking de location (CalendarioSlot)
+        - période cohérente : data_evento_da <= data_evento_a, et data_evento
+          ni avant data_evento_da ni après data_evento_a (daterange invalide
+          sinon, cf. eventi/periodi.py) ;
+        - contrôle de double booking de location sur toute la période, hors
+          annullato (eventi/slots.py, comme /api/calendario/availability) ;
+          sous PostgreSQL c'est la contrainte d'exclusion qui s'en charge,
+          cf. _vincolo_location()
         - pas de blocage sur les dates passées pour ne pas casser les mises à jour.
         """
         instance = getattr(self, "instance", None)
@@ -216,30 +349,46 @@ class EventoSerializer(serializers.ModelSerializer):
         loc_index = attrs.get(
             "location_index", getattr(instance, "location_index", None)
         )
+        da = attrs.get("data_evento_da", getattr(instance, "data_evento_da", None))
+        a = attrs.get("data_evento_a", getattr(instance, "data_evento_a", None))
+        stato = attrs.get("stato", getattr(instance, "stato", None))
+        self._valida_periodo(data_evento, da, a)
 
         # contrôle double booking de location
-        if data_evento and loc_index:
-            qs = CalendarioSlot.objects.filter(
-                data=data_evento, location_index=loc_index
-            )
-            if instance and hasattr(instance, "slot"):
-                qs = qs.exclude(pk=getattr(instance.slot, "pk", None))
-            if qs.exists():
+        if data_evento and loc_index and stato != "annullato" and not usa_range():
+            d0, d1 = periodo(data_evento, da, a)
+            occupate = slots.occupati_periodo(d0, d1, escludi_evento=getattr(instance, "pk", None))
+            if int(loc_index) in slots.indici(occupate):
                 raise serializers.ValidationError(
-                    {
-                        "location_index": "Questa location è già occupata per questa data."
-                    }
+                    {"location_index": "Questa location è già occupata per queste date."}
                 )
 
         return attrs
 
+    @staticmethod
+    def _valida_periodo(data_evento, da, a):
+        inizio = da or data_evento
+        if inizio and a and a < inizio:
+            raise serializers.ValidationError(
+                {"data_evento_a": "La data di fine precede la data di inizio."}
+            )
+        if data_evento and da and da > data_evento:
+            raise serializers.ValidationError(
+                {"data_evento_da": "La data di inizio è successiva alla data evento."}
+            )
+        if data_evento and a and data_evento > a:
+            raise serializers.ValidationError(
+                {"data_evento": "La data evento è successiva alla data di fine."}
+            )
+
     # ---- création / mise à jour des righe ----
 
     @transaction.atomic
     def create(self, validated_data):
         righe_in = list(self.initial_data.get("righe", []) or [])
 
-        ev = Evento.objects.create(**validated_data)
+        with _vincolo_location():
+            ev = Evento.objects.create(**validated_data)
 
         bulk = []
         for r in righe_in:
@@ -265,11 +414,16 @@ class EventoSerializer(serializers.ModelSerializer):
             )
         if bulk:
             RigaEvento.objects.bulk_create(bulk)
+            versioni_dati.bump_modello(RigaEvento)  # bulk_create : pas de post_save
+            notifiche.righe_cambiate(ev, [r.materiale_id for r in bulk])
 
+        self._assegna_magazzino(ev, validated_data.get("magazzino") is None)
+        self._verifica_overbooking(ev)
         return ev
 
     @transaction.atomic
     def update(self, instance, validated_data):
+        luogo_prima = instance.luogo_id
         # champs simples de l’evento
         for f in (
             "titolo",
@@ -286,13 +440,15 @@ class EventoSerializer(serializers.ModelSerializer):
             "luogo",
             "note",
             "categoria_notes",
+            "magazzino",
         ):
             if f in validated_data:
                 setattr(instance, f, validated_data[f])
 
         # incrémente la version
         instance.versione = (instance.versione or 0) + 1
-        instance.save()
+        with _vincolo_location():
+            instance.save()
 
         # gestion des righe si présentes dans la requête
         righe_in = self.initial_data.get("righe", None)
@@ -322,10 +478,58 @@ class EventoSerializer(serializers.ModelSerializer):
                 )
             if bulk:
                 RigaEvento.objects.bulk_create(bulk)
-
+                versioni_dati.bump_modello(RigaEvento)  # bulk_create : pas de post_save
+                notifiche.righe_cambiate(instance, [r.materiale_id for r in bulk])
+
+        # magazzino re-choisi si l'evento n'en a pas ou change de luogo, ou si le
+        # sien ne couvre plus les nouvelles righe (sauf choix explicite)
+        ricalcola = instance.magazzino_id is None or instance.luogo_id != luogo_prima
+        self._assegna_magazzino(
+            instance, "magazzino" not in validated_data and (ricalcola or righe_in is not None),
+            se_scoperto=not ricalcola,
+        )
+        self._verifica_overbooking(instance)
         return instance
 
 
+class EventoSummarySerializer(serializers.ModelSerializer):
+    """
+    Liste "légère" (GET /api/eventi/?view=summary) : en-tête de l'evento sans
+    righe imbriquées ; totaux lus sur les annotations de letture.annota_riepilogo().
+    """
+    cliente_nome = serializers.CharField(source="cliente.nome", read_only=True, default=None)
+    luogo_nome = serializers.CharField(source="luogo.nome", read_only=True, default=None)
+    n_righe = serializers.IntegerField(read_only=True)
+    totale_importo = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    stock_tot_scorta = serializers.IntegerField(read_only=True)
+    stock_tot_dispon = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Evento
+        fields = (
+            "id",
+            "titolo",
+            "data_evento",
+            "data_evento_da",
+            "data_evento_a",
+            "location_index",
+            "stato",
+            "offerta_stato",
+            "acconto_state",
+            "saldo_state",
+            "cliente",
+            "cliente_nome",
+            "luogo",
+            "luogo_nome",
+            "versione",
+            "n_righe",
+            "totale_importo",
+            "stock_tot_scorta",
+            "stock_tot_dispon",
+        )
+        read_only_fields = fields
+
+
 # ---------------------------------------------------------------------------
 # Révisions
 # ---------------------------------------------------------------------------
@@ -1,7 +1,10 @@
 # backend/eventi/signals.py
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
-from .models import Evento, CalendarioSlot
+from . import giacenze, notifiche, opzioni, sincro, versioni_dati
+from .models import Evento, CalendarioSlot, MagazzinoItem, Materiale, RigaEvento
 
 @receiver(post_save, sender=Evento)
 def ensure_slot(sender, instance: Evento, created, **kwargs):
@@ -13,3 +16,138 @@ def ensure_slot(sender, instance: Evento, created, **kwargs):
             "location_index": instance.location_index,
         },
     )
+
+
+def bump_versioni_dati(sender, using=None, **kwargs):
+    """Toute écriture sur un modèle suivi invalide ses domaines (cf. versioni_dati)."""
+    versioni_dati.bump_modello(sender, using=using)
+
+
+for _model in versioni_dati.DOMINI_PER_MODELLO:
+    post_save.connect(bump_versioni_dati, sender=_model, dispatch_uid=f"versioni_dati_save_{_model.__name__}")
+    post_delete.connect(bump_versioni_dati, sender=_model, dispatch_uid=f"versioni_dati_delete_{_model.__name__}")
+
+
+# --- notifications push (cf. notifiche.py) ---------------------------------
+
+# champs qui déplacent l'occupation du stock (l'option d'une bozza comprise)
+_CAMPI_PERIODO = ("data_evento", "data_evento_da", "data_evento_a", "stato", "opzione_scadenza")
+
+
+@receiver(pre_save, sender=Evento)
+def evento_prima(sender, instance: Evento, raw=False, **kwargs):
+    # période / stato avant modification : l'ancienne période change aussi
+    instance._notifica_prima = None
+    if raw:
+        return
+    if instance.pk:
+        instance._notifica_prima = (
+            Evento.objects.filter(pk=instance.pk).values_list(*_CAMPI_PERIODO).first()
+        )
+    prima = instance._notifica_prima
+    # option de stock d'une bozza (cf. opzioni.py)
+    opzioni.allinea(instance, prima[3] if prima else None)
+
+
+@receiver(post_save, sender=Evento)
+def notifica_evento(sender, instance: Evento, created, using=None, **kwargs):
+    prima = getattr(instance, "_notifica_prima", None)
+    materiali = []
+    if prima and prima != tuple(getattr(instance, f) for f in _CAMPI_PERIODO):
+        # dates ou stato changés : le stock de ses materiali bouge
+        materiali = list(instance.righe.values_list("materiale_id", flat=True).distinct())
+    notifiche.evento_cambiato(instance, "save", prima[:3] if prima else None, materiali, using=using)
+
+
+@receiver(pre_delete, sender=Evento)
+def notifica_evento_delete(sender, instance: Evento, using=None, **kwargs):
+    materiali = list(instance.righe.values_list("materiale_id", flat=True).distinct())
+    notifiche.evento_cambiato(instance, "delete", materiali=materiali, using=using)
+
+
+@receiver(post_save, sender=RigaEvento)
+def notifica_riga(sender, instance: RigaEvento, using=None, **kwargs):
+    notifiche.riga_cambiata(instance, "save", using=using)
+
+
+@receiver(post_delete, sender=RigaEvento)
+def notifica_riga_delete(sender, instance: RigaEvento, using=None, **kwargs):
+    notifiche.riga_cambiata(instance, "delete", using=using)
+
+
+# --- stock : giacenze (MagazzinoItem) <-> Materiale.scorta (cf. giacenze.py) ---
+
+@receiver(pre_save, sender=Materiale)
+def scorta_prima(sender, instance: Materiale, raw=False, using=None, **kwargs):
+    # ligne verrouillée jusqu'au commit (Materiale.save est atomique) : deux
+    # écritures concurrentes de scorta lisent chacune la valeur de l'autre
+    instance._scorta_prima = None
+    if instance.pk and not raw:
+        instance._scorta_prima = (
+            Materiale.objects.using(using).select_for_update()
+            .filter(pk=instance.pk).values_list("scorta", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Materiale)
+def scorta_giacenza(sender, instance: Materiale, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    prima = None if created else getattr(instance, "_scorta_prima", None)
+    if not created and prima is None:
+        return  # save() sans pre_save (pk forcé...) : rien de sûr à reporter
+    giacenze.scorta_modificata(instance, prima, using=using)
+
+
+@receiver(pre_save, sender=MagazzinoItem)
+def giacenza_prima(sender, instance: MagazzinoItem, raw=False, using=None, **kwargs):
+    # idem scorta_prima (MagazzinoItem.save est atomique)
+    instance._giacenza_prima = None
+    if instance.pk and not raw:
+        instance._giacenza_prima = (
+            MagazzinoItem.objects.using(using).select_for_update()
+            .filter(pk=instance.pk).values_list("materiale_id", "qta").first()
+        )
+
+
+@receiver(post_save, sender=MagazzinoItem)
+def giacenza_salvata(sender, instance: MagazzinoItem, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    prima = getattr(instance, "_giacenza_prima", None)
+    if prima and prima[0] != instance.materiale_id:
+        giacenze.giacenza_modificata(prima[0], -prima[1], using=using)
+        prima = None
+    giacenze.giacenza_modificata(instance.materiale_id, instance.qta - (prima[1] if prima else 0), using=using)
+
+
+@receiver(post_delete, sender=MagazzinoItem)
+def giacenza_eliminata(sender, instance: MagazzinoItem, using=None, **kwargs):
+    giacenze.giacenza_modificata(instance.materiale_id, -instance.qta, using=using)
+
+
+@receiver(post_delete, sender=Evento)
+def tombstone_evento(sender, instance: Evento, using=None, **kwargs):
+    # /api/calendario/changes : la suppression doit rester visible (cf. sincro.py)
+    sincro.registra_eliminazione(instance, using=using)
+
+
+@receiver(connection_created)
+def sqlite_pragmas(sender, connection, **kwargs):
+    """
+    WAL + tuning sur chaque connexion SQLite (cf. settings.SQLITE_PRAGMAS).
+
+    journal_mode=WAL est persistant : il réécrit l'en-tête du fichier et laisse
+    -wal/-shm à côté. En DEBUG sur backend/db.sqlite3 (suivi par git), il est
+    sauté pour qu'un simple manage.py ne salisse pas le dépôt.
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = connection.settings_dict.get("PRAGMAS", getattr(settings, "SQLITE_PRAGMAS", {}))
+    if settings.DEBUG and str(connection.settings_dict["NAME"]) == str(settings.BASE_DIR / "db.sqlite3"):
+        pragmas = {k: v for k, v in pragmas.items() if k != "journal_mode"}
+    if not pragmas:
+        return
+    with connection.cursor() as cur:
+        for name, value in pragmas.items():
+            cur.execute(f"PRAGMA {name} = {value}")
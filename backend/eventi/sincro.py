@@ -0,0 +1,91 @@
+# (chemin : /backend/eventi/sincro.py)
+"""
+Synchronisation incrémentale du calendrier : GET /api/calendario/changes.
+
+Le client charge une fois l'année (location-calendar?view=runs), puis ne
+demande que les eventi modifiés depuis son token :
+
+    GET /api/calendario/changes                -> {"token": "...", "reset": true}
+    GET /api/calendario/changes?since=<token>  -> {"token": "...", "reset": false,
+                                                   "eventi": [run, ...],
+                                                   "eliminati": [12, ...]}
+
+- eventi : créés / modifiés / annullati (stato) depuis le token, d'après
+  Evento.updated_at, ou dont le cliente / luogo a été renommé ; même format
+  que les runs de location-calendar, période NON coupée à une fenêtre ;
+- eliminati : ids supprimés, d'après les tombstones EventoEliminato
+  (écrits par signals.py dans la transaction de la suppression).
+
+Le token est un instant (µs depuis epoch). updated_at est posé avant le
+commit : une écriture encore en cours au moment de la lecture aurait un
+updated_at < token. On relit donc MARGINE avant le token ; le client reçoit
+quelques eventi en double (upsert idempotent), jamais de trou.
+
+Token plus vieux que la rétention des tombstones (ou illisible côté client)
+-> "reset": true, le client recharge tout.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from . import letture
+from .models import Cliente, Evento, EventoEliminato, Luogo
+
+MARGINE = timedelta(seconds=30)
+
+
+def giorni_tombstone() -> int:
+    return max(1, int(getattr(settings, "EVENTI_TOMBSTONE_GIORNI", 90)))
+
+
+def token(ts: datetime) -> str:
+    return str(int(ts.timestamp() * 1_000_000))
+
+
+def parse_token(raw: str) -> datetime:
+    try:
+        us = int(raw)
+        return datetime(1970, 1, 1, tzinfo=dt_timezone.utc) + timedelta(microseconds=us)
+    except (TypeError, ValueError, OverflowError):
+        raise letture.ParametroNonValido("Bad 'since' token.")
+
+
+def registra_eliminazione(ev: Evento, using: Optional[str] = None) -> None:
+    """Tombstone + purge des tombstones expirés (suppressions rares : coût négligeable)."""
+    start = ev.data_evento_da or ev.data_evento
+    qs = EventoEliminato.objects.using(using)
+    qs.create(evento_id=ev.pk, data_da=start, data_a=ev.data_evento_a or start)
+    qs.filter(eliminato_il__lt=timezone.now() - timedelta(days=giorni_tombstone())).delete()
+
+
+def changes_payload(since_raw: Optional[str]) -> dict:
+    ora = timezone.now()  # AVANT les lectures : rien de commité ensuite n'est perdu
+    if not since_raw:
+        return {"token": token(ora), "reset": True}
+
+    since = parse_token(since_raw)
+    if since < ora - timedelta(days=giorni_tombstone()):
+        # des suppressions ont pu être purgées entre-temps
+        return {"token": token(ora), "reset": True}
+
+    t = since - MARGINE
+    rows = (
+        letture.location_calendar_qs(date.min, date.max)
+        .filter(
+            Q(updated_at__gte=t)
+            | Q(cliente__in=Cliente.objects.filter(updated_at__gte=t))
+            | Q(luogo__in=Luogo.objects.filter(updated_at__gte=t))
+        )
+    )
+    eventi = letture.location_calendar_runs(date.min, date.max, rows)
+    vivi = {r["evento"] for r in eventi}
+    eliminati = sorted(
+        set(EventoEliminato.objects.filter(eliminato_il__gte=t).values_list("evento_id", flat=True))
+        - vivi
+    )
+    return {"token": token(ora), "reset": False, "eventi": eventi, "eliminati": eliminati}
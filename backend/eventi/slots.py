@@ -0,0 +1,107 @@
+# (chemin : /backend/eventi/slots.py)
+"""
+Occupation des locations (slots 1..EVENTI_NUM_LOCATIONS) par jour.
+
+Source unique pour /api/calendario/availability et /api/eventi/next-slot :
+  - un evento occupe sa location sur TOUTE sa période (multi-jours inclus,
+    cf. periodi.py) ;
+  - les eventi annullati ne bloquent rien ;
+  - une seule requête pour toute la fenêtre demandée.
+
+L'occupation d'un jour est un bitmap entier : bit (i - 1) = location i prise.
+
+    occ = occupazione(d0, d1)              # {date: bitmap}
+    occupati_periodo(d0, d1)               # bitmap sur la période d'un evento (sans plafond)
+    liberi(d0, d1)                         # locations libres sur TOUTE la période
+    primo_libero(d0)                       # 1re location libre, ou None
+
+Fenêtre plafonnée à MAX_GIORNI jours (endpoints publics) : au-delà,
+FinestraTroppoLunga (ValueError) -> 400 dans les vues.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Optional
+
+from django.conf import settings
+
+from .models import Evento
+from .periodi import sovrapposizione_q
+
+
+# un an : la plus longue période d'evento plausible
+MAX_GIORNI = 366
+
+
+class FinestraTroppoLunga(ValueError):
+    """Fenêtre [d0, d1] de plus de MAX_GIORNI jours."""
+
+
+def num_locations() -> int:
+    return max(1, int(getattr(settings, "EVENTI_NUM_LOCATIONS", 8)))
+
+
+def _bit(location_index) -> int:
+    return 1 << (int(location_index) - 1) if location_index and int(location_index) > 0 else 0
+
+
+def indici(bitmap: int) -> list[int]:
+    """Bitmap -> [location_index, ...] (ordre croissant)."""
+    out, i = [], 1
+    while bitmap:
+        if bitmap & 1:
+            out.append(i)
+        bitmap >>= 1
+        i += 1
+    return out
+
+
+def occupazione(d0: date, d1: date, escludi_evento: Optional[int] = None) -> dict[date, int]:
+    """{jour: bitmap des locations prises} pour chaque jour de [d0, d1]."""
+    if (d1 - d0).days >= MAX_GIORNI:
+        raise FinestraTroppoLunga(f"Periodo massimo: {MAX_GIORNI} giorni.")
+    occ = {d0 + timedelta(days=i): 0 for i in range((d1 - d0).days + 1)}
+    qs = Evento.objects.filter(sovrapposizione_q(d0, d1)).exclude(stato="annullato")
+    if escludi_evento:
+        qs = qs.exclude(pk=escludi_evento)
+    for da, a, giorno, loc in qs.values_list("data_evento_da", "data_evento_a", "data_evento", "location_index"):
+        start = da or giorno
+        end = a or da or giorno
+        bit = _bit(loc)
+        cur = max(start, d0)
+        while cur <= min(end, d1):
+            occ[cur] |= bit
+            cur += timedelta(days=1)
+    return occ
+
+
+def occupati(d0: date, d1: Optional[date] = None, escludi_evento: Optional[int] = None) -> int:
+    """Bitmap des locations prises au moins un jour de [d0, d1]."""
+    bitmap = 0
+    for b in occupazione(d0, d1 or d0, escludi_evento).values():
+        bitmap |= b
+    return bitmap
+
+
+def occupati_periodo(d0: date, d1: date, escludi_evento: Optional[int] = None) -> int:
+    """
+    Comme occupati(), sans plafond : période d'un evento à écrire (validation),
+    lue par tranches de MAX_GIORNI jours.
+    """
+    bitmap, inizio = 0, d0
+    while inizio <= d1:
+        fine = min(d1, inizio + timedelta(days=MAX_GIORNI - 1))
+        bitmap |= occupati(inizio, fine, escludi_evento)
+        inizio = fine + timedelta(days=1)
+    return bitmap
+
+
+def liberi(d0: date, d1: Optional[date] = None, escludi_evento: Optional[int] = None) -> list[int]:
+    """Locations libres chaque jour de [d0, d1]."""
+    tutte = (1 << num_locations()) - 1
+    return indici(tutte & ~occupati(d0, d1, escludi_evento))
+
+
+def primo_libero(d0: date, d1: Optional[date] = None, escludi_evento: Optional[int] = None) -> Optional[int]:
+    free = liberi(d0, d1, escludi_evento)
+    return free[0] if free else None
@@ -2,9 +2,11 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views_stats import StatsMeseView
+from .views_stats import StatsMeseView, StatsRangeView
 from .views_catalogo import CatalogoSearch
-from .views_calendario import LocationCalendarView
+from .views_calendario import CalendarioChangesView, LocationCalendarView
+from .views_logistica import LogisticaPreview, DistanzaLuogoViewSet, PercorsoView, AssegnazioneView
+from .views_magazzini import MagazzinoViewSet, TrasferimentoViewSet, MagazzinoDisponibilitaView
 from . import views_export
 from .views import home
 from .views_auth import LoginView, MeView  # ← AJOUT
@@ -31,16 +33,20 @@ from .views import (
     # Magazzino
     MagazzinoStatusView,
     MagazzinoBookingsView,
+    MagazzinoConflittiView,
     magazzino_calendar,
 )
 
 router = DefaultRouter()
 router.register(r"clienti", ClienteViewSet, basename="clienti")
 router.register(r"luoghi", LuogoViewSet, basename="luoghi")
+router.register(r"distanze", DistanzaLuogoViewSet, basename="distanze")
 router.register(r"materiali", MaterialeViewSet, basename="materiali")
 router.register(r"tecnici", TecnicoViewSet, basename="tecnici")
 router.register(r"mezzi", MezzoViewSet, basename="mezzi")
 router.register(r"eventi", EventoViewSet, basename="eventi")   # ✅ un seul register pour "eventi"
+router.register(r"magazzini", MagazzinoViewSet, basename="magazzini")
+router.register(r"trasferimenti", TrasferimentoViewSet, basename="trasferimenti")
 
 
 urlpatterns = [
@@ -94,6 +100,13 @@ urlpatterns = [
         name="calendario-location-calendar",
     ),
 
+    # synchro incrémentale du calendrier (eventi modifiés / supprimés depuis un token)
+    path(
+        "calendario/changes",
+        CalendarioChangesView.as_view(),
+        name="calendario-changes",
+    ),
+
     # ---------- PRICING & SUGGESTIONS (offerta rapida) ----------
     path("pricing", PricingView.as_view(), name="pricing"),
     path("suggest", SuggestionView.as_view(), name="suggest"),
@@ -106,6 +119,13 @@ urlpatterns = [
         name="magazzino-status",
     ),
 
+    # disponibilités par magazzino, du plus proche d'un luogo au plus lointain
+    path(
+        "magazzino/disponibilita",
+        MagazzinoDisponibilitaView.as_view(),
+        name="magazzino-disponibilita",
+    ),
+
     # bookings détaillés d’un matériel
     path(
         "magazzino/bookings",
@@ -113,6 +133,13 @@ urlpatterns = [
         name="magazzino-bookings",
     ),
 
+    # overbooking : jours où les eventi dépassent la scorta
+    path(
+        "magazzino/conflitti",
+        MagazzinoConflittiView.as_view(),
+        name="magazzino-conflitti",
+    ),
+
     # sinottico annuale : /api/magazzino/calendar?year=2025
     # 👉 attention : c’est une FONCTION, donc SANS .as_view()
     path(
@@ -121,6 +148,14 @@ urlpatterns = [
         name="magazzino-calendar",
     ),
 
+    # ---------- LOGISTICA ----------
+    # coûts mezzi / tecnici d'un ou plusieurs eventi
+    path("logistica/preview", LogisticaPreview.as_view(), name="logistica-preview"),
+    # giro multi-luogo depuis la matrice distanze
+    path("logistica/percorso", PercorsoView.as_view(), name="logistica-percorso"),
+    # affectation mezzi/tecnici à coût minimal sur une période
+    path("logistica/assegnazione", AssegnazioneView.as_view(), name="logistica-assegnazione"),
+
     # ---------- CATALOGO ----------
     path("catalogo/search", CatalogoSearch.as_view(), name="catalogo-search"),
 
@@ -132,4 +167,5 @@ urlpatterns = [
     ),
 
     path("stats/mese", StatsMeseView.as_view(), name="stats-mese"),
+    path("stats/range", StatsRangeView.as_view(), name="stats-range"),
 ]
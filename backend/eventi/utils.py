@@ -1,6 +1,55 @@
 # (chemin : /backend/eventi/utils.py)
 from datetime import datetime
-def next_external_id(model, prefix: str) -> str:
-    year = datetime.now().year
-    count = model.objects.filter(external_id__startswith=f"{prefix}-{year}-").count() + 1
-    return f"{prefix}-{year}-{count:04d}"
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def _seed_value(model, prefix: str, year: int) -> int:
+    """Plus grand numéro déjà utilisé pour PFX-ANNO- (une seule fois, à la création du compteur)."""
+    best = 0
+    if model is None:
+        return best
+    for ext in model.objects.filter(external_id__startswith=f"{prefix}-{year}-").values_list("external_id", flat=True):
+        try:
+            best = max(best, int(ext.rsplit("-", 1)[1]))
+        except (ValueError, IndexError):
+            continue
+    return best
+
+
+def reserve_external_ids(model, prefix: str, n: int = 1, year: int | None = None) -> list[str]:
+    """
+    Réserve un bloc de `n` external_id consécutifs ("PFX-ANNO-NNNN").
+
+    UPDATE valore = valore + n sur la ligne (prefisso, anno) : la ligne est
+    verrouillée jusqu'au commit, donc deux appels concurrents obtiennent
+    des blocs disjoints. Coût O(1), indépendant de la taille de la table.
+    Utilisable avant un bulk_create (import) pour pré-remplir external_id.
+    """
+    if n < 1:
+        return []
+    year = year or datetime.now().year
+    Sequenza = apps.get_model("eventi", "SequenzaExternalId")
+
+    with transaction.atomic():
+        updated = Sequenza.objects.filter(prefisso=prefix, anno=year).update(valore=F("valore") + n)
+        if not updated:
+            # premier id de l'année pour ce préfixe : on part du max existant
+            try:
+                with transaction.atomic():
+                    Sequenza.objects.create(
+                        prefisso=prefix, anno=year, valore=_seed_value(model, prefix, year) + n,
+                    )
+            except IntegrityError:
+                # créé entre-temps par une autre transaction
+                Sequenza.objects.filter(prefisso=prefix, anno=year).update(valore=F("valore") + n)
+        last = Sequenza.objects.filter(prefisso=prefix, anno=year).values_list("valore", flat=True).get()
+
+    return [f"{prefix}-{year}-{i:04d}" for i in range(last - n + 1, last + 1)]
+
+
+def next_external_id(model, prefix: str, year: int | None = None) -> str:
+    """Prochain external_id "PFX-ANNO-NNNN" (bloc de un)."""
+    return reserve_external_ids(model, prefix, 1, year)[0]
@@ -0,0 +1,90 @@
+# (chemin : /backend/eventi/versioni_dati.py)
+"""
+Versions de données par domaine (modèle VersioneDati).
+
+Chaque écriture sur un modèle suivi incrémente le(s) compteur(s) de son
+domaine (signaux post_save / post_delete, cf. signals.py). Les vues s'en
+servent comme clé d'ETag / de cache : une lecture d'une ligne suffit pour
+savoir si un domaine a changé.
+
+    versioni_dati.marca("stock", "catalogo")   # -> "stock:12|catalogo:3"
+
+Les écritures sans signal (bulk_create, queryset.update) doivent appeler
+bump() explicitement.
+
+L'incrément a lieu APRÈS le commit : une lecture concurrente peut voir les
+nouvelles données avec l'ancienne version (un 200 de trop au pire), jamais
+l'inverse (ancienne donnée servie sous une version neuve = cache périmé).
+"""
+from __future__ import annotations
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import (
+    CalendarioSlot, Cliente, Evento, Luogo, Materiale, Mezzo, RigaEvento, VersioneDati,
+)
+
+CALENDARIO = "calendario"
+STOCK = "stock"
+CATALOGO = "catalogo"
+PREZZI = "prezzi"
+DOMINI = (CALENDARIO, STOCK, CATALOGO, PREZZI)
+
+# modèle -> domaines invalidés par une écriture
+DOMINI_PER_MODELLO = {
+    Evento: (CALENDARIO, STOCK),        # dates / stato : calendrier ET occupation du stock
+    CalendarioSlot: (CALENDARIO,),
+    Cliente: (CALENDARIO,),             # noms affichés dans le calendrier des locations
+    Luogo: (CALENDARIO,),
+    RigaEvento: (STOCK, PREZZI),
+    Materiale: (STOCK, CATALOGO, PREZZI),
+    Mezzo: (CATALOGO, PREZZI),
+}
+
+
+def _incrementa(domini: tuple[str, ...], using: str | None) -> None:
+    qs = VersioneDati.objects.db_manager(using)
+    n = qs.filter(dominio__in=domini).update(
+        versione=F("versione") + 1, updated_at=timezone.now(),
+    )
+    if n == len(domini):
+        return
+    # domaine absent (base créée avant la migration 0023, ou ligne supprimée)
+    for dominio in domini:
+        try:
+            with transaction.atomic(using=using):
+                qs.get_or_create(dominio=dominio, defaults={"versione": 1})
+        except IntegrityError:
+            pass
+
+
+def bump(*domini: str, using: str | None = None) -> None:
+    """Incrémente les domaines au commit de la transaction courante."""
+    domini = tuple(sorted(set(domini)))
+    if not domini:
+        return
+    transaction.on_commit(lambda: _incrementa(domini, using), using=using)
+
+
+def bump_modello(model, using: str | None = None) -> None:
+    bump(*DOMINI_PER_MODELLO.get(model, ()), using=using)
+
+
+def versioni(*domini: str) -> dict[str, int]:
+    domini = domini or DOMINI
+    got = dict(VersioneDati.objects.filter(dominio__in=domini).values_list("dominio", "versione"))
+    return {d: got.get(d, 0) for d in domini}
+
+
+def marca(*domini: str) -> str:
+    """Chaîne stable des versions, pour ETag / clé de cache."""
+    return "|".join(f"{d}:{v}" for d, v in versioni(*domini).items())
+
+
+async def amarca(*domini: str) -> str:
+    """marca() pour les vues async (ORM async, pas de thread)."""
+    domini = domini or DOMINI
+    got = {d: v async for d, v in VersioneDati.objects.filter(dominio__in=domini).values_list("dominio", "versione")}
+    return "|".join(f"{d}:{got.get(d, 0)}" for d in domini)
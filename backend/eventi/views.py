@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from collections import OrderedDict, defaultdict
+from collections import OrderedDict
 import io
 import os
 import re
@@ -16,28 +16,33 @@ from rest_framework.viewsets import ModelViewSet
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Max, Prefetch, Q
+from django.db.models import Prefetch, Q
 from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
 from django.utils.dateparse import parse_date
 
 from rest_framework import status, viewsets, permissions, generics
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .views_history import create_revision_if_changed
 from .serializers import EventoSerializer
+from . import conflitti, disponibilita, giacenze, letture, magazzini, notifiche, opzioni, slots, versioni_dati
+from .etag import con_etag, etag_magazzino_calendar
+from .pagination import EventoCursorPagination
+from .periodi import sovrapposizione_q
 
 from .models import (
     Cliente, Luogo, Materiale,
-    Evento, RigaEvento, CalendarioSlot,
+    Evento, RigaEvento,
     EventoRevision, MaterialeSuggerito, RegolaSuggerimento,
     Tecnico, Mezzo,
 )
 from .serializers import (
     ClienteSerializer, LuogoSerializer, MaterialeSerializer,
-    EventoSerializer, RigaEventoSerializer, EventoRevisionSerializer,
+    EventoSerializer, EventoSummarySerializer, RigaEventoSerializer, EventoRevisionSerializer,
     TecnicoSerializer, MezzoSerializer
 )
 
@@ -136,22 +141,28 @@ class CalendarioAvailability(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        """GET /api/calendario/availability?data=YYYY-MM-DD"""
-        dstr = request.query_params.get("data")
+        """
+        GET /api/calendario/availability?data=YYYY-MM-DD[&a=YYYY-MM-DD][&evento=<id>]
+
+        -> {"used": [...], "free": [...], "suggested": n|null}
+        Sur une période (data..a), "free" = libres TOUS les jours.
+        `evento` : ignore cet evento (édition de ses propres dates).
+        """
         try:
-            d = date.fromisoformat(str(dstr))
-        except Exception:
+            d = date.fromisoformat(str(request.query_params.get("data")))
+            d_a = date.fromisoformat(request.query_params["a"]) if request.query_params.get("a") else d
+            escludi = int(request.query_params["evento"]) if request.query_params.get("evento") else None
+        except (TypeError, ValueError):
             return Response({"detail": "Param 'data' manquant ou invalide (YYYY-MM-DD)."}, status=400)
+        if d_a < d:
+            return Response({"detail": "'a' doit être >= 'data'."}, status=400)
 
-        used = set(
-            CalendarioSlot.objects
-            .filter(data=d)
-            .values_list("location_index", flat=True)
-        )
-        all_slots = set(range(1, 9))  # 1..8
-        free = sorted(list(all_slots - used))
-        suggested = free[0] if free else None
-        return Response({"used": sorted(list(used)), "free": free, "suggested": suggested})
+        try:
+            used = slots.occupati(d, d_a, escludi)
+        except slots.FinestraTroppoLunga as e:
+            return Response({"detail": str(e)}, status=400)
+        free = slots.indici(((1 << slots.num_locations()) - 1) & ~used)
+        return Response({"used": slots.indici(used), "free": free, "suggested": free[0] if free else None})
 
 # -------------------------------------------------------------------
 # Anagrafica & Matériaux
@@ -172,6 +183,22 @@ class MaterialeViewSet(viewsets.ModelViewSet):
     serializer_class = MaterialeSerializer
     permission_classes = [permissions.AllowAny]
 
+    # scorta et giacenza (MagazzinoItem) dans la même transaction (cf. giacenze.py) ;
+    # GiacenzaInsufficiente : baisse passée entre validate_scorta et l'UPDATE
+    def create(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().create(request, *args, **kwargs)
+        except giacenze.GiacenzaInsufficiente as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().update(request, *args, **kwargs)
+        except giacenze.GiacenzaInsufficiente as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 class TecnicoViewSet(MaterialeViewSet):
     def get_queryset(self):
         return super().get_queryset().filter(is_tecnico=True)
@@ -194,7 +221,9 @@ class EventoViewSet(viewsets.ModelViewSet):
 
     """
     Endpoints utilisés par le front :
-      - GET   /api/eventi/?month=YYYY-MM
+      - GET   /api/eventi/?month=YYYY-MM  ou  ?from=YYYY-MM-DD&to=YYYY-MM-DD
+      - GET   /api/eventi/?month=YYYY-MM&view=summary   (sans righe, totaux SQL)
+        liste paginée par curseur (data_evento, id) : ?cursor=…&page_size=…&ordine=desc
       - GET   /api/eventi/<id>/
       - PATCH/PUT /api/eventi/<id>/
       - GET/POST /api/eventi/<id>/revisions/
@@ -206,99 +235,95 @@ class EventoViewSet(viewsets.ModelViewSet):
     """
     serializer_class = EventoSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = EventoCursorPagination
     lookup_value_regex = r"\d+"
 
+    def _summary(self) -> bool:
+        """?view=summary sur la liste -> en-têtes + totaux SQL, sans righe."""
+        return self.action == "list" and self.request.query_params.get("view") == "summary"
+
+    def get_serializer_class(self):
+        if self._summary():
+            return EventoSummarySerializer
+        return super().get_serializer_class()
+
     def get_queryset(self):
-        qs = (
-            Evento.objects
-            .select_related("cliente", "luogo")
-            .prefetch_related(Prefetch("righe", queryset=RigaEvento.objects.select_related("materiale")))
-            .order_by("-id")
-        )
-        month = self.request.query_params.get("month")
+        qs = Evento.objects.select_related("cliente", "luogo").order_by("-id")
+        if self._summary():
+            qs = letture.annota_riepilogo(qs)
+        else:
+            # stock_tot_scorta / stock_tot_dispon en sous-requêtes (liste ET détail)
+            qs = letture.annota_stock(qs).prefetch_related(
+                Prefetch("righe", queryset=RigaEvento.objects.select_related("materiale"))
+            )
+        return self._filtra_periodo(qs)
+
+    def _filtra_periodo(self, qs):
+        """
+        Fenêtre de dates sur la liste : eventi d'un jour ET multi-jours qui
+        chevauchent la fenêtre (cf. periodi.sovrapposizione_q).
+          ?month=YYYY-MM   |   ?from=YYYY-MM-DD&to=YYYY-MM-DD (bornes optionnelles)
+        Le détail (/api/eventi/<id>/) n'est jamais filtré.
+        """
+        if self.action != "list":
+            return qs
+        params = self.request.query_params
+        month = params.get("month")
         if month and re.match(r"^\d{4}-\d{2}$", month):
             start, end = _month_bounds(month)
-            qs = qs.filter(data_evento__range=(start, end))
-        return qs
+            return qs.filter(sovrapposizione_q(start, end))
+
+        d_from, d_to = params.get("from"), params.get("to")
+        if not d_from and not d_to:
+            return qs
+        try:
+            start = parse_date(d_from) if d_from else date.min
+            end = parse_date(d_to) if d_to else date.max
+        except ValueError:  # ex. 2025-02-30
+            start = end = None
+        if start is None or end is None or end < start:
+            raise ValidationError({"detail": "from/to invalidi (YYYY-MM-DD)."})
+        return qs.filter(sovrapposizione_q(start, end))
 
     # -----------------------------------------------------------------
-    # Ajout dynamique des champs de stock sur la sortie JSON
+    # Hooks de création / modification
     # -----------------------------------------------------------------
-    def _attach_stock_fields(self, data, queryset):
-        """
-        Ajoute pour chaque evento:
-          - stock_tot_scorta : somme des scorte des matériels utilisés
-          - stock_tot_dispon : scorta_tot - qta_totale (sur cet evento)
-        ➜ utilisé par la liste mensile + EventStockBadge.
-        """
-        ev_ids = [getattr(ev, "id", None) for ev in queryset]
-        ev_ids = [i for i in ev_ids if i is not None]
-        if not ev_ids:
-            for row in data:
-                row["stock_tot_scorta"] = 0
-                row["stock_tot_dispon"] = 0
-            return data
-
-        righe = (
-            RigaEvento.objects
-            .select_related("materiale")
-            .filter(evento_id__in=ev_ids)
+    # overbooking refusé (EVENTI_OVERBOOKING="blocca", cf. conflitti.py) : transaction
+    # déjà annulée, conflits renvoyés tels quels (nombres, pas de chaînes DRF)
+    @staticmethod
+    def _risposta_overbooking(e: "conflitti.Overbooking"):
+        return Response(
+            {"detail": "Scorta insufficiente per alcuni materiali nelle date dell'evento.",
+             "conflitti": e.conflitti},
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
-        stats = defaultdict(lambda: {"scorta": 0, "booked": 0})
-        seen_materials = defaultdict(set)
-
-        for r in righe:
-            eid = r.evento_id
-            s = stats[eid]
-            s["booked"] += int(r.qta or 0)
-
-            mid = r.materiale_id
-            if mid not in seen_materials[eid]:
-                sc = int(getattr(r.materiale, "scorta", 0) or 0)
-                s["scorta"] += sc
-                seen_materials[eid].add(mid)
-
-        for row in data:
-            eid = row.get("id")
-            st = stats.get(eid)
-            if not st:
-                row["stock_tot_scorta"] = 0
-                row["stock_tot_dispon"] = 0
-            else:
-                sc = st["scorta"]
-                disp = max(0, sc - st["booked"])
-                row["stock_tot_scorta"] = sc
-                row["stock_tot_dispon"] = disp
+    def create(self, request, *args, **kwargs):
+        try:
+            return super().create(request, *args, **kwargs)
+        except conflitti.Overbooking as e:
+            return self._risposta_overbooking(e)
 
-        return data
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except conflitti.Overbooking as e:
+            return self._risposta_overbooking(e)
 
-    def list(self, request, *args, **kwargs):
+    def _ricaricato(self, ev: Evento) -> Evento:
         """
-        Surcharge de la liste pour ajouter stock_tot_scorta / stock_tot_dispon
-        sans modifier le serializer existant.
+        Relu après écriture : les annotations stock_tot_* de get_object()
+        datent d'avant (et manquent à la création), les righe prefetchées aussi.
         """
-        queryset = self.filter_queryset(self.get_queryset())
-
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            data = self._attach_stock_fields(serializer.data, page)
-            return self.get_paginated_response(data)
+        return self.get_queryset().get(pk=ev.pk)
 
-        serializer = self.get_serializer(queryset, many=True)
-        data = self._attach_stock_fields(serializer.data, queryset)
-        return Response(data)
-
-    # -----------------------------------------------------------------
-    # Hooks de création / modification
-    # -----------------------------------------------------------------
+    # la réponse sérialise serializer.instance : on y met l'evento relu
     def perform_create(self, serializer):
-        evento = serializer.save()
+        evento = serializer.instance = self._ricaricato(serializer.save())
         create_revision_if_changed(evento, note="Creazione evento")
 
     def perform_update(self, serializer):
-        evento = serializer.save()
+        evento = serializer.instance = self._ricaricato(serializer.save())
         create_revision_if_changed(evento, note="Modifica evento")
 
     @action(detail=True, methods=["get", "post"], url_path="revisions")
@@ -361,12 +386,59 @@ class EventoViewSet(viewsets.ModelViewSet):
                     copertura_giorni=int(r.get("copertura_giorni", 1) or 1),
                 ))
             RigaEvento.objects.bulk_create(bulk)
+            versioni_dati.bump_modello(RigaEvento)  # bulk_create : pas de post_save
+            notifiche.righe_cambiate(ev, [r.materiale_id for r in bulk])
+            # comme EventoSerializer.update avec des righe
+            EventoSerializer._assegna_magazzino(ev, True, se_scoperto=True)
+            try:
+                report = conflitti.verifica_evento(ev)
+            except conflitti.Overbooking as e:
+                transaction.set_rollback(True)
+                return self._risposta_overbooking(e)
+
+        ev = self._ricaricato(ev)
+        create_revision_if_changed(ev, note="Replace righe")
+
+        data = EventoSerializer(ev, context={"request": request}).data
+        data["conflitti"] = report
+        return Response(data)
 
-        last = ev.revisions.aggregate(m=Max("ref"))["m"] or 0
-        snap = EventoSerializer(ev, context={"request": request}).data
-        EventoRevision.objects.create(evento=ev, ref=last + 1, note="Replace righe", payload=snap)
+    @action(detail=True, methods=["post", "delete"], url_path="opzione")
+    def opzione(self, request, pk=None):
+        """
+        POST   /api/eventi/<id>/opzione/ : (re)pose l'option de stock d'une bozza
+        DELETE /api/eventi/<id>/opzione/ : la lève (la bozza ne compte plus)
+        """
+        ev = self.get_object()
+        if request.method == "DELETE":
+            opzioni.rilascia(ev)
+        elif ev.stato != opzioni.STATO_OPZIONE:
+            return Response({"detail": "Solo un evento in bozza può avere un'opzione."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        else:
+            opzioni.rinnova(ev)
+        return Response({"id": ev.pk, "opzione_scadenza": ev.opzione_scadenza})
+
+    @action(detail=True, methods=["get"], url_path="conflitti")
+    def conflitti_evento(self, request, pk=None):
+        """GET /api/eventi/<id>/conflitti : overbooking impliquant cet evento (cf. conflitti.py)"""
+        return Response(conflitti.per_evento(self.get_object()))
 
-        return Response(EventoSerializer(ev, context={"request": request}).data)
+    @action(detail=True, methods=["get", "post"], url_path="magazzino")
+    def magazzino(self, request, pk=None):
+        """
+        GET  /api/eventi/<id>/magazzino/ : magazzino proposé (le plus proche qui couvre les righe)
+        POST /api/eventi/<id>/magazzino/ : l'assigne à l'evento (cf. eventi/magazzini.py)
+        """
+        ev = self.get_object()
+        if request.method == "POST":
+            with transaction.atomic():
+                scelta = magazzini.assegna(ev)
+        else:
+            scelta = magazzini.scegli(ev)
+        if scelta is None:
+            return Response({"detail": "Nessun magazzino configurato."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"id": ev.pk, "magazzino_attuale": ev.magazzino_id, **scelta})
 
     # --- Export DOCX --------------------------------------------------
 
@@ -721,17 +793,23 @@ class EventoViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="next-slot")
     def next_slot(self, request):
-        date_str = request.query_params.get("date", "")
-        d = parse_date(date_str)
+        """
+        ?date=YYYY-MM-DD[&a=YYYY-MM-DD] -> {"slot": n} (1 si tout est pris,
+        ou si `date` manque / est invalide) ; 400 si `a` est invalide ou la
+        période dépasse slots.MAX_GIORNI.
+        """
+        try:
+            d = parse_date(request.query_params.get("date", "") or "")
+        except ValueError:  # ex. 2025-02-30
+            d = None
         if not d:
             return Response({"slot": 1})
-        taken = set(
-            Evento.objects.filter(data_evento=d).values_list("location_index", flat=True)
-        )
-        for s in range(1, 9):
-            if s not in taken:
-                return Response({"slot": s})
-        return Response({"slot": 1})
+        try:
+            d_a = parse_date(request.query_params.get("a", "") or "") or d
+            return Response({"slot": slots.primo_libero(d, max(d, d_a)) or 1})
+        except ValueError as e:  # date impossible ou FinestraTroppoLunga
+            msg = str(e) if isinstance(e, slots.FinestraTroppoLunga) else "Param 'a' invalide (YYYY-MM-DD)."
+            return Response({"detail": msg}, status=400)
 
 # -------------------------------------------------------------------
 # Listes mensuelles (calendario/lista)
@@ -746,42 +824,9 @@ class EventiMensiliView(APIView):
         y = int(request.query_params.get("year", date.today().year))
         m = int(request.query_params.get("month", date.today().month))
 
-        # bornes du mois
-        month_start = date(y, m, 1)
-        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
-        month_end = next_month - timedelta(days=1)
-
-        qs = (
-            Evento.objects
-            .filter(
-                # 1) anciens événements simples sur data_evento
-                Q(data_evento__range=(month_start, month_end))
-                |
-                # 2) événements multi-jours qui se chevauchent avec le mois
-                Q(data_evento_da__lte=month_end, data_evento_a__gte=month_start)
-            )
-            .select_related("cliente")
-            .order_by("data_evento", "location_index", "id")
-        )
-
-        data = []
-        for ev in qs:
-            # pour le calendrier on garde un champ "data_evento" = début
-            start = getattr(ev, "data_evento_da", None) or ev.data_evento
-            data.append({
-                "id": ev.id,
-                "titolo": ev.titolo,
-                "data_evento": start.isoformat() if start else None,
-                "data_evento_da": getattr(ev, "data_evento_da", None) and ev.data_evento_da.isoformat(),
-                "data_evento_a": getattr(ev, "data_evento_a", None) and ev.data_evento_a.isoformat(),
-                "location_index": ev.location_index,
-                "stato": ev.stato,
-                "cliente_nome": ev.cliente.nome if ev.cliente_id else None,
-                "offerta_stato": getattr(ev, "offerta_stato", None),
-                "saldo_state": getattr(ev, "saldo_state", None),
-            })
-
-        return Response(data, status=200)
+        month_start, month_end = letture.month_bounds(y, m)
+        rows = letture.eventi_mese_qs(month_start, month_end)
+        return Response(letture.eventi_mese_payload(rows), status=200)
 
 
 @api_view(["GET"])
@@ -863,10 +908,16 @@ class SuggestionView(APIView):
         out: list[dict] = []
         seen: set[int] = set()
 
-        # petit helper de disponibilité (tu pourras l'améliorer plus tard
-        # avec l'API /magazzino/bookings si tu veux)
+        # disponibilité le jour `date` (une requête pour tous les materiali,
+        # cf. eventi/disponibilita.py) ; sans date : stock brut
+        try:
+            giorno = parse_date(day or "")
+        except ValueError:
+            giorno = None
+        impegni = disponibilita.impegni(giorno, giorno) if giorno else {}
+
         def availability(m: Materiale):
-            pren = 0  # pour l'instant on ne recalcule pas ici
+            pren = disponibilita.picco(impegni.get(m.id))
             disp = max(0, (m.scorta or 0) - pren)
             return int(pren), disp
 
@@ -1016,6 +1067,7 @@ from rest_framework import permissions
 # Magazzino – calendrier annuel (pour Sinottico)
 # -------------------------------------------------------------------
 
+@con_etag(etag_magazzino_calendar)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def magazzino_calendar(request):
@@ -1038,6 +1090,9 @@ def magazzino_calendar(request):
 
     ➜ ici on tient compte de TOUTE la durée de l'événement
        (data_evento_da / data_evento_a ou data_evento simple).
+    Comptés : confermati, fatturati et bozze sous option ;
+    &include_holds=0 -> réservations fermes seules (cf. eventi/opzioni.py).
+    ETag + 304 si rien n'a changé (cf. eventi/etag.py).
     """
     # --- année demandée ---
     try:
@@ -1071,44 +1126,12 @@ def magazzino_calendar(request):
         for m in mats_qs
     ]
 
-    # --- carte (date_iso, materiale_id) -> qta totale ce jour-là ---
-    per_day: dict[tuple[str, int], int] = {}
-
-    righe = (
-        RigaEvento.objects
-        .select_related("evento")
-        .filter(
-            Q(evento__data_evento_da__lte=end, evento__data_evento_a__gte=start)
-            | Q(evento__data_evento__range=(start, end))
-        )
-        .exclude(evento__stato="annullato")
-    )
-
-    for r in righe:
-        ev = r.evento
-
-        # support data_evento_da / data_evento_a OU data_evento
-        ev_start = getattr(ev, "data_evento_da", None) or ev.data_evento
-        ev_end   = getattr(ev, "data_evento_a", None) or ev.data_evento
-        if not ev_start or not ev_end:
-            continue
-
-        # intersection avec l'année demandée
-        s = max(ev_start, start)
-        e = min(ev_end, end)
-        if e < s:
-            continue
-
-        q = int(r.qta or 0)
-        cur = s
-        while cur <= e:
-            key = (cur.isoformat(), r.materiale_id)
-            per_day[key] = per_day.get(key, 0) + q
-            cur += timedelta(days=1)
-
+    # --- qta totale par (materiale, jour), cf. eventi/disponibilita.py ---
+    impegni = disponibilita.impegni(start, end, None, opzioni.include_holds(request.GET))
     bookings = [
-        {"materiale": mid, "date": d, "qta": q}
-        for (d, mid), q in per_day.items()
+        {"materiale": mid, "date": d.isoformat(), "qta": q}
+        for mid in sorted(impegni)
+        for d, q in impegni[mid].items()
     ]
 
     return Response(
@@ -1129,103 +1152,50 @@ class MagazzinoStatusView(APIView):
     GET /api/magazzino/status?from=YYYY-MM-DD&to=YYYY-MM-DD&materials=1,2,3
 
     ➜ tient compte de toute la durée de l'événement
-       (data_evento_da / data_evento_a ou data_evento + copertura_giorni)
+       (data_evento_da / data_evento_a ou data_evento, cf. eventi/disponibilita.py)
+    &include_holds=0 : sans les options des bozze (cf. eventi/opzioni.py)
+    Variante async : views_async.magazzino_status (même payload).
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        dfrom_str = request.GET.get("from") or request.GET.get("date") or request.GET.get("day")
-        dto_str   = request.GET.get("to")   or dfrom_str
-        if not dfrom_str:
-            return Response({"detail": "Missing 'from' or 'date' parameter."}, status=400)
         try:
-            dfrom = date.fromisoformat(dfrom_str)
-            dto   = date.fromisoformat(dto_str)
-        except ValueError:
-            return Response({"detail": "Bad date format. Use YYYY-MM-DD."}, status=400)
-        if dto < dfrom:
-            dto = dfrom
-
-        ids_param = request.GET.get("materials") or request.GET.get("material")
-        if ids_param:
-            mids = [int(x) for x in str(ids_param).split(",") if x.strip()]
-            mats = Materiale.objects.filter(id__in=mids)
-        else:
-            mats = Materiale.objects.all()
-
-        # liste des jours de l'intervalle
-        days: list[date] = []
-        cur = dfrom
-        while cur <= dto:
-            days.append(cur)
-            cur += timedelta(days=1)
-
-        # Evénements qui SE CHEVAUCHENT avec [dfrom, dto]
-        righe = (
-            RigaEvento.objects
-            .select_related("materiale", "evento")
-            .filter(
-                Q(evento__data_evento_da__lte=dto, evento__data_evento_a__gte=dfrom)
-                | Q(evento__data_evento__gte=dfrom, evento__data_evento__lte=dto)
-            )
-            .exclude(evento__stato="annullato")
-        )
-        if ids_param:
-            righe = righe.filter(materiale_id__in=[m.id for m in mats])
+            dfrom, dto, mids = letture.parse_status_params(request.GET)
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
 
-        # carte matériau → date → qta
-        by_mat_day: dict[int, dict[date, int]] = {
-            m.id: {d: 0 for d in days} for m in mats
-        }
+        mats = list(letture.materiali_status_qs(mids))
+        impegni = disponibilita.impegni(dfrom, dto, mids, opzioni.include_holds(request.GET))
+        return Response(letture.magazzino_status_payload(dfrom, dto, mats, impegni))
 
-        for r in righe:
-            ev = r.evento
-            # support data_evento_da / data_evento_a OU data_evento + copertura_giorni
-            ev_start = getattr(ev, "data_evento_da", None) or ev.data_evento
-            ev_end   = getattr(ev, "data_evento_a", None)
-            if not ev_end:
-                giorni = max(1, int(getattr(r, "copertura_giorni", 1) or 1))
-                ev_end = ev_start + timedelta(days=giorni - 1)
-
-            # intersection avec l'intervalle demandé
-            s = max(ev_start, dfrom)
-            e = min(ev_end, dto)
-            if e < s:
-                continue
 
-            q = int(r.qta or 0)
-            cur = s
-            while cur <= e:
-                if r.materiale_id in by_mat_day:
-                    by_mat_day[r.materiale_id][cur] += q
-                cur += timedelta(days=1)
+class MagazzinoConflittiView(APIView):
+    """
+    GET /api/magazzino/conflitti?year=2025
+    GET /api/magazzino/conflitti?from=YYYY-MM-DD&to=YYYY-MM-DD&materials=1,2,3
 
-        out = {
-            "days": [d.isoformat() for d in days],
-            "materials": [],
-        }
-        for m in mats:
-            row = {
-                "id": m.id,
-                "nome": m.nome,
-                "stock": int(m.scorta or 0),
-                "by_day": [],
-            }
-            for d in days:
-                used = by_mat_day[m.id][d]
-                free = max(0, row["stock"] - used)
-                if row["stock"] == 0:
-                    status_s = "ko"
-                elif free == 0 and row["stock"] > 0:
-                    status_s = "warn"
-                else:
-                    status_s = "ok"
-                row["by_day"].append(
-                    {"date": d.isoformat(), "used": used, "free": free, "status": status_s}
-                )
-            out["materials"].append(row)
+    Scan d'overbooking : plages où les eventi (hors annullati) demandent plus
+    que la scorta d'un materiale (cf. eventi/conflitti.py).
+    { "from": "...", "to": "...", "conflitti": [ {materiale, nome, scorta, da, a,
+                                                  impegnato, eccedenza, eventi}, ... ] }
+    """
+    permission_classes = [permissions.AllowAny]
 
-        return Response(out)
+    def get(self, request):
+        try:
+            d0, d1, _year = letture.parse_finestra(request.GET)
+            mids = None
+            if request.GET.get("materials"):
+                mids = [int(x) for x in request.GET["materials"].split(",") if x.strip()]
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
+        except ValueError:
+            return Response({"detail": "Bad 'materials' parameter."}, status=400)
+        return Response({
+            "from": d0.isoformat(),
+            "to": d1.isoformat(),
+            "conflitti": conflitti.rileva(d0, d1, mids, opzioni.include_holds(request.GET)),
+        })
 
 
 
@@ -1241,6 +1211,7 @@ class MagazzinoBookingsView(APIView):
         disponibile   = min(scorta - prenotato_giorno) sur toutes les dates
         per_day       = détail par jour
         rows          = liste des eventi impliqués
+    &include_holds=0 : sans les options des bozze (cf. eventi/opzioni.py)
     """
     permission_classes = [permissions.AllowAny]
 
@@ -1250,90 +1221,24 @@ class MagazzinoBookingsView(APIView):
             return Response({"error": "query param 'material' mancante"}, status=400)
 
         try:
-            materiale = Materiale.objects.get(pk=int(material_id))
-        except Materiale.DoesNotExist:
+            materiale = Materiale.objects.values("id", "scorta").get(pk=int(material_id))
+        except (Materiale.DoesNotExist, ValueError):
             return Response({"error": "Materiale non trovato"}, status=404)
 
-        from_s = request.query_params.get("from")
-        to_s = request.query_params.get("to")
-        on_s = request.query_params.get("on")
-
-        today = date.today()
-        d_from = parse_date(from_s) or today
-        d_to = parse_date(to_s) or d_from
-        if d_to < d_from:
-            d_to = d_from
-
-        d_on = parse_date(on_s) if on_s else None
-
-        # Evénements qui se chevauchent avec l’intervalle demandé
-        righe = (
-            RigaEvento.objects.filter(materiale_id=material_id)
-            .select_related("evento", "evento__cliente")
-            .filter(
-                Q(evento__data_evento_da__lte=d_to, evento__data_evento_a__gte=d_from)
-                | Q(evento__data_evento__gte=d_from, evento__data_evento__lte=d_to)
-            )
-            .filter(evento__stato__in=["bozza", "confermato", "fatturato"])
-        )
-
-        per_day: dict[date, int] = {}
-        rows = []
-
-        for r in righe:
-            ev: Evento = r.evento
-            ev_start = getattr(ev, "data_evento_da", None) or ev.data_evento
-            ev_end = getattr(ev, "data_evento_a", None) or ev.data_evento
-            if not ev_start or not ev_end:
-                continue
-
-            # intersection avec l’intervalle demandé
-            start = max(ev_start, d_from)
-            end = min(ev_end, d_to)
-            if end < start:
-                continue
-
-            # ligne descriptive par evento
-            rows.append({
-                "evento_id": ev.id,
-                "titolo": ev.titolo,
-                "stato": ev.stato,
-                "cliente": getattr(ev.cliente, "nome", None),
-                "data_evento_da": ev_start.isoformat(),
-                "data_evento_a": ev_end.isoformat(),
-                "qta": int(r.qta or 0),
-                "location_index": ev.location_index,
-            })
-
-            # on compte la qté sur chaque jour couvert par l’événement
-            for g in daterange(start, end):
-                per_day[g] = per_day.get(g, 0) + int(r.qta or 0)
-
-        scorta = int(materiale.scorta or 0)
-        if per_day:
-            prenotato_max = max(per_day.values())
-            disp_min = min(scorta - q for q in per_day.values())
-        else:
-            prenotato_max = 0
-            disp_min = scorta
-
-        # pour compatibilité avec l’UI : "Prenotato (ON)"
-        if d_on is not None:
-            pren_on = per_day.get(d_on, 0)
-        else:
-            pren_on = prenotato_max
+        params = request.query_params
+        try:
+            if params.get("from") or params.get("to"):
+                d_from, d_to, _ = letture.parse_finestra(params)  # fenêtre plafonnée
+            else:
+                d_from = d_to = date.today()
+            d_on = date.fromisoformat(params["on"]) if params.get("on") else None
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
+        except ValueError:
+            return Response({"detail": "Bad 'on' date. Use YYYY-MM-DD."}, status=400)
 
-        return Response(
-            {
-                "materiale": materiale.id,
-                "scorta": scorta,
-                "prenotato": pren_on,
-                "prenotato_max": prenotato_max,
-                "disponibile": max(0, disp_min),
-                "per_day": {
-                    d.isoformat(): per_day.get(d, 0)
-                    for d in daterange(d_from, d_to)
-                },
-                "rows": rows,
-            }
-        )
+        righe = letture.righe_bookings_qs(materiale["id"], d_from, d_to,
+                                          opzioni.include_holds(request.query_params))
+        return Response(letture.magazzino_bookings_payload(
+            materiale["id"], materiale["scorta"], righe, d_from, d_to, d_on,
+        ))
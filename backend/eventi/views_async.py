@@ -0,0 +1,122 @@
+# (chemin : /backend/eventi/views_async.py)
+"""
+Variantes async (ASGI) des endpoints de lecture "tableau de bord".
+
+Mêmes querysets / builders que les vues DRF sync (cf. eventi/letture.py),
+mais lus avec l'ORM async : un seul process uvicorn encaisse les polls
+concurrents du calendrier et du magazzino sans bloquer un thread par requête.
+
+Elles ne sont routées que par l'URLconf ASGI (backend/urls_async.py,
+process uvicorn :8001). Les écritures, exports DOCX/PDF et le reste de l'API
+restent sur les workers gunicorn sync.
+
+/api/stream (SSE) n'existe que côté ASGI : sous WSGI une réponse infinie
+bloquerait un worker.
+"""
+import json
+from datetime import date
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_safe
+
+from . import disponibilita, letture, notifiche, opzioni
+from .etag import con_etag, etag_location_calendar
+from .models import Materiale
+
+
+@require_safe
+@con_etag(etag_location_calendar)
+async def location_calendar(request):
+    """GET /api/calendario/location-calendar?year=YYYY|from=&to=[&view=runs] (cf. LocationCalendarView)"""
+    try:
+        d0, d1, year = letture.parse_finestra(request.GET)
+    except letture.ParametroNonValido as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+    rows = [r async for r in letture.location_calendar_qs(d0, d1)]
+    return JsonResponse(letture.location_calendar_payload(d0, d1, year, rows, request.GET.get("view", "giorni")))
+
+
+@require_safe
+async def eventi_mese(request):
+    """GET /api/eventi/mese?year=YYYY&month=M (cf. EventiMensiliView)"""
+    try:
+        y = int(request.GET.get("year", date.today().year))
+        m = int(request.GET.get("month", date.today().month))
+        month_start, month_end = letture.month_bounds(y, m)
+    except ValueError:
+        return JsonResponse({"detail": "Bad 'year'/'month' parameter."}, status=400)
+    rows = [r async for r in letture.eventi_mese_qs(month_start, month_end)]
+    return JsonResponse(letture.eventi_mese_payload(rows), safe=False)
+
+
+@require_safe
+async def magazzino_status(request):
+    """GET /api/magazzino/status?from=&to=&materials= (cf. MagazzinoStatusView)"""
+    try:
+        dfrom, dto, mids = letture.parse_status_params(request.GET)
+    except letture.ParametroNonValido as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+
+    mats = [m async for m in letture.materiali_status_qs(mids)]
+    impegni = await disponibilita.aimpegni(dfrom, dto, mids, opzioni.include_holds(request.GET))
+    return JsonResponse(letture.magazzino_status_payload(dfrom, dto, mats, impegni))
+
+
+@require_safe
+async def magazzino_bookings(request):
+    """GET /api/magazzino/bookings?material=<id>&from=&to=&on= (cf. MagazzinoBookingsView)"""
+    material_id = request.GET.get("material")
+    if not material_id:
+        return JsonResponse({"error": "query param 'material' mancante"}, status=400)
+    try:
+        materiale = await Materiale.objects.values("id", "scorta").aget(pk=int(material_id))
+    except (Materiale.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Materiale non trovato"}, status=404)
+
+    d_from = parse_date(request.GET.get("from") or "") or date.today()
+    d_to = parse_date(request.GET.get("to") or "") or d_from
+    if d_to < d_from:
+        d_to = d_from
+    on_s = request.GET.get("on")
+    d_on = parse_date(on_s) if on_s else None
+
+    righe = [r async for r in letture.righe_bookings_qs(materiale["id"], d_from, d_to,
+                                                        opzioni.include_holds(request.GET))]
+    return JsonResponse(letture.magazzino_bookings_payload(
+        materiale["id"], materiale["scorta"], righe, d_from, d_to, d_on,
+    ))
+
+
+PING_SECONDI = 15  # commentaire SSE : garde la connexion ouverte à travers nginx
+
+
+@require_safe
+async def stream(request):
+    """
+    GET /api/stream : notifications SSE des changements eventi / righe (cf. notifiche.py)
+    503 en production sans broker partagé : le flux ne recevrait jamais rien.
+    """
+    if not settings.DEBUG and not notifiche.condiviso():
+        return JsonResponse({"detail": "Notifiche non disponibili: EVENTI_PUSH_REDIS_URL non configurato."},
+                            status=503)
+
+    async def eventi_sse():
+        async with notifiche.broker().abbonamento() as prossimo:
+            # abonné AVANT le 1er octet : rien n'est perdu entre connexion et écoute
+            yield "retry: 5000\n\n"
+            while True:
+                msg = await prossimo(PING_SECONDI)
+                if msg is None:
+                    yield ": ping\n\n"
+                else:
+                    yield f"event: {msg['tipo']}\ndata: {json.dumps(msg)}\n\n"
+
+    response = StreamingHttpResponse(eventi_sse(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    # GZip / compression_middleware ignorent les réponses déjà encodées :
+    # un flux compressé serait bufferisé et n'arriverait jamais
+    response["Content-Encoding"] = "identity"
+    return response
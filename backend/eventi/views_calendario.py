@@ -1,18 +1,19 @@
 # backend/eventi/views_calendario.py
-from datetime import date, timedelta
-
-from django.db.models import Count
+from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Evento
+from . import letture, sincro
+from .etag import con_etag, etag_location_calendar
 
 
 class LocationCalendarView(APIView):
     """
     GET /api/calendario/location-calendar?year=2025
+    GET /api/calendario/location-calendar?from=2025-12-01&to=2026-01-31   (fenêtre libre)
+    &view=runs : une entrée par evento au lieu d'une cellule par jour
 
-    Réponse:
+    Réponse (défaut) :
     {
       "year": 2025,
       "days": ["2025-01-01", ...],
@@ -30,62 +31,48 @@ class LocationCalendarView(APIView):
         ...
       ]
     }
+    Réponse (view=runs) :
+    {
+      "year": 2025, "from": "2025-01-01", "to": "2025-12-31",
+      "slots": [1,2,3,4,5,6,7,8],
+      "runs": [
+        {"start": "2024-12-30", ...}  -> coupé à la fenêtre : "start": "2025-01-01"
+        {"start": "2025-01-01", "end": "2025-01-03", "slot": 1, "evento": 12,
+         "stato": "bozza", "titolo": "...", "cliente_nome": "...", "luogo_nome": "..."},
+        ...
+      ]
+    }
+    Les eventi multi-jours occupent leur slot sur toute leur période, même
+    commencés l'année précédente. Sans `year` : année courante.
+    Variante async : views_async.location_calendar (même payload).
+    ETag + 304 si rien n'a changé (cf. eventi/etag.py).
     """
 
+    @method_decorator(con_etag(etag_location_calendar))
     def get(self, request, *args, **kwargs):
         try:
-            year = int(request.GET.get("year") or date.today().year)
-        except ValueError:
-            year = date.today().year
+            d0, d1, year = letture.parse_finestra(request.GET)
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
+        rows = letture.location_calendar_qs(d0, d1)
+        return Response(letture.location_calendar_payload(d0, d1, year, rows, request.GET.get("view", "giorni")))
 
-        # --- liste des jours de l'année ---
-        start = date(year, 1, 1)
-        end = date(year, 12, 31)
 
-        days: list[str] = []
-        d = start
-        while d <= end:
-            days.append(d.isoformat())
-            d += timedelta(days=1)
-
-        # slots 1..8 (ou adapte si tu as plus)
-        slots = list(range(1, 9))
-
-        # --- événements de l'année ---
-        # On suppose 1 evento max par (date, location_index)
-        qs = (
-            Evento.objects.filter(data_evento__year=year)
-            .select_related("cliente", "luogo")
-            .values(
-                "id",
-                "data_evento",
-                "location_index",
-                "stato",
-                "titolo",
-                "cliente__nome",
-                "luogo__nome",
-            )
-        )
+class CalendarioChangesView(APIView):
+    """
+    GET /api/calendario/changes?since=<token>
 
-        bookings = []
-        for row in qs:
-            bookings.append(
-                {
-                    "date": row["data_evento"].isoformat(),
-                    "slot": row["location_index"],
-                    "count": 1,
-                    "stato": row["stato"],
-                    "titolo": row["titolo"] or "",
-                    "cliente_nome": row["cliente__nome"] or "",
-                    "luogo_nome": row["luogo__nome"] or "",
-                }
-            )
+    Eventi créés / modifiés / annullati et ids supprimés depuis `token`
+    (cf. eventi/sincro.py) ; complète un chargement complet de
+    location-calendar?view=runs :
+    {"token": "1760870400000000", "reset": false,
+     "eventi": [{"start": ..., "end": ..., "slot": 1, "evento": 12, ...}],
+     "eliminati": [7]}
+    Sans `since`, ou token trop ancien : {"token": ..., "reset": true}.
+    """
 
-        return Response(
-            {
-                "year": year,
-                "days": days,
-                "slots": slots,
-                "bookings": bookings,
-            }
-        )
+    def get(self, request, *args, **kwargs):
+        try:
+            return Response(sincro.changes_payload(request.GET.get("since")))
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
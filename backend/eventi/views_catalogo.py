@@ -1,13 +1,14 @@
 # /backend/eventi/views_catalogo.py
-from datetime import datetime, date, timedelta
+from datetime import date
 from decimal import Decimal
 
-from django.db.models import Sum, Q
+from django.db.models import Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Materiale, RigaEvento
+from . import disponibilita
+from .models import Materiale
 
 
 def _as_euro(v):
@@ -47,13 +48,14 @@ class CatalogoSearch(APIView):
     """
     GET /api/catalogo/search?term=&categoria=&sottocategoria=&luogo=&data=&data_a=
     Retourne les lignes de catalogue filtrées + disponibilità (scorta, prenotato, disponibile)
+    prenotato = pic d'occupation sur [data, data_a] ; le stock est commun à
+    tous les luoghi : `luogo` n'entre pas dans le calcul.
     """
 
     def get(self, request):
         term = (request.GET.get("term") or "").strip()
         cat = request.GET.get("categoria") or ""
         sub = request.GET.get("sottocategoria") or ""
-        luogo_id = request.GET.get("luogo") or None
         data_s = request.GET.get("data") or ""
         data_a_s = request.GET.get("data_a") or ""
 
@@ -70,6 +72,8 @@ class CatalogoSearch(APIView):
             data_a = data_da
         if data_a and not data_da:
             data_da = data_a
+        if data_da and data_a and data_a < data_da:
+            data_da, data_a = data_a, data_da
 
         qs = (
             Materiale.objects
@@ -90,27 +94,16 @@ class CatalogoSearch(APIView):
             qs = qs.filter(sottocategoria__iexact=sub)
 
         items = []
+        materiali = list(qs.order_by("categoria", "sottocategoria", "nome")[:300])
 
-        for m in qs.order_by("categoria", "sottocategoria", "nome")[:300]:
-            scorta = int(m.scorta or 0)
-
-            pren = 0
-            if data_da and data_a:
-                righe = (
-                    RigaEvento.objects
-                    .filter(materiale=m)
-                    .select_related("evento")
-                )
-                if luogo_id:
-                    righe = righe.filter(evento__luogo_id=luogo_id)
-
-                for r in righe:
-                    start = r.evento.data_evento
-                    end = start + timedelta(days=max(1, r.copertura_giorni or 1) - 1)
-                    if end < data_da or start > data_a:
-                        continue
-                    pren += int(r.qta or 0)
+        # occupation sur [data, data_a] : une requête pour la page (cf. disponibilita.py)
+        impegni = {}
+        if data_da and data_a:
+            impegni = disponibilita.impegni(data_da, data_a, [m.id for m in materiali])
 
+        for m in materiali:
+            scorta = int(m.scorta or 0)
+            pren = disponibilita.picco(impegni.get(m.id))
             dispon = max(0, scorta - pren)
 
             items.append({
@@ -7,6 +7,11 @@ from .models import Evento, EventoRevision
 from .serializers import EventoRevisionSerializer, EventoSerializer
 
 
+def _confrontabile(payload: dict) -> dict:
+    righe = [{k: v for k, v in r.items() if k != "id"} for r in payload.get("righe") or []]
+    return {**payload, "righe": righe}
+
+
 def create_revision_if_changed(evento: Evento, note: str | None = None) -> EventoRevision | None:
     """
     Crée UNE révision seulement si le payload actuel de l'événement
@@ -15,12 +20,17 @@ def create_revision_if_changed(evento: Evento, note: str | None = None) -> Event
 
     # 1) Payload actuel
     payload = EventoSerializer(evento).data
+    # stock_tot_* dépendent du magazzino, pas de l'evento ; l'option expire
+    # et se renouvelle sans que l'offerta change : hors historique
+    payload["stock_tot_scorta"] = payload["stock_tot_dispon"] = None
+    payload["opzione_scadenza"] = None
 
     # 2) Dernière révision
     last = evento.revisions.order_by("-ref").first()
 
-    # 3) Si même payload -> ne rien créer
-    if last is not None and last.payload == payload:
+    # 3) Si même payload -> ne rien créer (righe comparées sans leur id :
+    #    PUT /righe/ et l'update les recréent à l'identique avec de nouveaux id)
+    if last is not None and _confrontabile(last.payload) == _confrontabile(payload):
         return None
 
     # 4) Sinon, ref suivante
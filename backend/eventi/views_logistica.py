@@ -3,11 +3,14 @@
 from decimal import Decimal
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from django.utils.dateparse import parse_date
+from rest_framework import status, permissions, viewsets
 from django.db.models import Q
-from .models import Evento, Mezzo, Tecnico
-from .serializers import EventoLogisticaPreviewSerializer
+from django.utils.dateparse import parse_date
+from .models import DistanzaLuogo
+from .serializers import DistanzaLuogoSerializer
+from .distanze import MatriceDistanze
+from .logistica import costi_logistica, costi_logistica_eventi, eventi_con_km
+from .assegnazione import pianifica
 
 def _euro(v):
     try:
@@ -17,73 +20,210 @@ def _euro(v):
     s = f"{v:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     return f"{s} €"
 
+def _num(v) -> float:
+    return float(round(Decimal(str(v or 0)), 2))
+
+def _dec_param(raw):
+    if raw in (None, ""):
+        return None
+    try:
+        return Decimal(str(raw))
+    except Exception:
+        return None
+
+def _format_riepilogo(res: dict) -> dict:
+    """
+    Formatage "edge" : les montants restent numériques (clé sans suffixe) et
+    sont doublés d'une version texte "_eur" pour le tableau UI existant.
+    """
+    def fmt_row(r):
+        out = {k: v for k, v in r.items() if k not in ("costo_km", "costo_uscita", "tariffa_oraria",
+                                                     "n_km", "ore", "costo_totale")}
+        out.update({
+            "costo_km": _euro(r["costo_km"]),
+            "costo_km_num": _num(r["costo_km"]),
+            "n_km": f"{r['n_km']}",
+            "costo_totale": _num(r["costo_totale"]),
+            "costo_totale_eur": _euro(r["costo_totale"]),
+        })
+        if "costo_uscita" in r:
+            out["costo_uscita"] = _num(r["costo_uscita"])
+        if "tariffa_oraria" in r:
+            out["tariffa_oraria"] = _num(r["tariffa_oraria"])
+            out["ore"] = _num(r["ore"])
+        return out
+
+    return {
+        "distanza_km": f"{res['distanza_km']}",
+        "mezzi": [fmt_row(r) for r in res["mezzi"]],
+        "tecnici": [fmt_row(r) for r in res["tecnici"]],
+        "totale_mezzi": _euro(res["totale_mezzi"]),
+        "totale_tecnici": _euro(res["totale_tecnici"]),
+        "totale_logistica": _euro(res["totale_logistica"]),
+        "totali": {
+            "mezzi": _num(res["totale_mezzi"]),
+            "tecnici": _num(res["totale_tecnici"]),
+            "logistica": _num(res["totale_logistica"]),
+        },
+    }
+
 class LogisticaPreview(APIView):
     """
-    GET /api/logistica/preview?evento=<id>&km_override=NN.nn
+    GET /api/logistica/preview?evento=<id>&km_override=NN.nn&ore=N
+    GET /api/logistica/preview?eventi=1,2,3            (plusieurs eventi)
     - km_override (facultatif) prime su qualsiasi distanza configurata
+    - ore (facultatif) : heures facturées pour les tecnici (tariffa_oraria)
+    - seuls les mezzi `attivo` sont proposés
     Retourne une structure prête à dessiner les colonnes:
       - distanza_km
-      - mezzi: [{id,nome,costo_km, n_km, costo_totale_eur}, ...]
-      - tecnici: [{id,nome,ruolo, costo_km, n_km, costo_totale_eur}, ...]
-      - totals: string formattés en €
+      - mezzi: [{id,nome,targa,costo_km,costo_uscita, n_km, costo_totale, costo_totale_eur}, ...]
+      - tecnici: [{id,nome, costo_km, tariffa_oraria, ore, n_km, costo_totale, costo_totale_eur}, ...]
+      - totale_*: string formattés en € ; totali: mêmes montants en nombres
+    Avec ?eventi= : {"eventi": [{evento, data_evento, ...même structure...}], "totali": {...}}
     """
+    permission_classes = [permissions.AllowAny]
+
     def get(self, request):
         evento_id = request.GET.get("evento")
-        km_override = request.GET.get("km_override")
+        eventi_param = request.GET.get("eventi")
+        km_override = _dec_param(request.GET.get("km_override"))
+        ore = _dec_param(request.GET.get("ore")) or Decimal("0")
+
+        if eventi_param:
+            ids = [int(x) for x in eventi_param.split(",") if x.strip().isdigit()]
+            if not ids:
+                return Response({"error": "eventi invalidi"}, status=status.HTTP_400_BAD_REQUEST)
+            rows = costi_logistica_eventi(ids, km_override=km_override, ore=ore)
+            out = []
+            tot = {"mezzi": Decimal("0"), "tecnici": Decimal("0"), "logistica": Decimal("0")}
+            for r in rows:
+                item = {"evento": r["evento"], "data_evento": r["data_evento"]}
+                item.update(_format_riepilogo(r))
+                out.append(item)
+                tot["mezzi"] += r["totale_mezzi"]
+                tot["tecnici"] += r["totale_tecnici"]
+                tot["logistica"] += r["totale_logistica"]
+            return Response(
+                {"eventi": out, "totali": {k: _num(v) for k, v in tot.items()}},
+                status=status.HTTP_200_OK,
+            )
+
         if not evento_id:
             return Response({"error":"evento mancante"}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            ev = Evento.objects.select_related("luogo").get(pk=int(evento_id))
-        except Evento.DoesNotExist:
+        ev = eventi_con_km([evento_id]).first() if evento_id.isdigit() else None
+        if ev is None:
             return Response({"error":"evento non trovato"}, status=status.HTTP_404_NOT_FOUND)
 
-        # km di riferimento
-        if km_override is not None:
-            try:
-                distanza_km = Decimal(str(km_override))
-            except Exception:
-                distanza_km = ev.distanza_rilevante_km
-        else:
-            distanza_km = ev.distanza_rilevante_km
-
-        # prendi l'elenco mezzi/tecnici disponibili (qui: tutti; filtri aggiuntivi a tua scelta)
-        mezzi = Mezzo.objects.all().order_by("nome")
-        tecnici = Tecnico.objects.all().order_by("nome")
-
-        m_rows = []
-        t_rows = []
-        tot_m = Decimal("0")
-        tot_t = Decimal("0")
-
-        for m in mezzi:
-            cost = (m.costo_km or 0) * (distanza_km or 0)
-            tot_m += cost
-            m_rows.append({
-                "id": m.id,
-                "nome": m.nome,
-                "costo_km": _euro(m.costo_km or 0),
-                "n_km": f"{distanza_km}",
-                "costo_totale_eur": _euro(cost),
-            })
-
-        for t in tecnici:
-            cost = (t.costo_km or 0) * (distanza_km or 0)
-            tot_t += cost
-            t_rows.append({
-                "id": t.id,
-                "nome": t.nome,
-                "ruolo": t.ruolo,
-                "costo_km": _euro(t.costo_km or 0),
-                "n_km": f"{distanza_km}",
-                "costo_totale_eur": _euro(cost),
-            })
+        # km di riferimento (annotés par la DB, cf. logistica.eventi_con_km)
+        distanza_km = km_override if km_override is not None else ev.distanza_rilevante_km
 
-        resp = {
-            "distanza_km": f"{distanza_km}",
-            "mezzi": m_rows,
-            "tecnici": t_rows,
-            "totale_mezzi": _euro(tot_m),
-            "totale_tecnici": _euro(tot_t),
-            "totale_logistica": _euro(tot_m + tot_t),
-        }
+        resp = _format_riepilogo(costi_logistica(distanza_km, ore))
         return Response(resp, status=status.HTTP_200_OK)
+
+
+class DistanzaLuogoViewSet(viewsets.ModelViewSet):
+    """
+    CRUD matrice distanze (saisie manuelle).
+    GET /api/distanze/?luogo=<id>  -> distances depuis/vers ce luogo
+    """
+    serializer_class = DistanzaLuogoSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        qs = DistanzaLuogo.objects.select_related("origine", "destinazione").order_by("origine_id", "destinazione_id")
+        luogo = self.request.query_params.get("luogo")
+        if luogo and luogo.isdigit():
+            qs = qs.filter(Q(origine_id=luogo) | Q(destinazione_id=luogo))
+        return qs
+
+
+class PercorsoView(APIView):
+    """
+    GET /api/logistica/percorso?luoghi=4,7,2&ritorno=1
+    Giro d'une journée multi-luogo depuis le deposito, calculé depuis la
+    matrice distanze (1 chargement, puis lookups O(1)).
+    Retourne: {tratte: [{da, a, km}], km_totale, mancanti: [{da, a}]}
+    (da/a = null -> deposito)
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        raw = request.GET.get("luoghi") or ""
+        luoghi = [int(x) for x in raw.split(",") if x.strip().isdigit()]
+        if not luoghi:
+            return Response({"error": "luoghi mancanti"}, status=status.HTTP_400_BAD_REQUEST)
+        ritorno = request.GET.get("ritorno", "1") not in ("0", "false", "no")
+
+        res = MatriceDistanze.carica(luoghi).percorso(luoghi, ritorno=ritorno)
+        return Response({
+            "tratte": [
+                {"da": t["da"], "a": t["a"], "km": None if t["km"] is None else _num(t["km"])}
+                for t in res["tratte"]
+            ],
+            "km_totale": _num(res["km_totale"]),
+            "mancanti": res["mancanti"],
+        }, status=status.HTTP_200_OK)
+
+
+class AssegnazioneView(APIView):
+    """
+    GET /api/logistica/assegnazione?from=YYYY-MM-DD&to=YYYY-MM-DD&ore=8&tecnici_per_evento=1
+    Affectation mezzi/tecnici de coût minimal pour les eventi de la période
+    (algorithme hongrois, cf. eventi/assegnazione.py).
+    Retourne:
+      - assegnazioni: [{evento, titolo, location_index, da, a, km_ar,
+                        mezzo: {id,targa,costo}|null, tecnici: [{id,nome,costo}], costo,
+                        mancanti: {mezzo, tecnici}, completo}]
+      - non_assegnati: [{evento, titolo, da, a, mezzo, tecnici}, ...]
+                       (ressources insuffisantes : mezzo / nb de tecnici manquants)
+    400 si tecnici_per_evento n'est pas entre 0 et 10 ou ore entre 0 et 24.
+      - costo_totale (nombre) / costo_totale_eur (texte)
+    """
+    permission_classes = [permissions.AllowAny]
+    MAX_GIORNI = 62
+
+    def get(self, request):
+        try:
+            d0 = parse_date(request.GET.get("from") or request.GET.get("date") or "")
+            d1 = parse_date(request.GET.get("to") or "") or d0
+        except ValueError:  # ex. 2025-02-30
+            d0 = d1 = None
+        if not d0 or d1 < d0:
+            return Response({"error": "from/to invalidi (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+        if (d1 - d0).days > self.MAX_GIORNI:
+            return Response({"error": f"intervallo massimo {self.MAX_GIORNI} giorni"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        ore = _dec_param(request.GET.get("ore"))
+        if ore is None:
+            ore = Decimal("8")
+        try:
+            n_tec = int(request.GET.get("tecnici_per_evento") or 1)
+        except ValueError:
+            return Response({"error": "tecnici_per_evento invalido"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            res = pianifica(d0, d1, ore=ore, tecnici_per_evento=n_tec)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = []
+        for r in res["assegnazioni"]:
+            rows.append({
+                "evento": r["evento"],
+                "titolo": r["titolo"],
+                "location_index": r["location_index"],
+                "da": r["da"],
+                "a": r["a"],
+                "km_ar": _num(r["km_ar"]),
+                "mezzo": r["mezzo"] and {**r["mezzo"], "costo": _num(r["mezzo"]["costo"])},
+                "tecnici": [{**t, "costo": _num(t["costo"])} for t in r["tecnici"]],
+                "costo": _num(r["costo"]),
+                "mancanti": r["mancanti"],
+                "completo": r["completo"],
+            })
+        return Response({
+            "from": d0,
+            "to": d1,
+            "assegnazioni": rows,
+            "non_assegnati": res["non_assegnati"],
+            "costo_totale": _num(res["costo_totale"]),
+            "costo_totale_eur": _euro(res["costo_totale"]),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,143 @@
+# (chemin : /backend/eventi/views_magazzini.py)
+"""
+Plusieurs magazzini (cf. eventi/magazzini.py, eventi/giacenze.py).
+
+    /api/magazzini/                    CRUD (un seul principale)
+    /api/trasferimenti/                journal ; POST = déplace des giacenze
+    /api/magazzino/disponibilita       disponibilités par magazzino, du plus proche au plus lointain
+"""
+from django.db import transaction
+from django.db.models import ProtectedError
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import disponibilita, giacenze, letture, magazzini, opzioni, versioni_dati
+from .models import Magazzino, Trasferimento
+from .serializers import MagazzinoSerializer, TrasferimentoSerializer
+
+
+class MagazzinoViewSet(viewsets.ModelViewSet):
+    """
+    Le principale porte les giacenze écrites via Materiale.scorta et les
+    eventi sans magazzino ; en désigner un autre retire le flag à l'ancien.
+    """
+    queryset = Magazzino.objects.select_related("luogo").order_by("-principale", "nome")
+    serializer_class = MagazzinoSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def _salva(self, serializer):
+        with transaction.atomic():
+            if serializer.validated_data.get("principale"):
+                pk = serializer.instance.pk if serializer.instance else None
+                Magazzino.objects.filter(principale=True).exclude(pk=pk).update(principale=False)
+            serializer.save()
+            versioni_dati.bump(versioni_dati.STOCK)  # disponibilités par magazzino
+
+    def perform_create(self, serializer):
+        self._salva(serializer)
+
+    def perform_update(self, serializer):
+        self._salva(serializer)
+
+    def destroy(self, request, *args, **kwargs):
+        mag = self.get_object()
+        if mag.principale:
+            return Response({"detail": "Il magazzino principale non può essere eliminato."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with transaction.atomic():
+                mag.delete()
+        except ProtectedError:
+            return Response({"detail": "Magazzino con giacenze o trasferimenti: non eliminabile."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        versioni_dati.bump(versioni_dati.STOCK)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TrasferimentoViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                           mixins.CreateModelMixin, viewsets.GenericViewSet):
+    """
+    GET  /api/trasferimenti/?materiale=<id>&magazzino=<id>&evento=<id>
+    POST /api/trasferimenti/ {materiale, da, a, qta, evento?, note?}
+    Journal immuable : une erreur se corrige par un trasferimento inverse.
+    """
+    serializer_class = TrasferimentoSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def get_queryset(self):
+        qs = (Trasferimento.objects.select_related("materiale", "da", "a")
+              .order_by("-created_at", "-id"))
+        p = self.request.query_params
+        if (p.get("materiale") or "").isdigit():
+            qs = qs.filter(materiale_id=p["materiale"])
+        if (p.get("evento") or "").isdigit():
+            qs = qs.filter(evento_id=p["evento"])
+        if (p.get("magazzino") or "").isdigit():
+            mag = p["magazzino"]
+            qs = qs.filter(da_id=mag) | qs.filter(a_id=mag)
+        return qs
+
+    def create(self, request, *args, **kwargs):
+        ser = self.get_serializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        v = ser.validated_data
+        try:
+            t = giacenze.trasferisci(
+                v["materiale"].pk, v["da"].pk, v["a"].pk, v["qta"],
+                evento_id=v["evento"].pk if v.get("evento") else None, note=v.get("note", ""),
+            )
+        except ValueError as e:  # GiacenzaInsufficiente compris
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(t).data, status=status.HTTP_201_CREATED)
+
+
+class MagazzinoDisponibilitaView(APIView):
+    """
+    GET /api/magazzino/disponibilita?from=YYYY-MM-DD&to=YYYY-MM-DD&materials=1,2&luogo=<id>
+
+    Par materiale : le total (scorta, impegnato = pic sur la période,
+    disponibile, comme /api/magazzino/status) et le détail par magazzino,
+    du plus proche de `luogo` au plus lointain (matrice distanze).
+    &include_holds=0 : sans les options des bozze.
+
+    { "from", "to", "magazzini": [{id, nome, principale, km}],
+      "materials": [{id, nome, scorta, impegnato, disponibile,
+                     magazzini: [{magazzino, giacenza, impegnato, disponibile}]}] }
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            dfrom, dto, mids = letture.parse_status_params(request.GET)
+        except letture.ParametroNonValido as e:
+            return Response({"detail": str(e)}, status=400)
+        luogo = request.GET.get("luogo")
+        if luogo and not luogo.isdigit():
+            return Response({"detail": "Bad 'luogo' parameter."}, status=400)
+
+        holds = opzioni.include_holds(request.GET)
+        ordine = magazzini.classifica(int(luogo) if luogo else None)
+        principale = next((m["id"] for m in ordine if m["principale"]), None)
+        mats = list(letture.materiali_status_qs(mids))
+        totali = disponibilita.impegni(dfrom, dto, mids, holds)
+        dettaglio = magazzini.per_magazzino(dfrom, dto, mids, holds, principale)
+
+        vuoto = {"giacenza": 0, "impegnato": 0, "disponibile": 0}
+        out = []
+        for m in mats:
+            scorta = int(m["scorta"] or 0)
+            impegnato = disponibilita.picco(totali.get(m["id"]))
+            per_mag = dettaglio.get(m["id"], {})
+            out.append({
+                "id": m["id"], "nome": m["nome"], "scorta": scorta,
+                "impegnato": impegnato, "disponibile": max(0, scorta - impegnato),
+                "magazzini": [{"magazzino": g["id"], **per_mag.get(g["id"], vuoto)} for g in ordine],
+            })
+        return Response({
+            "from": dfrom.isoformat(),
+            "to": dto.isoformat(),
+            "magazzini": [{"id": g["id"], "nome": g["nome"], "principale": g["principale"],
+                           "km": float(g["km"]) if g["km"] is not None else None} for g in ordine],
+            "materials": out,
+        })
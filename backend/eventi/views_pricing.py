@@ -1,13 +1,13 @@
 # (chemin : /backend/eventi/views_pricing.py)
 from datetime import datetime
 from decimal import Decimal
-from django.apps import apps as django_apps
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
 
 from .pricing import compute_quote, Line  # ✅ OK depuis pricing.py (pas de boucle)
 from .models import Materiale, Mezzo
+from .distanze import km_andata_ritorno
 
 class QuotePricingView(APIView):
     """
@@ -32,17 +32,14 @@ class QuotePricingView(APIView):
         except Exception:
             return Response({"detail": "data invalida (YYYY-MM-DD)."}, status=400)
 
-        # distance : 1) param explicite 2) depuis le luogo si dispo 3) 0
+        # distance : 1) param explicite 2) matrice distanze / luogo 3) 0
         distanza = js.get("distanza_km_ar")
 
         if distanza is None and js.get("luogo"):
-            LuogoModel = django_apps.get_model("eventi", "Luogo")  # ✅ pas d'import dur → pas d’erreur si pas de modèle
-            if LuogoModel:
-                try:
-                    luogo = LuogoModel.objects.get(pk=js["luogo"])
-                    distanza = getattr(luogo, "distanza_km_ar", None)
-                except LuogoModel.DoesNotExist:
-                    pass
+            try:
+                distanza = km_andata_ritorno(int(js["luogo"]))
+            except (TypeError, ValueError):
+                pass
 
         distanza = Decimal(str(distanza or 0))
 
@@ -1,16 +1,30 @@
 # /backend/eventi/views_stats.py
 from __future__ import annotations
 from datetime import date, datetime, timedelta
-from collections import defaultdict
 from decimal import Decimal
-from django.db.models import Sum, F, Q, IntegerField
-from django.db.models.functions import TruncDate
+from django.db.models import Sum, F, Q, Count, DecimalField, ExpressionWrapper
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from django.utils.dateparse import parse_date
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Evento, RigaEvento, Materiale
+from .models import Evento, RigaEvento
 
 STATI_ATTIVI = ("bozza", "inviata", "confermato", "acconto", "saldo", "fatturato")
+STATI_INVIATI = ("bozza", "inviata")
+STATI_CONFERMATI = ("confermato", "acconto", "saldo", "fatturato")
+STATI_RIPARTIZIONE = ("annullato", "bozza", "confermato", "fatturato")
+
+# granularité -> fonction de troncature SQL
+GRANULARITA = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+# plage max acceptée par /stats/range (évite les séries journalières géantes)
+MAX_GIORNI_RANGE = 3 * 366
+
 
 def month_bounds(yyyy_mm: str):
     y, m = map(int, yyyy_mm.split("-"))
@@ -18,6 +32,111 @@ def month_bounds(yyyy_mm: str):
     d1 = (date(y + (m // 12), (m % 12) + 1, 1) - timedelta(days=1))
     return d0, d1
 
+
+def _shift_year(d: date, years: int) -> date:
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:  # 29/02 -> 28/02
+        return d.replace(year=d.year + years, day=28)
+
+
+def compute_stats(d0: date, d1: date, granularita: str = "day") -> dict:
+    """
+    Statistiques agrégées sur [d0, d1], calculées côté DB.
+
+    Nombre de requêtes constant (6) quelle que soit la taille de la plage :
+      1. kpis + répartition par stato (Evento, Count conditionnels)
+      2. ricavo / linee / logistica (RigaEvento, Sum conditionnels)
+      3. série ricavo par période (TruncDay/Week/Month)
+      4. série eventi + conversion par période
+      5. top materiali
+      6. ricavo par catégorie
+    """
+    trunc = GRANULARITA[granularita]
+
+    ev = Evento.objects.filter(data_evento__range=(d0, d1), stato__in=STATI_ATTIVI)
+    ev_all = Evento.objects.filter(data_evento__range=(d0, d1))
+
+    # 1) kpis eventi + répartitions (une seule requête)
+    agg_ev = ev_all.aggregate(
+        eventi=Count("id", filter=Q(stato__in=STATI_ATTIVI)),
+        inviati=Count("id", filter=Q(stato__in=STATI_INVIATI)),
+        confermati=Count("id", filter=Q(stato__in=STATI_CONFERMATI)),
+        **{f"stato_{s}": Count("id", filter=Q(stato=s)) for s in STATI_RIPARTIZIONE},
+    )
+    inviati = agg_ev["inviati"] or 0
+    confermati = agg_ev["confermati"] or 0
+    conversion = (confermati / max(1, inviati + confermati)) * 100
+
+    # 2) lignes + ricavo (une seule requête)
+    ricavo_expr = ExpressionWrapper(
+        F("qta") * F("prezzo"),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    righe = (RigaEvento.objects
+             .filter(evento__in=ev)
+             .annotate(ricavo_riga=ricavo_expr))
+    agg_r = righe.aggregate(
+        ricavo=Sum("ricavo_riga"),
+        linee=Sum("qta"),
+        # logistique: on considère categoria="Logistica" (adapte si besoin)
+        logistica=Sum("ricavo_riga", filter=Q(materiale__categoria__iexact="Logistica")),
+    )
+    ricavo_totale = agg_r["ricavo"] or Decimal("0")
+    cout_log = agg_r["logistica"] or Decimal("0")
+    cout_total = ricavo_totale  # simple pour l’instant (si tu as costi/costo_tecnico, additionne-les ici)
+
+    # 3) ricavo par période
+    ric_periodo = (righe.annotate(p=trunc("evento__data_evento"))
+                        .values("p").annotate(ricavo=Sum("ricavo_riga")).order_by("p"))
+    serie: dict[date, dict] = {}
+    for r in ric_periodo:
+        p = r["p"].date() if isinstance(r["p"], datetime) else r["p"]
+        serie[p] = {"periodo": p.isoformat(), "ricavo": float(r["ricavo"] or 0),
+                    "eventi": 0, "conversione": 0.0}
+
+    # 4) eventi + conversion par période
+    ev_periodo = (ev.annotate(p=trunc("data_evento"))
+                    .values("p")
+                    .annotate(
+                        n=Count("id"),
+                        inv=Count("id", filter=Q(stato__in=STATI_INVIATI)),
+                        conf=Count("id", filter=Q(stato__in=STATI_CONFERMATI)),
+                    )
+                    .order_by("p"))
+    for r in ev_periodo:
+        p = r["p"].date() if isinstance(r["p"], datetime) else r["p"]
+        row = serie.setdefault(p, {"periodo": p.isoformat(), "ricavo": 0.0,
+                                   "eventi": 0, "conversione": 0.0})
+        row["eventi"] = int(r["n"] or 0)
+        row["conversione"] = round((r["conf"] / max(1, r["inv"] + r["conf"])) * 100, 1)
+
+    # 5) top matériels (quantité)
+    top_q = (righe.values("materiale__nome")
+                  .annotate(q=Sum("qta")).order_by("-q")[:10])
+    top_materiali = [{"nome": x["materiale__nome"], "qta": int(x["q"] or 0)} for x in top_q]
+
+    # 6) ricavo par catégorie
+    ric_cat = (righe.values("materiale__categoria")
+                    .annotate(ric=Sum("ricavo_riga")).order_by("-ric"))
+    ricavo_per_categoria = [{"categoria": x["materiale__categoria"] or "-", "ricavo": float(x["ric"] or 0)} for x in ric_cat]
+
+    return {
+        "kpis": {
+            "eventi": agg_ev["eventi"] or 0,
+            "linee": int(agg_r["linee"] or 0),
+            "ricavo_totale": float(ricavo_totale),
+            "conversione": round(conversion, 1),
+            "costo_logistica": float(cout_log),
+            "costo_totale": float(cout_total),
+        },
+        "serie": [serie[k] for k in sorted(serie)],
+        "stati": [{"label": s, "count": agg_ev[f"stato_{s}"] or 0} for s in STATI_RIPARTIZIONE],
+        "top_materiali": top_materiali,
+        "ricavo_per_categoria": ricavo_per_categoria,
+    }
+
+
 class StatsMeseView(APIView):
     """
     GET /api/stats/mese?m=2025-11
@@ -30,56 +149,63 @@ class StatsMeseView(APIView):
     """
     def get(self, request):
         m = request.GET.get("m")
-        assert m, "Parametro m mancante (YYYY-MM)"
-        d0, d1 = month_bounds(m)
+        try:
+            d0, d1 = month_bounds(m)
+        except Exception:
+            return Response({"detail": "Parametro m mancante o invalido (YYYY-MM)"}, status=400)
 
-        ev = Evento.objects.filter(data_evento__range=(d0, d1), stato__in=STATI_ATTIVI)
+        st = compute_stats(d0, d1, "day")
+        data = {
+            "kpis": st["kpis"],
+            "ricavo_per_giorno": [
+                {"date": r["periodo"], "ricavo": r["ricavo"]}
+                for r in st["serie"] if r["ricavo"]
+            ],
+            "stati": st["stati"],
+            "top_materiali": st["top_materiali"],
+            "ricavo_per_categoria": st["ricavo_per_categoria"],
+        }
+        return Response(data)
 
-        # lignes + ricavo
-        righe = (RigaEvento.objects
-                 .filter(evento__in=ev)
-                 .annotate(importo=F("qta") * F("prezzo")))
-        ricavo_totale = righe.aggregate(t=Sum("importo"))["t"] or Decimal("0")
-        lignes_tot = righe.aggregate(t=Sum("qta"))["t"] or 0
 
-        # conversion (confermati / inviati+bozze)
-        inviati = ev.filter(stato__in=("bozza", "inviata")).count()
-        confermati = ev.filter(stato__in=("confermato","acconto","saldo","fatturato")).count()
-        conversion = (confermati / max(1, inviati + confermati)) * 100
+class StatsRangeView(APIView):
+    """
+    GET /api/stats/range?from=2025-01-01&to=2025-12-31&granularity=month&yoy=1
 
-        # logistique: on considère categoria="Logistica" (adapte si besoin)
-        ids_log = list(Materiale.objects.filter(categoria__iexact="Logistica").values_list("id", flat=True))
-        cout_log = (righe.filter(materiale_id__in=ids_log).aggregate(t=Sum("importo"))["t"] or Decimal("0"))
-        cout_total = ricavo_totale  # simple pour l’instant (si tu as costi/costo_tecnico, additionne-les ici)
-
-        # ricavo par jour
-        ric_giorno = (righe.annotate(d=TruncDate("evento__data_evento"))
-                           .values("d").annotate(ricavo=Sum("importo")).order_by("d"))
-        ricavo_per_giorno = [{"date": r["d"].isoformat(), "ricavo": float(r["ricavo"] or 0)} for r in ric_giorno]
-
-        # répartitions
-        stati = [{"label": s, "count": ev.filter(stato=s).count()} for s in ("annullato","bozza","confermato","fatturato")]
-        # top matériels (quantité)
-        top_q = (righe.values("materiale__nome")
-                      .annotate(q=Sum("qta")).order_by("-q")[:10])
-        top_materiali = [{"nome": x["materiale__nome"], "qta": int(x["q"] or 0)} for x in top_q]
-        # ricavo par catégorie
-        ric_cat = (righe.values("materiale__categoria")
-                        .annotate(ric=Sum("importo")).order_by("-ric"))
-        ricavo_per_categoria = [{"categoria": x["materiale__categoria"] or "-", "ricavo": float(x["ric"] or 0)} for x in ric_cat]
+    - granularity : day | week | month (défaut: month)
+    - yoy=1       : ajoute le même calcul sur la plage de l'année précédente
+
+    Retourne:
+      - from, to, granularity
+      - kpis {eventi, linee, ricavo_totale, conversione, costo_logistica, costo_totale}
+      - serie [{periodo, ricavo, eventi, conversione}]   (periodo = début de période)
+      - stati [{label,count}]
+      - top_materiali [{nome,qta}]
+      - ricavo_per_categoria [{categoria, ricavo}]
+      - anno_precedente {from, to, kpis, serie, ...}     (si yoy=1)
+    """
+    def get(self, request):
+        try:
+            d0 = parse_date(request.GET.get("from") or "")
+            d1 = parse_date(request.GET.get("to") or "")
+        except ValueError:  # ex. 2025-02-30
+            d0 = d1 = None
+        if not d0 or not d1 or d1 < d0:
+            return Response({"detail": "Parametri from/to invalidi (YYYY-MM-DD)."}, status=400)
+
+        gran = (request.GET.get("granularity") or request.GET.get("g") or "month").lower()
+        if gran not in GRANULARITA:
+            return Response({"detail": "granularity deve essere day, week o month."}, status=400)
+        if (d1 - d0).days > MAX_GIORNI_RANGE:
+            return Response({"detail": f"Intervallo massimo: {MAX_GIORNI_RANGE} giorni."}, status=400)
+
+        data = {"from": d0.isoformat(), "to": d1.isoformat(), "granularity": gran}
+        data.update(compute_stats(d0, d1, gran))
+
+        if request.GET.get("yoy") in ("1", "true", "yes"):
+            p0, p1 = _shift_year(d0, -1), _shift_year(d1, -1)
+            prev = {"from": p0.isoformat(), "to": p1.isoformat()}
+            prev.update(compute_stats(p0, p1, gran))
+            data["anno_precedente"] = prev
 
-        data = {
-            "kpis": {
-                "eventi": ev.count(),
-                "linee": int(lignes_tot),
-                "ricavo_totale": float(ricavo_totale),
-                "conversione": round(conversion, 1),
-                "costo_logistica": float(cout_log),
-                "costo_totale": float(cout_total),
-            },
-            "ricavo_per_giorno": ricavo_per_giorno,
-            "stati": stati,
-            "top_materiali": top_materiali,
-            "ricavo_per_categoria": ricavo_per_categoria,
-        }
         return Response(data)
@@ -0,0 +1,58 @@
+# (chemin : /backend/gunicorn.conf.py)
+"""
+Configuration gunicorn (mode production).
+
+    gunicorn -c gunicorn.conf.py backend.wsgi:application
+
+Dimensionnement : workers process (CPU) x threads (I/O). Un export DOCX lent
+n'occupe qu'un thread : le calendrier reste servi par les autres.
+Tout est surchargeable par variables d'environnement GUNICORN_*.
+
+Rechargement à chaud du code (sans couper les requêtes en cours) :
+    kill -HUP <pid master>      # ou: supervisorctl signal HUP django
+Chaque worker recharge l'app : valable tant que GUNICORN_PRELOAD=0 (défaut).
+Avec GUNICORN_PRELOAD=1 le master garde l'ancien code et HUP ne fait que
+refork les workers : déployer par redémarrage complet
+(supervisorctl restart django).
+"""
+import multiprocessing
+import os
+
+
+def _int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# 2 x CPU + 1 process, plafonné (SQLite : peu d'écrivains simultanés)
+workers = _int("GUNICORN_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8))
+worker_class = "gthread"
+threads = _int("GUNICORN_THREADS", 4)
+
+# exports DOCX / sinottico annuel : marge large
+timeout = _int("GUNICORN_TIMEOUT", 120)
+graceful_timeout = _int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _int("GUNICORN_KEEPALIVE", 5)
+
+# recyclage des workers (fuites mémoire éventuelles)
+max_requests = _int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# GUNICORN_PRELOAD=1 : app chargée avant fork (démarrage plus rapide,
+# mémoire partagée) mais HUP ne recharge plus le code, cf. docstring
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+forwarded_allow_ips = os.getenv("GUNICORN_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def post_fork(server, worker):
+    # chaque worker ouvre ses propres connexions DB
+    from django.db import connections
+    connections.close_all()
@@ -7,6 +7,7 @@ import dayjs from "dayjs";
 import Link from "next/link";
 import { api } from "@/lib/api";
 import { usePersistentState } from "@/hooks/usePersistent";
+import { toccaPeriodo, useNotifiche } from "@/hooks/useNotifiche";
 import { getCalendarBadges } from "@/lib/eventStatus";
 import { AppShell } from "@/components/layout/AppShell";
 
@@ -94,6 +95,8 @@ export default function CalendarioPage() {
   const [rows, setRows] = useState<MensileItem[]>([]);
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  // incrémenté par les notifications push -> rechargement du mois
+  const [rev, setRev] = useState(0);
 
   // redirection si non loggé
   useEffect(() => {
@@ -115,7 +118,18 @@ export default function CalendarioPage() {
       .then((r) => setRows(r.data || []))
       .catch((e) => setErr(e?.message || "Erreur inattendue"))
       .finally(() => setLoading(false));
-  }, [month]);
+  }, [month, rev]);
+
+  useNotifiche(
+    (n) =>
+      (n.tipo === "resync" || !!n.domini?.includes("calendario")) &&
+      toccaPeriodo(
+        n,
+        dayjs(`${month}-01`).format("YYYY-MM-DD"),
+        dayjs(`${month}-01`).endOf("month").format("YYYY-MM-DD"),
+      ),
+    () => setRev((r) => r + 1),
+  );
 
   const calendarDays = useMemo(() => {
     const first = dayjs(`${month}-01`);
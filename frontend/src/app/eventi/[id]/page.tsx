@@ -41,6 +41,20 @@ type Evento = {
   note?: string | null; // note globale
   righe: Riga[];
   categoria_notes?: Record<string, string>; // notes par catégorie
+  conflitti?: Conflitto[]; // réponse d'un save seulement (overbooking)
+  opzione_scadenza?: string | null; // option de stock d'une bozza (null = ne compte pas)
+};
+
+/** Overbooking renvoyé au save (cf. backend/eventi/conflitti.py) */
+type Conflitto = {
+  materiale: number;
+  nome: string;
+  scorta: number;
+  da: string;
+  a: string;
+  impegnato: number;
+  eccedenza: number;
+  eventi: number[];
 };
 
 type Revision = { ref: number; created_at: string; payload: Partial<Evento> };
@@ -59,6 +73,18 @@ const StatoPill = ({ v }: { v: Evento["stato"] }) => (
 );
 const euro = (n: number) => `${n.toFixed(2)} €`;
 
+function descriviConflitti(cs: Conflitto[]): string {
+  return cs
+    .map((c) => {
+      const quando =
+        c.da === c.a
+          ? dayjs(c.da).format("DD/MM")
+          : `${dayjs(c.da).format("DD/MM")}–${dayjs(c.a).format("DD/MM")}`;
+      return `${c.nome} ${c.impegnato}/${c.scorta} (${quando})`;
+    })
+    .join(", ");
+}
+
 /* ---------- Métadonnées matériel ---------- */
 type MatMeta = { categoria: string; sottocategoria: string };
 const FALLBACK_META: MatMeta = {
@@ -635,7 +661,8 @@ export default function EventoPage() {
         });
       } catch (err: any) {
         const code = err?.response?.status;
-        if (code === 405 || code === 400) {
+        // overbooking refusé : pas de nouvel essai en PUT
+        if (code === 405 || (code === 400 && !err?.response?.data?.conflitti)) {
           res = await api.put(`/eventi/${e.id}/`, payload, {
             params: { force_revision: 1, _t: Date.now() },
             headers: { "X-Force-Revision": "1" },
@@ -677,11 +704,21 @@ export default function EventoPage() {
       setRevs(latest);
       setRevSel(latest.length ? latest[latest.length - 1].ref : null);
 
-      setMsg("Modifiche salvate.");
+      const conflitti: Conflitto[] = after.conflitti || [];
+      setMsg(
+        conflitti.length
+          ? `Modifiche salvate. Attenzione, scorta insufficiente: ${descriviConflitti(conflitti)}`
+          : "Modifiche salvate.",
+      );
       setMode("view");
-    } catch (err) {
+    } catch (err: any) {
       console.error(err);
-      setMsg("Errore durante il salvataggio.");
+      const conflitti: Conflitto[] | undefined = err?.response?.data?.conflitti;
+      setMsg(
+        conflitti?.length
+          ? `Non salvato, scorta insufficiente: ${descriviConflitti(conflitti)}`
+          : "Errore durante il salvataggio.",
+      );
     } finally {
       setSaving(false);
     }
@@ -723,6 +760,18 @@ export default function EventoPage() {
     }
   }
 
+  // option de stock d'une bozza (cf. backend/eventi/opzioni.py)
+  async function rinnovaOpzione() {
+    if (!e) return;
+    try {
+      const r = await api.post(`/eventi/${e.id}/opzione/`);
+      setE({ ...e, opzione_scadenza: r.data.opzione_scadenza });
+      setMsg("Opzione rinnovata.");
+    } catch {
+      setMsg("Impossibile rinnovare l'opzione.");
+    }
+  }
+
   async function deleteEvento(id: number) {
     if (!confirm("Vuoi davvero eliminare questo evento?")) return;
     try {
@@ -869,6 +918,20 @@ export default function EventoPage() {
                   ) : (
                     <span className="text-sm font-medium">{stato}</span>
                   )}
+                  {mode !== "edit" && e.stato === "bozza" && (
+                    <span className="flex items-center gap-1 text-xs text-slate-600">
+                      {e.opzione_scadenza
+                        ? `Opzione scorta fino al ${dayjs(e.opzione_scadenza).format("DD/MM HH:mm")}`
+                        : "Opzione scaduta: il materiale non è bloccato"}
+                      <button
+                        type="button"
+                        className="px-2 py-0.5 rounded border border-slate-300 bg-white hover:bg-slate-50"
+                        onClick={rinnovaOpzione}
+                      >
+                        Rinnova
+                      </button>
+                    </span>
+                  )}
                 </div>
 
                 <div className="flex flex-wrap items-center gap-2">
@@ -926,6 +989,7 @@ export default function EventoPage() {
                 <span className="text-sm">Location</span>
                 <LocationSelector
                   dateValue={dataEvento}
+                  eventoId={id}
                   value={locIdx}
                   onChange={setLocIdx}
                   autoReassignIfBusy={false}
@@ -885,6 +885,7 @@ async function addMaterial(materiale_id: number, qta: number) {
 
           <LocationSelector
             dateValue={dateDa}
+            dateTo={dateA}
             value={locationIndex}
             onChange={setLocationIndex}
             autoReassignIfBusy={true}
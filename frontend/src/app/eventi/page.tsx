@@ -27,6 +27,7 @@ export default function EventiIndex() {
   const [events, setEvents] = useState<Evento[]>([]);
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  const [cursor, setCursor] = useState<string | null>(null);
 
   /* Protection: si pas loggé → /login */
   useEffect(() => {
@@ -38,29 +39,37 @@ export default function EventiIndex() {
     }
   }, [router]);
 
-  /* Chargement liste événements */
-  useEffect(() => {
-    let cancelled = false;
+  /* Chargement liste événements (pagination par curseur, 50 par page) */
+  const loadPage = (next: string | null, cancelled?: () => boolean) => {
     setLoading(true);
     setErr(null);
 
-    api
-      .get("/eventi/")
+    return api
+      .get("/eventi/", {
+        params: { view: "summary", ordine: "desc", ...(next ? { cursor: next } : {}) },
+      })
       .then((r) => {
-        if (cancelled) return;
+        if (cancelled?.()) return;
         const data = Array.isArray(r.data)
           ? r.data
           : r.data?.results || [];
-        setEvents(data as Evento[]);
+        setEvents((prev) => (next ? [...prev, ...data] : (data as Evento[])));
+        // "next" = URL complète : on n'en garde que le paramètre cursor
+        const nextUrl: string | null = Array.isArray(r.data) ? null : r.data?.next ?? null;
+        setCursor(nextUrl ? new URL(nextUrl).searchParams.get("cursor") : null);
       })
       .catch((e) => {
-        if (cancelled) return;
+        if (cancelled?.()) return;
         setErr(e?.message || "Errore di caricamento");
       })
       .finally(() => {
-        if (!cancelled) setLoading(false);
+        if (!cancelled?.()) setLoading(false);
       });
+  };
 
+  useEffect(() => {
+    let cancelled = false;
+    loadPage(null, () => cancelled);
     return () => {
       cancelled = true;
     };
@@ -198,6 +207,19 @@ export default function EventiIndex() {
               </tbody>
             </table>
           </div>
+
+          {cursor && (
+            <div className="px-4 py-3 border-t border-slate-200 text-center">
+              <button
+                type="button"
+                disabled={loading}
+                onClick={() => loadPage(cursor)}
+                className="px-3 py-1.5 border border-slate-300 rounded-xl text-xs md:text-sm text-slate-800 bg-white hover:bg-slate-50 disabled:opacity-50"
+              >
+                {loading ? "Caricamento…" : "Carica altri"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </AppShell>
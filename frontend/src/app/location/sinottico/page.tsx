@@ -1,10 +1,11 @@
 /* /frontend/src/app/location/sinottico/page.tsx */
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import dayjs from "dayjs";
 import Link from "next/link";
 import { api } from "@/lib/api";
+import { toccaPeriodo, useNotifiche } from "@/hooks/useNotifiche";
 
 type Stato = "bozza" | "confermato" | "annullato" | "fatturato";
 
@@ -18,11 +19,27 @@ type BookingCell = {
   luogo_nome?: string;
 };
 
+/** Réponse ?view=runs : une entrée par évènement (période coupée à l'année) */
+type BookingRun = Omit<BookingCell, "date" | "count"> & {
+  start: string;       // "YYYY-MM-DD"
+  end: string;         // "YYYY-MM-DD" (multi-jours inclus)
+  evento: number;
+};
+
+/** /calendario/changes : eventi modifiés (période non coupée) / supprimés depuis `token` */
+type ChangesResponse = {
+  token: string;
+  reset: boolean;
+  eventi?: BookingRun[];
+  eliminati?: number[];
+};
+
 type LocationCalendarResponse = {
   year: number;
-  days: string[];
+  from: string;
+  to: string;
   slots: number[];           // ex: [1,2,3,4,5,6,7,8]
-  bookings: BookingCell[];
+  runs: BookingRun[];
 };
 
 /** Couleurs par stato :
@@ -43,6 +60,10 @@ export default function LocationSinotticoPage() {
   const [data, setData] = useState<LocationCalendarResponse | null>(null);
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  // rechargement complet de l'année (changement d'année, "reset" du serveur)
+  const [rev, setRev] = useState(0);
+  // token de synchro : chargement complet puis /calendario/changes
+  const syncToken = useRef<string | null>(null);
 
   // filtre mois (1..12 ou "all")
   const [monthFilter, setMonthFilter] = useState<number | "all">("all");
@@ -51,9 +72,14 @@ export default function LocationSinotticoPage() {
   const map = useMemo(() => {
     const m: Record<string, Record<number, BookingCell>> = {};
     if (!data) return m;
-    for (const b of data.bookings) {
-      if (!m[b.date]) m[b.date] = {};
-      m[b.date][b.slot] = b; // on suppose 1 evento par (date, slot)
+    for (const r of data.runs) {
+      const end = dayjs(r.end);
+      for (let d = dayjs(r.start); !d.isAfter(end); d = d.add(1, "day")) {
+        const iso = d.format("YYYY-MM-DD");
+        if (!m[iso]) m[iso] = {};
+        // on suppose 1 evento par (date, slot)
+        m[iso][r.slot] = { ...r, date: iso, count: 1 };
+      }
     }
     return m;
   }, [data]);
@@ -62,8 +88,19 @@ export default function LocationSinotticoPage() {
   useEffect(() => {
     setLoading(true);
     setErr(null);
+    syncToken.current = null;
+    // token pris AVANT le chargement : une modif entre les deux sera renvoyée
     api
-      .get("/calendario/location-calendar", { params: { year } })
+      .get("/calendario/changes")
+      .then((t) => {
+        syncToken.current = (t.data as ChangesResponse).token;
+      })
+      .catch(() => {
+        /* synchro incrémentale indisponible -> rechargements complets */
+      })
+      .then(() =>
+        api.get("/calendario/location-calendar", { params: { year, view: "runs" } }),
+      )
       .then((r) => setData(r.data as LocationCalendarResponse))
       .catch((e) => {
         console.error("[location sinottico] error:", e);
@@ -71,9 +108,65 @@ export default function LocationSinotticoPage() {
         setData(null);
       })
       .finally(() => setLoading(false));
-  }, [year]);
+  }, [year, rev]);
 
-  const allDays = data?.days ?? [];
+  // notification -> seulement les eventi modifiés depuis le token
+  const sincronizza = async () => {
+    const since = syncToken.current;
+    if (!since) {
+      setRev((r) => r + 1);
+      return;
+    }
+    try {
+      const r = await api.get("/calendario/changes", { params: { since } });
+      const ch = r.data as ChangesResponse;
+      if (ch.reset) {
+        setRev((x) => x + 1);
+        return;
+      }
+      syncToken.current = ch.token;
+      setData((prev) => {
+        if (!prev) return prev;
+        const toccati = new Set([
+          ...(ch.eliminati ?? []),
+          ...(ch.eventi ?? []).map((e) => e.evento),
+        ]);
+        const runs = prev.runs.filter((run) => !toccati.has(run.evento));
+        for (const e of ch.eventi ?? []) {
+          // coupé à la fenêtre affichée, comme le chargement complet
+          const start = e.start < prev.from ? prev.from : e.start;
+          const end = e.end > prev.to ? prev.to : e.end;
+          if (start <= end) runs.push({ ...e, start, end });
+        }
+        runs.sort(
+          (a, b) =>
+            a.start.localeCompare(b.start) || a.slot - b.slot || a.evento - b.evento,
+        );
+        return { ...prev, runs };
+      });
+    } catch {
+      setRev((x) => x + 1);
+    }
+  };
+
+  useNotifiche(
+    (n) =>
+      (n.tipo === "resync" || !!n.domini?.includes("calendario")) &&
+      toccaPeriodo(n, `${year}-01-01`, `${year}-12-31`),
+    (ricevute) =>
+      ricevute.some((n) => n.tipo === "resync") ? setRev((r) => r + 1) : sincronizza(),
+  );
+
+  // jours de l'année, générés côté client (plus envoyés par l'API)
+  const allDays = useMemo(() => {
+    if (!data) return [];
+    const out: string[] = [];
+    const end = dayjs(data.to);
+    for (let d = dayjs(data.from); !d.isAfter(end); d = d.add(1, "day")) {
+      out.push(d.format("YYYY-MM-DD"));
+    }
+    return out;
+  }, [data]);
   const slots = data?.slots ?? [];
 
   // jours visibles (selon le mois choisi)
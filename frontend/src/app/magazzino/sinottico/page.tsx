@@ -4,6 +4,7 @@ import { useEffect, useMemo, useState } from "react";
 import dayjs from "dayjs";
 import Link from "next/link";
 import { api } from "@/lib/api";
+import { toccaPeriodo, useNotifiche } from "@/hooks/useNotifiche";
 
 type MaterialCol = {
   id: number;
@@ -30,6 +31,8 @@ export default function MagazzinoSinotticoPage() {
   const [data, setData] = useState<CalendarResponse | null>(null);
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  // incrémenté par les notifications push -> rechargement de l'année
+  const [rev, setRev] = useState(0);
 
   // filtre mois (1..12 ou "all")
   const [monthFilter, setMonthFilter] = useState<number | "all">("all");
@@ -61,7 +64,14 @@ export default function MagazzinoSinotticoPage() {
         setData(null);
       })
       .finally(() => setLoading(false));
-  }, [year]);
+  }, [year, rev]);
+
+  useNotifiche(
+    (n) =>
+      (n.tipo === "resync" || !!n.domini?.includes("stock")) &&
+      toccaPeriodo(n, `${year}-01-01`, `${year}-12-31`),
+    () => setRev((r) => r + 1),
+  );
 
   // jours visibles (selon le mois choisi)
   const visibleDays = useMemo(() => {
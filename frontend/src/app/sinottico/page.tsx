@@ -6,6 +6,7 @@ import { useRouter } from "next/navigation";
 import dayjs from "dayjs";
 import Link from "next/link";
 import { api } from "@/lib/api";
+import { toccaPeriodo, useNotifiche } from "@/hooks/useNotifiche";
 import { AppShell } from "@/components/layout/AppShell";
 
 import {
@@ -88,6 +89,8 @@ export default function SinotticoPage() {
   const [meta, setMeta] = useState<Record<number, MatMeta>>({});
   const [loading, setLoading] = useState(false);
   const [err, setErr] = useState<string | null>(null);
+  // incrémenté par les notifications push -> rechargement du mois
+  const [rev, setRev] = useState(0);
 
   const [agg, setAgg] = useState<AggResp | null>(null);
 
@@ -161,7 +164,41 @@ export default function SinotticoPage() {
     return () => {
       cancelled = true;
     };
-  }, [month]);
+  }, [month, rev]);
+
+  /* ---------- Notifications push ---------- */
+  // righe seules modifiées -> on ne recharge que le détail des eventi concernés ;
+  // evento modifié / créé / supprimé -> le mois entier
+  useNotifiche(
+    (n) =>
+      toccaPeriodo(
+        n,
+        dayjs(`${month}-01`).format("YYYY-MM-DD"),
+        dayjs(`${month}-01`).endOf("month").format("YYYY-MM-DD"),
+      ),
+    (ricevute) => {
+      const soloRighe = ricevute.every(
+        (n) => n.tipo === "riga" && n.evento && rows.some((r) => r.id === n.evento),
+      );
+      if (!soloRighe) {
+        setRev((r) => r + 1);
+        return;
+      }
+      const ids = Array.from(new Set(ricevute.map((n) => n.evento as number)));
+      Promise.all(ids.map((id) => api.get(`/eventi/${id}/`).catch(() => null))).then((resps) => {
+        const patch: typeof details = {};
+        for (const resp of resps) {
+          if (resp?.data?.id && Array.isArray(resp.data.righe)) {
+            patch[resp.data.id] = {
+              righe: resp.data.righe as Riga[],
+              offerta_stato: resp.data.offerta_stato || undefined,
+            };
+          }
+        }
+        setDetails((prev) => ({ ...prev, ...patch }));
+      });
+    },
+  );
 
   /* ---------- Récup meta (catégories / coûts) ---------- */
   useEffect(() => {
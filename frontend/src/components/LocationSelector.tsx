@@ -7,6 +7,10 @@ import { api } from "@/lib/api";
 type Props = {
   /** Date sélectionnée (YYYY-MM-DD) */
   dateValue: string;
+  /** Fin de période (multi-jours) : slot libre sur toute la période */
+  dateTo?: string;
+  /** Évènement en cours d’édition : ignoré dans le calcul d’occupation */
+  eventoId?: number | string;
   /** Emplacement choisi (1..maxSlots) */
   value: number;
   /** Callback lors d’un clic sur un emplacement libre */
@@ -30,6 +34,8 @@ type Props = {
 
 export function LocationSelector({
   dateValue,
+  dateTo,
+  eventoId,
   value,
   onChange,
   disabled,
@@ -58,7 +64,13 @@ export function LocationSelector({
       }
       setLoading(true);
       try {
-        const r = await api.get(availabilityUrl, { params: { data: dateValue } });
+        const r = await api.get(availabilityUrl, {
+          params: {
+            data: dateValue,
+            ...(dateTo && dateTo > dateValue ? { a: dateTo } : {}),
+            ...(eventoId ? { evento: eventoId } : {}),
+          },
+        });
         if (!alive) return;
         const arr = Array.isArray(r.data?.used) ? r.data.used : [];
         setUsed(arr.map((n: any) => Number(n)).filter((n: number) => Number.isFinite(n)));
@@ -74,7 +86,7 @@ export function LocationSelector({
     return () => {
       alive = false;
     };
-  }, [dateValue, availabilityUrl]);
+  }, [dateValue, dateTo, eventoId, availabilityUrl]);
 
   // Si la sélection actuelle devient occupée, on bascule automatiquement
   // sur le premier slot libre — MAIS seulement si autoReassignIfBusy = true
@@ -0,0 +1,87 @@
+/* chemin : /frontend/src/hooks/useNotifiche.ts */
+"use client";
+
+import { useEffect, useRef } from "react";
+
+// Notifications push du backend (SSE /api/stream, cf. backend/eventi/notifiche.py)
+export type Notifica = {
+  tipo: "evento" | "riga" | "resync";
+  azione?: "save" | "delete";
+  evento?: number;
+  date?: [string, string][]; // périodes touchées [début, fin] (ISO)
+  materiali?: number[];
+  domini?: string[];
+};
+
+const STREAM_URL =
+  (process.env.NEXT_PUBLIC_API_BASE ?? "http://localhost:8000/api").replace(/\/$/, "") +
+  "/stream";
+
+/** La notification touche-t-elle la fenêtre [da, a] (dates ISO) ? "resync" => toujours. */
+export function toccaPeriodo(n: Notifica, da: string, a: string): boolean {
+  if (n.tipo === "resync") return true;
+  return (n.date ?? []).some(([d0, d1]) => d0 <= a && d1 >= da);
+}
+
+/**
+ * Appelle `onChange` (regroupé sur `ritardo` ms, avec les notifications
+ * reçues entre-temps) quand une notification acceptée par `filtro` arrive.
+ * Sans flux (serveur WSGI seul, proxy…), EventSource réessaie en silence et
+ * la page garde son comportement actuel.
+ */
+export function useNotifiche(
+  filtro: (n: Notifica) => boolean,
+  onChange: (ricevute: Notifica[]) => void,
+  ritardo = 800,
+) {
+  // refs : pas de reconnexion à chaque rendu
+  const filtroRef = useRef(filtro);
+  const onChangeRef = useRef(onChange);
+  filtroRef.current = filtro;
+  onChangeRef.current = onChange;
+
+  useEffect(() => {
+    if (typeof window === "undefined" || typeof EventSource === "undefined") return;
+
+    const es = new EventSource(STREAM_URL);
+    let timer: ReturnType<typeof setTimeout> | null = null;
+    let interrotto = false;
+    let ricevute: Notifica[] = [];
+
+    const programma = (n: Notifica) => {
+      ricevute.push(n);
+      if (timer) clearTimeout(timer);
+      timer = setTimeout(() => {
+        const lotto = ricevute;
+        ricevute = [];
+        onChangeRef.current(lotto);
+      }, ritardo);
+    };
+
+    const ricevi = (ev: MessageEvent) => {
+      try {
+        const n = JSON.parse(ev.data) as Notifica;
+        if (filtroRef.current(n)) programma(n);
+      } catch {
+        /* message illisible : ignoré */
+      }
+    };
+
+    es.addEventListener("evento", ricevi as EventListener);
+    es.addEventListener("riga", ricevi as EventListener);
+    es.addEventListener("resync", () => programma({ tipo: "resync" }));
+    es.onerror = () => {
+      interrotto = true;
+    };
+    es.onopen = () => {
+      // reconnexion : des notifications ont pu être perdues
+      if (interrotto) programma({ tipo: "resync" });
+      interrotto = false;
+    };
+
+    return () => {
+      if (timer) clearTimeout(timer);
+      es.close();
+    };
+  }, [ritardo]);
+}